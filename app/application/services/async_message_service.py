@@ -0,0 +1,76 @@
+from typing import AsyncIterator, Optional, List
+
+from app.application.services.message_service import MessagePipeline
+from app.application.services.censor import CensorEngine
+from app.core.constants import SORT_TIME, ENTITIES
+from app.core.errors import NotFoundError
+from app.domain.entities.message import Message
+from app.domain.entities.message_page import MessagePage
+from app.domain.entities.session_stats import SessionStats
+from app.domain.entities.batch_result import BatchItemResult
+from app.domain.repositories.message_repository import AsyncMessageRepository
+from app.domain.repositories.message_cache import MessageCache
+from app.domain.repositories.message_hub import MessageHub
+
+class AsyncMessageService(MessagePipeline):
+    """
+    Asyncio counterpart of MessageService.
+    Runs the same pipeline and awaits the repository instead of blocking a worker thread.
+    """
+
+    def __init__(self, repository: AsyncMessageRepository, censor: Optional[CensorEngine] = None, cache: Optional[MessageCache] = None, hub: Optional[MessageHub] = None):
+        self.repository = repository
+        if censor is not None:
+            self.censor = censor
+        self.cache = cache
+        self.hub = hub
+
+    async def process_and_save(self, message: Message) -> Message:
+        self._prepare(message)
+        saved = await self.repository.save(message)
+        self._stored([saved])
+        return saved
+
+    async def process_and_save_many(self, messages: List[Message]) -> List[BatchItemResult]:
+        results, accepted = self._prepare_batch(messages)
+        stored = await self.repository.save_many([message for _, message in accepted])
+        self._stored(stored)
+        return self._merge_batch(results, accepted, stored)
+
+    async def get_messages(self, session_id: str, limit: int, offset: int, sender: Optional[str] = None, query: Optional[str] = None, cursor: Optional[str] = None, sort: str = SORT_TIME) -> List[Message]:
+        return (await self.get_message_page(session_id, limit, offset, sender, query, cursor, sort)).messages
+
+    async def get_message_page(self, session_id: str, limit: int, offset: int, sender: Optional[str] = None, query: Optional[str] = None, cursor: Optional[str] = None, sort: str = SORT_TIME, version: Optional[int] = None) -> MessagePage:
+        self._validate_sender_filter(sender)
+        if self.cache is None:
+            page = await self.repository.get_page_by_session(session_id, limit, offset, sender, cursor, query, sort)
+            return self._ensure_found(page)
+
+        key = self._cache_key(session_id, limit, offset, sender, query, cursor, sort, version)
+        page = self.cache.get(session_id, key)
+        if page is None:
+            generation = self.cache.generation(session_id)
+            page = await self.repository.get_page_by_session(session_id, limit, offset, sender, cursor, query, sort)
+            self.cache.put(session_id, key, page, generation)
+        return self._ensure_found(page)
+
+    async def get_session_stats(self, session_id: str) -> SessionStats:
+        return self._ensure_stats(await self.repository.get_session_stats(session_id))
+
+    async def get_session_version(self, session_id: str) -> int:
+        return await self.repository.get_session_version(session_id)
+
+    async def export_messages(self, session_id: str) -> AsyncIterator[Message]:
+        """Stream a whole session; an unknown session raises NotFoundError before anything is sent."""
+        messages = self.repository.iter_by_session(session_id)
+        first = await anext(messages, None)
+        if first is None:
+            await messages.aclose()
+            raise NotFoundError(ENTITIES["MESSAGES"])
+        return self._prepend(first, messages)
+
+    @staticmethod
+    async def _prepend(first: Message, rest: AsyncIterator[Message]) -> AsyncIterator[Message]:
+        yield first
+        async for message in rest:
+            yield message
@@ -1,24 +1,81 @@
 from datetime import datetime, timezone
-from typing import Optional, List
+from time import perf_counter
+from itertools import chain
+from typing import Hashable, Iterator, Optional, List, Tuple
 
-from app.core.constants import VALID_SENDERS, BANNED_WORDS, CENSOR_MASK
-from app.domain.entities.message import Message
+from app.core.constants import VALID_SENDERS, SORT_TIME
+from app.application.services.censor import CensorEngine, censor_engine
+from app.domain.entities.message import Message, MessageMetadata
+from app.domain.entities.message_page import MessagePage
+from app.domain.entities.session_stats import SessionStats
+from app.domain.entities.batch_result import BatchItemResult
 from app.domain.repositories.message_repository import MessageRepository
+from app.domain.repositories.message_cache import MessageCache
+from app.domain.repositories.message_hub import MessageHub
 from app.core.errors import InvalidSenderError, MissingFieldError, NotFoundError
-from app.core.constants import FIELDS, METADATA_FIELDS, ENTITIES
+from app.core.metrics import SERVICE_STAGE_SECONDS
+from app.core.constants import FIELDS, ENTITIES
+from app.core.constants import (
+    BATCH_STATUS_CREATED,
+    BATCH_STATUS_REJECTED,
+    ERROR_CODE_DUPLICATE_MESSAGE_ID,
+    ERROR_CODE_INVALID_SENDER,
+    ERROR_CODE_MISSING_FIELD,
+)
 
-class MessageService:
-    def __init__(self, repository: MessageRepository):
-        self.repository = repository
+_VALIDATE_SECONDS = SERVICE_STAGE_SECONDS.labels(stage="validate")
+_FILTER_SECONDS = SERVICE_STAGE_SECONDS.labels(stage="filter")
+_METADATA_SECONDS = SERVICE_STAGE_SECONDS.labels(stage="metadata")
 
-    # Pipeline: Validación -> Filtrado -> Metadatos -> Guardar
-    def process_and_save(self, message: Message) -> Message:
-        
+
+class MessagePipeline:
+    """
+    I/O-free processing steps shared by the sync and async message services.
+    Subclasses only decide how the repository is called.
+    """
+
+    censor: CensorEngine = censor_engine
+    cache: Optional[MessageCache] = None
+    hub: Optional[MessageHub] = None
+
+    def _prepare(self, message: Message) -> None:
+        start = perf_counter()
         self._validate_message(message)
+        validated = perf_counter()
         message.content = self._filter_content(message.content)
+        filtered = perf_counter()
         message.metadata = self._add_metadata(message.content)
+        _VALIDATE_SECONDS.observe(validated - start)
+        _FILTER_SECONDS.observe(filtered - validated)
+        _METADATA_SECONDS.observe(perf_counter() - filtered)
 
-        return self.repository.save(message)
+    def _prepare_batch(self, messages: List[Message]) -> Tuple[List[Optional[BatchItemResult]], List[Tuple[int, Message]]]:
+        """Run the pipeline on every message; returns the per-item results so far and the accepted entries."""
+        results: List[Optional[BatchItemResult]] = [None] * len(messages)
+        accepted = []
+        for index, message in enumerate(messages):
+            try:
+                self._prepare(message)
+            except MissingFieldError:
+                results[index] = self._rejected(index, message, ERROR_CODE_MISSING_FIELD)
+            except InvalidSenderError:
+                results[index] = self._rejected(index, message, ERROR_CODE_INVALID_SENDER)
+            else:
+                accepted.append((index, message))
+        return results, accepted
+
+    def _merge_batch(self, results: List[Optional[BatchItemResult]], accepted: List[Tuple[int, Message]], stored: List[Optional[Message]]) -> List[BatchItemResult]:
+        """Complete the per-item results with the outcome of the repository call."""
+        for (index, message), saved in zip(accepted, stored):
+            if saved is None:
+                results[index] = self._rejected(index, message, ERROR_CODE_DUPLICATE_MESSAGE_ID)
+            else:
+                results[index] = BatchItemResult(index, saved.message_id, BATCH_STATUS_CREATED, message=saved)
+        return results
+
+    @staticmethod
+    def _rejected(index: int, message: Message, error_code: str) -> BatchItemResult:
+        return BatchItemResult(index, message.message_id, BATCH_STATUS_REJECTED, error_code=error_code)
 
     def _validate_message(self, message: Message) -> None:
         if not message.message_id:
@@ -33,29 +90,110 @@ class MessageService:
             message.timestamp = datetime.now(timezone.utc)
 
     def _filter_content(self, content: str) -> str:
-        lowered = content.lower()
-        for word in BANNED_WORDS:
-            if word in lowered:
-                lowered = lowered.replace(word, CENSOR_MASK)
-        return lowered
-
-    def _add_metadata(self, content: str) -> dict:
-        return {
-            METADATA_FIELDS["WORD_COUNT"]: len(content.split()),
-            METADATA_FIELDS["CHAR_COUNT"]: len(content),
-            METADATA_FIELDS["PROCESSED_AT"]: datetime.now(timezone.utc).isoformat(),
-        }
-
-    def get_messages(self,session_id: str,limit: int,offset: int,sender: Optional[str] = None,query: Optional[str] = None) -> List[Message]:
+        return self.censor.censor(content)
+
+    def _add_metadata(self, content: str) -> MessageMetadata:
+        return MessageMetadata(
+            word_count=len(content.split()),
+            character_count=len(content),
+            processed_at=datetime.now(timezone.utc).isoformat(),
+        )
+
+    def _validate_sender_filter(self, sender: Optional[str]) -> None:
         if sender and sender not in VALID_SENDERS:
             raise InvalidSenderError()
-        results = self.repository.get_by_session(session_id, limit, offset, sender)
-        if not results:
+
+    @staticmethod
+    def _cache_key(session_id: str, limit: int, offset: int, sender: Optional[str], query: Optional[str], cursor: Optional[str], sort: str, version: Optional[int]) -> Hashable:
+        # With a version, a page cached before another worker's insert can never be served under a newer ETag
+        return (session_id, sender, limit, offset, query, cursor, sort, version)
+
+    def _invalidate(self, messages: List[Optional[Message]]) -> None:
+        """Drop the cached pages of every session that just received a message."""
+        if self.cache is None:
+            return
+        for session_id in {m.session_id for m in messages if m is not None}:
+            self.cache.invalidate_session(session_id)
+
+    def _stored(self, messages: List[Optional[Message]]) -> None:
+        """Invalidate the cached pages of the sessions that just received messages and push them to live subscribers."""
+        self._invalidate(messages)
+        if self.hub is not None:
+            self.hub.publish([m for m in messages if m is not None])
+
+    def _ensure_stats(self, stats: Optional[SessionStats]) -> SessionStats:
+        if stats is None:
             raise NotFoundError(ENTITIES["MESSAGES"])
-        # Apply simple search filter if 'query' is provided
-        if query:
-            results = [msg for msg in results if query.lower() in msg.content.lower()]
-        if not results:
+        return stats
+
+    def _ensure_found(self, page: MessagePage) -> MessagePage:
+        if not page.messages:
             raise NotFoundError(ENTITIES["MESSAGES"])
+        return page
 
-        return results
+
+class MessageService(MessagePipeline):
+    def __init__(self, repository: MessageRepository, censor: Optional[CensorEngine] = None, cache: Optional[MessageCache] = None, hub: Optional[MessageHub] = None):
+        self.repository = repository
+        if censor is not None:
+            self.censor = censor
+        self.cache = cache
+        self.hub = hub
+
+    # Pipeline: Validación -> Filtrado -> Metadatos -> Guardar
+    def process_and_save(self, message: Message) -> Message:
+        self._prepare(message)
+        saved = self.repository.save(message)
+        self._stored([saved])
+        return saved
+
+    def process_and_save_many(self, messages: List[Message]) -> List[BatchItemResult]:
+        """
+        Run the pipeline on every message and store the valid ones in a single repository call.
+        Invalid or duplicate entries are reported individually and never abort the rest of the batch.
+        """
+        results, accepted = self._prepare_batch(messages)
+        stored = self.repository.save_many([message for _, message in accepted])
+        self._stored(stored)
+        return self._merge_batch(results, accepted, stored)
+
+    def get_messages(self,session_id: str,limit: int,offset: int,sender: Optional[str] = None,query: Optional[str] = None,cursor: Optional[str] = None,sort: str = SORT_TIME) -> List[Message]:
+        return self.get_message_page(session_id, limit, offset, sender, query, cursor, sort).messages
+
+    def get_message_page(self, session_id: str, limit: int, offset: int, sender: Optional[str] = None, query: Optional[str] = None, cursor: Optional[str] = None, sort: str = SORT_TIME, version: Optional[int] = None) -> MessagePage:
+        """
+        Return one page of a session plus the cursor of the next page (keyset when `cursor` is given).
+        The `query` search runs in the repository, before pagination, so no match is lost to paging.
+        Pages are served from the read cache when one is configured, keyed by `version` when it is given.
+        """
+        self._validate_sender_filter(sender)
+        if self.cache is None:
+            page = self.repository.get_page_by_session(session_id, limit, offset, sender, cursor, query, sort)
+            return self._ensure_found(page)
+
+        key = self._cache_key(session_id, limit, offset, sender, query, cursor, sort, version)
+        page = self.cache.get(session_id, key)
+        if page is None:
+            generation = self.cache.generation(session_id)
+            page = self.repository.get_page_by_session(session_id, limit, offset, sender, cursor, query, sort)
+            self.cache.put(session_id, key, page, generation)
+        return self._ensure_found(page)
+
+    def export_messages(self, session_id: str) -> Iterator[Message]:
+        """
+        Iterate over a whole session for export, streaming from the repository.
+        The first row is fetched eagerly so an unknown session raises NotFoundError before anything is sent.
+        """
+        messages = self.repository.iter_by_session(session_id)
+        first = next(messages, None)
+        if first is None:
+            raise NotFoundError(ENTITIES["MESSAGES"])
+        return chain([first], messages)
+
+    def get_session_stats(self, session_id: str) -> SessionStats:
+        """Return the incrementally maintained aggregates of a session (constant cost, whatever its size)."""
+        return self._ensure_stats(self.repository.get_session_stats(session_id))
+
+    def get_session_version(self, session_id: str) -> int:
+        """Return the session's insert counter, read without touching the messages (0 for an unknown session)."""
+        return self.repository.get_session_version(session_id)
@@ -0,0 +1,125 @@
+import hashlib
+import logging
+import os
+import signal
+import threading
+from typing import Dict, Mapping, Optional, Tuple
+
+from app.core.config import settings
+from app.core.constants import DEFAULT_TENANT_ID
+from app.domain.entities.tenant import Tenant
+
+"""
+In-memory registry of the accepted API keys.
+
+Keys are never stored in clear: the key file lists SHA-256 digests, one per line,
+    <sha256 hex digest> <tenant_id> [tier]
+with '#' starting a comment. A presented key is hashed and looked up by digest in a dict, so
+authentication costs one hash and one dict read, and timing can only reveal digest prefixes,
+which say nothing about the key. Refreshes build a new dict and swap it in whole, so lookups
+take no lock. The file is re-read when its mtime or size changes (polled by a background
+thread) or immediately on SIGHUP; several digests may point to the same tenant, which is how
+keys are rotated without downtime.
+"""
+
+logger = logging.getLogger(__name__)
+
+_DIGEST_HEX_LENGTH = 64
+
+
+def hash_api_key(api_key: str) -> bytes:
+    """SHA-256 digest of a key, as used for lookups (the key file holds its hex form)."""
+    return hashlib.sha256(api_key.encode()).digest()
+
+
+def load_api_keys(path: str) -> Dict[bytes, Tenant]:
+    """Parse a key file into digest -> tenant; raises ValueError naming the first malformed line."""
+    tenants: Dict[bytes, Tenant] = {}
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle, start=1):
+            fields = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) not in (2, 3) or len(fields[0]) != _DIGEST_HEX_LENGTH:
+                raise ValueError(f"{path}:{number}: expected '<sha256 hex> <tenant_id> [tier]'")
+            try:
+                digest = bytes.fromhex(fields[0])
+            except ValueError:
+                raise ValueError(f"{path}:{number}: the digest is not hexadecimal") from None
+            tenants[digest] = Tenant(fields[1], fields[2] if len(fields) == 3 else None)
+    return tenants
+
+
+class ApiKeyRegistry:
+    """Resolves API keys to tenants from the built-in keys plus an optional key file."""
+
+    def __init__(self, path: Optional[str] = None, static_keys: Optional[Mapping[str, Tenant]] = None, refresh_seconds: float = 30.0):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self._static = {hash_api_key(key): tenant for key, tenant in (static_keys or {}).items()}
+        self._tenants: Dict[bytes, Tenant] = dict(self._static)
+        self._version: Optional[Tuple[int, int]] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reload()
+
+    def resolve(self, api_key: Optional[str]) -> Optional[Tenant]:
+        """Tenant owning the key, or None when the key is missing or unknown."""
+        if not api_key:
+            return None
+        return self._tenants.get(hash_api_key(api_key))
+
+    def __len__(self) -> int:
+        return len(self._tenants)
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-read the key file if it changed (or unconditionally with force); returns whether the keys were replaced."""
+        if not self.path:
+            return False
+        stat = os.stat(self.path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if version == self._version and not force:
+            return False
+        tenants = dict(self._static)
+        tenants.update(load_api_keys(self.path))
+        self._tenants, self._version = tenants, version
+        return True
+
+    def start(self) -> None:
+        """Start the refresh thread and the SIGHUP handler (no-op without a key file)."""
+        if not self.path or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="api-key-refresh", daemon=True)
+        self._thread.start()
+        # Signal handlers can only be installed from the main thread, and SIGHUP is POSIX only
+        if hasattr(signal, "SIGHUP") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGHUP, lambda *_: self._wake.set())
+
+    def stop(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            self._wake.set()
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            signaled = self._wake.wait(self.refresh_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            try:
+                self.reload(force=signaled)
+            except (OSError, ValueError):
+                # A half-written or broken file must not lock every tenant out
+                logger.exception("API key refresh failed; keeping the previous keys")
+
+
+# Process-wide registry: API_KEY (if set) belongs to the default tenant, API_KEYS_FILE adds the others
+api_key_registry = ApiKeyRegistry(
+    settings.API_KEYS_FILE,
+    {settings.API_KEY: Tenant(DEFAULT_TENANT_ID, settings.RATE_LIMIT_API_KEY_TIERS.get(settings.API_KEY))} if settings.API_KEY else None,
+    settings.API_KEYS_REFRESH_SECONDS,
+)
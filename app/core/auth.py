@@ -1,11 +1,18 @@
 from fastapi import Header, HTTPException, status
-from app.core.config import settings
+from starlette.requests import HTTPConnection
+from app.core.api_keys import api_key_registry
 from app.core.constants import API_KEY_HEADER, ERROR_DETAIL_UNAUTHORIZED
 
-def verify_api_key(x_api_key: str = Header(default=None, alias=API_KEY_HEADER)):
-    """Verify that the request includes a valid API key in the headers."""
-    if x_api_key != settings.API_KEY:
+async def verify_api_key(request: HTTPConnection, x_api_key: str = Header(default=None, alias=API_KEY_HEADER)):
+    """
+    Verify that the request (or WebSocket handshake) includes a known API key in the headers and
+    attach its tenant to `request.state.tenant`.
+    Declared async so it runs on the event loop instead of taking a threadpool slot.
+    """
+    tenant = api_key_registry.resolve(x_api_key)
+    if tenant is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=ERROR_DETAIL_UNAUTHORIZED,
         )
+    request.state.tenant = tenant
@@ -1,18 +1,114 @@
+from typing import Dict, Literal, Optional
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     """Application configuration loaded from environment variables."""
 
     DATABASE_URL: str = "sqlite:///./data/chat.db"
+    # Reads use their own pool of query_only connections, on this URL when set (e.g. a replica
+    # file, or 'sqlite:///file:./data/chat.db?mode=ro&uri=true') and on DATABASE_URL otherwise
+    READ_DATABASE_URL: Optional[str] = None
+    DB_WRITE_POOL_SIZE: int = 2
+    DB_WRITE_MAX_OVERFLOW: int = 0
+    DB_READ_POOL_SIZE: int = 8
+    DB_READ_MAX_OVERFLOW: int = 8
+
+    # SQLite performance profile, applied to every pooled connection
+    SQLITE_TUNING_ENABLED: bool = True
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -64000  # negative = KiB (64 MiB), positive = pages
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
+    SQLITE_TEMP_STORE: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
+    # Message bodies of at least CONTENT_COMPRESSION_MIN_BYTES (UTF-8) are stored zlib-compressed
+    # (once on, other writers of the messages table need the decompress_content() SQL function)
+    CONTENT_COMPRESSION_ENABLED: bool = False
+    CONTENT_COMPRESSION_MIN_BYTES: int = 1024
+    CONTENT_COMPRESSION_LEVEL: int = 6
+
+    # Hash sharding: with SHARD_COUNT > 1 messages are stored in SHARD_COUNT SQLite files (the
+    # template's {shard} is replaced by 0..N-1) chosen by session_id, instead of DATABASE_URL.
+    # Blocking driver only; write-behind is not used with shards. Changing the count requires
+    # moving the data with `python -m app.infrastructure.shard_rebalance`.
+    SHARD_COUNT: int = 1
+    SHARD_DATABASE_URL_TEMPLATE: str = "sqlite:///./data/chat-shard{shard}.db"
 
     API_PREFIX: str = "/api"
     API_VERSION: str = "1.0.0"
     PROJECT_NAME: str = "Chat Messages API"
     DESCRIPTION: str = "RESTful API for chat message processing"
 
-    API_KEY: str
+    # Built-in key of the "default" tenant; API_KEYS_FILE adds tenant keys as SHA-256 digests
+    # ("<sha256 hex> <tenant_id> [tier]" per line), re-read on change or SIGHUP. At least one of
+    # the two must be set: the app refuses to start without a key source
+    API_KEY: Optional[str] = None
+    API_KEYS_FILE: Optional[str] = None
+    API_KEYS_REFRESH_SECONDS: float = 30.0
+
+    # Content filtering: optional blocklist file (one word or phrase per line) and matching mode
+    BANNED_WORDS_FILE: Optional[str] = None
+    CENSOR_WHOLE_WORDS: bool = False
+
+    # Write-behind mode: inserts are queued and committed in groups by a single writer thread
+    WRITE_BEHIND_ENABLED: bool = False
+    WRITE_BEHIND_BATCH_SIZE: int = 100
+    WRITE_BEHIND_MAX_DELAY_MS: int = 5
+    WRITE_BEHIND_QUEUE_DEPTH: int = 10000
+    WRITE_BEHIND_STOP_TIMEOUT_SECONDS: float = 10.0
+
+    # Read cache for GET /messages/{session_id} pages, invalidated per session on every write
+    MESSAGE_CACHE_ENABLED: bool = False
+    MESSAGE_CACHE_MAX_ENTRIES: int = 10000
+    MESSAGE_CACHE_TTL_SECONDS: float = 5.0
+
+    # Live tail (SSE and WebSocket): new messages are pushed to the subscribers of their session on
+    # this worker. A subscriber with more than STREAM_SUBSCRIBER_BUFFER undelivered messages is
+    # disconnected; SSE streams send a comment every STREAM_HEARTBEAT_SECONDS to stay open.
+    STREAM_SUBSCRIBER_BUFFER: int = 256
+    STREAM_MAX_SUBSCRIBERS: int = 50000
+    STREAM_HEARTBEAT_SECONDS: float = 15.0
+
+    # Bloom filter over stored message_ids, built on startup: inserts of ids it has never seen skip
+    # any duplicate pre-check, probable duplicates are confirmed with an indexed lookup before writing
+    MESSAGE_ID_FILTER_ENABLED: bool = False
+    MESSAGE_ID_FILTER_CAPACITY: int = 1_000_000
+    MESSAGE_ID_FILTER_ERROR_RATE: float = 0.01
+
+    # Tiered retention: sessions idle for RETENTION_IDLE_DAYS are moved to gzip segment files under
+    # ARCHIVE_DIR by a background job and read back from there. Keep it enabled once sessions were
+    # archived: reads only consult the archive while it is on.
+    RETENTION_ENABLED: bool = False
+    RETENTION_IDLE_DAYS: float = 90.0
+    RETENTION_INTERVAL_SECONDS: float = 3600.0
+    RETENTION_BATCH_SESSIONS: int = 1000
+    ARCHIVE_DIR: str = "./data/archive"
+    ARCHIVE_SEGMENT_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Token-bucket rate limits per API key. Limits ("600/minute" or "600/minute;burst=50") are set
+    # per scope (post_message, post_batch) in tiers, e.g. {"gold": {"post_message": "600/minute"}};
+    # the "default" tier applies to keys without one. The shared backend keeps the buckets in a
+    # memory-mapped file so every worker on the host enforces the same budget.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: Literal["memory", "shared"] = "memory"
+    RATE_LIMIT_SHARED_PATH: str = "./data/rate_limits.bin"
+    RATE_LIMIT_SHARED_SLOTS: int = 65536
+    RATE_LIMIT_TIERS: Dict[str, Dict[str, str]] = {}
+    RATE_LIMIT_API_KEY_TIERS: Dict[str, str] = {}
+
+    # Prometheus text endpoint at /metrics (process-local; scrape every worker)
+    METRICS_ENABLED: bool = True
 
     class Config:
         env_file = ".env"
 
+    @model_validator(mode="after")
+    def _require_api_key_source(self) -> "Settings":
+        # Every endpoint is behind the key registry; without a key source none could be called
+        if not self.API_KEY and not self.API_KEYS_FILE:
+            raise ValueError("Set API_KEY or API_KEYS_FILE: every endpoint requires an API key")
+        return self
+
 settings = Settings()
\ No newline at end of file
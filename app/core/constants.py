@@ -10,9 +10,35 @@ DEFAULT_LIMIT = 10
 DEFAULT_OFFSET = 0
 MAX_LIMIT = 100
 
+# --- Export ---
+EXPORT_BATCH_SIZE = 1000  # rows fetched per round trip and NDJSON lines per response chunk
+MEDIA_TYPE_NDJSON = "application/x-ndjson"
+MEDIA_TYPE_JSON = "application/json"
+MEDIA_TYPE_MSGPACK = "application/msgpack"
+# Accepted spellings of the MessagePack media type (the x- one predates its registration)
+MEDIA_TYPES_MSGPACK = (MEDIA_TYPE_MSGPACK, "application/x-msgpack")
+
+# --- Live tail (SSE / WebSocket) ---
+MEDIA_TYPE_EVENT_STREAM = "text/event-stream"
+SSE_EVENT_MESSAGE = "message"
+SSE_EVENT_ERROR = "error"
+# WebSocket close code sent to evicted or rejected subscribers (RFC 6455 "Try Again Later")
+WS_CLOSE_TRY_AGAIN_LATER = 1013
+
+# --- Sorting ---
+SORT_TIME = "time"
+SORT_RELEVANCE = "relevance"
+
+# --- Batch ingest ---
+MAX_BATCH_SIZE = 1000
+BATCH_STATUS_CREATED = "created"
+BATCH_STATUS_REJECTED = "rejected"
+
 # --- Content filtering ---
 BANNED_WORDS = ["badword", "offensive", "dummy"]
 CENSOR_MASK = "***"
+# Blocklists up to this size are matched with one str.find per word instead of the trie regex
+CENSOR_SIMPLE_MAX_WORDS = 32
 
 # --- Common field names ---
 FIELDS = {
@@ -39,9 +65,19 @@ ENTITIES = {
 # DATABASE CONFIGURATION
 # -----------------------------------------
 SQLITE_PREFIX = "sqlite"
+SQLITE_ASYNC_PREFIX = "sqlite+aiosqlite"
 SQLITE_CONNECT_ARGS = {"check_same_thread": False}
 
 DB_TABLE_MESSAGES = "messages"
+DB_TABLE_MESSAGES_FTS = "messages_fts"
+DB_TABLE_SESSION_STATS = "session_stats"
+DB_TABLE_ARCHIVED_SESSIONS = "archived_sessions"
+DB_TABLE_ARCHIVED_MESSAGE_IDS = "archived_message_ids"
+DB_INDEX_MESSAGES_SESSION_TIMESTAMP_ID = "ix_messages_session_timestamp_id"
+
+# Compressed message bodies: BLOB values starting with this marker hold a zlib stream
+CONTENT_COMPRESSION_MARKER = b"\x00zlib\x01"
+SQL_FUNCTION_DECOMPRESS_CONTENT = "decompress_content"
 
 MESSAGE_ID_MAX_LENGTH = 64
 SESSION_ID_MAX_LENGTH = 64
@@ -55,6 +91,16 @@ ROUTE_PREFIX_MESSAGES = "/api/messages"
 
 # --- Rate limiting ---
 RATE_LIMIT_POST_MESSAGES = "3/minute"
+RATE_LIMIT_POST_MESSAGES_BATCH = "30/minute"
+RATE_SCOPE_POST_MESSAGE = "post_message"
+RATE_SCOPE_POST_BATCH = "post_batch"
+RATE_LIMIT_DEFAULT_TIER = "default"
+RATE_LIMIT_BACKEND_MEMORY = "memory"
+RATE_LIMIT_BACKEND_SHARED = "shared"
+RETRY_AFTER_HEADER = "Retry-After"
+
+# --- Authentication ---
+DEFAULT_TENANT_ID = "default"
 
 # --- Response status ---
 STATUS_SUCCESS = "success"
@@ -62,8 +108,21 @@ STATUS_ERROR = "error"
 STATUS_FIELD = "status"
 ERROR_FIELD = "error"
 
+# --- Metrics ---
+METRICS_PATH = "/metrics"
+METRICS_NAMESPACE = "chat"
+METRICS_UNMATCHED_ROUTE = "<unmatched>"
+# Request latency buckets (seconds) and finer ones for in-process stages and single queries
+METRICS_HTTP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_FAST_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
 # --- Headers ---
 API_KEY_HEADER = "x-api-key"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+ETAG_HEADER = "ETag"
+IF_NONE_MATCH_HEADER = "If-None-Match"
+ACCEPT_HEADER = "Accept"
+VARY_HEADER = "Vary"
 
 # --- Example values ---
 EXAMPLE_TIMESTAMP = "2025-10-06T00:48:55.204Z"
@@ -81,6 +140,10 @@ ERROR_CODE_NOT_FOUND = "NOT_FOUND"
 ERROR_CODE_SERVER_ERROR = "SERVER_ERROR"
 ERROR_CODE_UNAUTHORIZED = "UNAUTHORIZED"
 ERROR_CODE_RATE_LIMIT_EXCEEDED = "RATE_LIMIT_EXCEEDED"
+ERROR_CODE_INVALID_CURSOR = "INVALID_CURSOR"
+ERROR_CODE_WRITE_QUEUE_FULL = "WRITE_QUEUE_FULL"
+ERROR_CODE_TOO_MANY_SUBSCRIBERS = "TOO_MANY_SUBSCRIBERS"
+ERROR_CODE_SLOW_CONSUMER = "SLOW_CONSUMER"
 
 # --- Error messages ---
 ERROR_MSG_INVALID_FORMAT = "Invalid message format"
@@ -91,6 +154,10 @@ ERROR_MSG_NOT_FOUND = "No results found"
 ERROR_MSG_SERVER_ERROR = "Internal server error"
 ERROR_MSG_UNAUTHORIZED = "Invalid or missing API key"
 ERROR_MSG_RATE_LIMIT_EXCEEDED = "Rate limit exceeded"
+ERROR_MSG_INVALID_CURSOR = "Invalid pagination cursor"
+ERROR_MSG_WRITE_QUEUE_FULL = "Write queue is full"
+ERROR_MSG_TOO_MANY_SUBSCRIBERS = "Too many live subscribers"
+ERROR_MSG_SLOW_CONSUMER = "Subscriber fell behind"
 
 # --- Error details ---
 ERROR_DETAIL_INVALID_FORMAT = "The provided message does not meet validation rules."
@@ -101,6 +168,10 @@ ERROR_DETAIL_NOT_FOUND = "No messages were found for the given criteria."
 ERROR_DETAIL_SERVER_ERROR = "Unexpected error while processing request"
 ERROR_DETAIL_UNAUTHORIZED = "You must provide a valid x-api-key header."
 ERROR_DETAIL_RATE_LIMIT_EXCEEDED = "Too many requests in a short period. Please try again later."
+ERROR_DETAIL_INVALID_CURSOR = "The cursor must be a value previously returned in the X-Next-Cursor header."
+ERROR_DETAIL_WRITE_QUEUE_FULL = "The server is under heavy write load. Please retry shortly."
+ERROR_DETAIL_TOO_MANY_SUBSCRIBERS = "The server has reached its limit of open streams. Please retry shortly."
+ERROR_DETAIL_SLOW_CONSUMER = "Too many messages were pending for this stream. Reload the session and subscribe again."
 
 # --- Centralized error mapping ---
 ERRORS = {
@@ -144,4 +215,24 @@ ERRORS = {
         "message": ERROR_MSG_RATE_LIMIT_EXCEEDED,
         "details": ERROR_DETAIL_RATE_LIMIT_EXCEEDED,
     },
+    ERROR_CODE_INVALID_CURSOR: {
+        "code": ERROR_CODE_INVALID_CURSOR,
+        "message": ERROR_MSG_INVALID_CURSOR,
+        "details": ERROR_DETAIL_INVALID_CURSOR,
+    },
+    ERROR_CODE_WRITE_QUEUE_FULL: {
+        "code": ERROR_CODE_WRITE_QUEUE_FULL,
+        "message": ERROR_MSG_WRITE_QUEUE_FULL,
+        "details": ERROR_DETAIL_WRITE_QUEUE_FULL,
+    },
+    ERROR_CODE_TOO_MANY_SUBSCRIBERS: {
+        "code": ERROR_CODE_TOO_MANY_SUBSCRIBERS,
+        "message": ERROR_MSG_TOO_MANY_SUBSCRIBERS,
+        "details": ERROR_DETAIL_TOO_MANY_SUBSCRIBERS,
+    },
+    ERROR_CODE_SLOW_CONSUMER: {
+        "code": ERROR_CODE_SLOW_CONSUMER,
+        "message": ERROR_MSG_SLOW_CONSUMER,
+        "details": ERROR_DETAIL_SLOW_CONSUMER,
+    },
 }
@@ -1,7 +1,8 @@
 from fastapi import FastAPI, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError, HTTPException
-from slowapi.errors import RateLimitExceeded
+
+from app.core.metrics import RATE_LIMITED_REQUESTS, route_template
 
 from app.core.constants import (
     STATUS_ERROR,
@@ -15,6 +16,10 @@ from app.core.constants import (
     ERROR_CODE_UNAUTHORIZED,
     ERROR_CODE_SERVER_ERROR,
     ERROR_CODE_RATE_LIMIT_EXCEEDED,
+    ERROR_CODE_INVALID_CURSOR,
+    ERROR_CODE_WRITE_QUEUE_FULL,
+    ERROR_CODE_TOO_MANY_SUBSCRIBERS,
+    RETRY_AFTER_HEADER,
 )
 
 # --- Custom exceptions ---
@@ -32,6 +37,19 @@ class NotFoundError(Exception):
     def __init__(self, resource: str = "messages"):
         self.resource = resource
 
+class InvalidCursorError(Exception):
+    pass
+
+class WriteQueueFullError(Exception):
+    pass
+
+class TooManySubscribersError(Exception):
+    pass
+
+class RateLimitExceededError(Exception):
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+
 
 def init_error_handlers(app: FastAPI):
     """Register centralized exception handlers."""
@@ -49,6 +67,27 @@ def init_error_handlers(app: FastAPI):
             content={STATUS_FIELD: STATUS_ERROR, ERROR_FIELD: ERRORS[ERROR_CODE_INVALID_SENDER]},
         )
 
+    @app.exception_handler(InvalidCursorError)
+    async def invalid_cursor_handler(_, __):
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={STATUS_FIELD: STATUS_ERROR, ERROR_FIELD: ERRORS[ERROR_CODE_INVALID_CURSOR]},
+        )
+
+    @app.exception_handler(WriteQueueFullError)
+    async def write_queue_full_handler(_, __):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={STATUS_FIELD: STATUS_ERROR, ERROR_FIELD: ERRORS[ERROR_CODE_WRITE_QUEUE_FULL]},
+        )
+
+    @app.exception_handler(TooManySubscribersError)
+    async def too_many_subscribers_handler(_, __):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={STATUS_FIELD: STATUS_ERROR, ERROR_FIELD: ERRORS[ERROR_CODE_TOO_MANY_SUBSCRIBERS]},
+        )
+
     @app.exception_handler(MissingFieldError)
     async def missing_field_handler(_, exc: MissingFieldError):
         error = ERRORS[ERROR_CODE_MISSING_FIELD].copy()
@@ -97,12 +136,11 @@ def init_error_handlers(app: FastAPI):
             content={STATUS_FIELD: STATUS_ERROR, ERROR_FIELD: ERRORS[ERROR_CODE_SERVER_ERROR]},
         )
 
-    @app.exception_handler(RateLimitExceeded)
-    async def rate_limit_handler(_, exc: RateLimitExceeded):
-        error = ERRORS[ERROR_CODE_RATE_LIMIT_EXCEEDED].copy()
-        if hasattr(exc, "detail") and exc.detail:
-            error["details"] = str(exc.detail)
+    @app.exception_handler(RateLimitExceededError)
+    async def rate_limit_handler(request, exc: RateLimitExceededError):
+        RATE_LIMITED_REQUESTS.labels(route_template(request.scope)).inc()
         return JSONResponse(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            content={STATUS_FIELD: STATUS_ERROR, ERROR_FIELD: error},
+            content={STATUS_FIELD: STATUS_ERROR, ERROR_FIELD: ERRORS[ERROR_CODE_RATE_LIMIT_EXCEEDED]},
+            headers={RETRY_AFTER_HEADER: str(exc.retry_after)},
         )
@@ -1,29 +1,238 @@
+import hashlib
+import math
+import mmap
 import os
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from app.core.constants import RATE_LIMIT_POST_MESSAGES
+import re
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.constants import (
+    API_KEY_HEADER,
+    RATE_LIMIT_POST_MESSAGES,
+    RATE_LIMIT_POST_MESSAGES_BATCH,
+    RATE_SCOPE_POST_MESSAGE,
+    RATE_SCOPE_POST_BATCH,
+    RATE_LIMIT_DEFAULT_TIER,
+    RATE_LIMIT_BACKEND_SHARED,
+)
+from app.core.errors import RateLimitExceededError
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: only the in-memory backend is available
+    fcntl = None
+
+"""
+Token-bucket rate limiting keyed by API key.
+
+Every (scope, API key) pair owns a bucket holding up to `capacity` tokens that refills at a
+steady rate; a request takes one token or is rejected with the time until the next one. A check
+is a constant number of dict or mmap slot operations with no database round trip, so it runs
+on the event loop.
+
+Two bucket stores are available:
+- memory: a dict in the worker process (each worker enforces the limit on its own);
+- shared: a fixed-size table in a memory-mapped file guarded by flock, so every worker on the
+  host draws from the same buckets.
+"""
 
 IS_TEST_ENV = os.getenv("TEST_ENV", "").lower() == "true"
 
-if IS_TEST_ENV:
-    class DummyLimiter:
-        def limit(self, *_args, **_kwargs):
-            """Return the original function unmodified (no rate limiting)."""
-            def decorator(func):
-                return func
-            return decorator
-
-        def __getattr__(self, _name):
-            """Return a dummy callable that does nothing."""
-            def dummy(*_args, **_kwargs):
-                return None
-            return dummy
-
-    limiter = DummyLimiter()
-else:
-    # Executed only in production.
-    # Instantiates the real SlowAPI limiter (excluded from test coverage)
-    limiter = Limiter(  # pragma: no cover
-        key_func=get_remote_address,
-        default_limits=[RATE_LIMIT_POST_MESSAGES],
-    )
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+_RATE_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*(?:;\s*burst\s*=\s*(\d+)\s*)?$")
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Sustained `per_second` refill with bursts up to `capacity` requests."""
+    capacity: float
+    per_second: float
+
+    @classmethod
+    def parse(cls, text: str) -> "Rate":
+        """Parse "<count>/<second|minute|hour|day>[;burst=<n>]"; the burst defaults to the count."""
+        match = _RATE_PATTERN.match(text)
+        if match is None:
+            raise ValueError(f"Invalid rate limit '{text}'")
+        count, period, burst = match.groups()
+        return cls(capacity=float(burst or count), per_second=int(count) / _PERIODS[period])
+
+
+class BucketStore(ABC):
+    """Storage for token buckets."""
+
+    @abstractmethod # pragma: no cover
+    def take(self, key: str, rate: Rate) -> float:
+        """Take one token from the bucket of `key`; return 0 when allowed, else the seconds until a token is available."""
+        raise NotImplementedError
+
+
+def _refill(tokens: float, updated: float, now: float, rate: Rate) -> float:
+    # A clock that went backwards (e.g. the shared file outlived a reboot) refills nothing
+    return min(rate.capacity, tokens + max(0.0, now - updated) * rate.per_second)
+
+
+def _consume(tokens: float, rate: Rate):
+    """New token count and wait time for one request against a refilled bucket."""
+    if tokens >= 1.0:
+        return tokens - 1.0, 0.0
+    return tokens, (1.0 - tokens) / rate.per_second
+
+
+class InMemoryBucketStore(BucketStore):
+    """Buckets in a dict local to the worker process."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._buckets: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: Rate) -> float:
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = rate.capacity if bucket is None else _refill(bucket[0], bucket[1], now, rate)
+            tokens, wait = _consume(tokens, rate)
+            self._buckets[key] = [tokens, now]
+        return wait
+
+
+class SharedMemoryBucketStore(BucketStore):
+    """
+    Buckets in a memory-mapped file shared by every process that opens the same path.
+    The file is a fixed open-addressing table of `slots` entries (key hash, tokens, last update);
+    a key is looked up in at most `probes` consecutive slots. When they are all taken by other
+    keys, the least recently updated one is reused, which hands that key a full bucket again.
+    """
+
+    _SLOT = struct.Struct("<Qdd")
+
+    def __init__(self, path: str, slots: int, probes: int = 8, clock: Callable[[], float] = time.time):
+        if fcntl is None:  # pragma: no cover
+            raise RuntimeError("The shared rate limit backend requires POSIX file locking")
+        self.slots = slots
+        self.probes = min(probes, slots)
+        self.clock = clock
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = slots * self._SLOT.size
+        if os.fstat(self._fd).st_size != size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        # flock excludes other processes; threads of this process share the descriptor
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: Rate) -> float:
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        start = digest % self.slots
+        now = self.clock()
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                offset, tokens = self._find(digest, start, rate, now)
+                tokens, wait = _consume(tokens, rate)
+                self._SLOT.pack_into(self._map, offset, digest, tokens, now)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return wait
+
+    def _find(self, digest: int, start: int, rate: Rate, now: float):
+        """Slot offset for `digest` and its refilled token count (a full bucket for a new or reused slot)."""
+        oldest_offset, oldest_updated = None, math.inf
+        for i in range(self.probes):
+            offset = ((start + i) % self.slots) * self._SLOT.size
+            owner, tokens, updated = self._SLOT.unpack_from(self._map, offset)
+            if owner == digest:
+                return offset, _refill(tokens, updated, now, rate)
+            if owner == 0:
+                return offset, rate.capacity
+            if updated < oldest_updated:
+                oldest_offset, oldest_updated = offset, updated
+        return oldest_offset, rate.capacity
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+
+class RateLimitPolicy:
+    """
+    Resolves the rate of a scope for an API key: the given tier or the key's tier (RATE_LIMIT_API_KEY_TIERS) first,
+    then the "default" tier, then the built-in limits. Rates are parsed once, so a lookup is two dict reads.
+    """
+
+    def __init__(
+            self,
+            defaults: Mapping[str, str],
+            tiers: Mapping[str, Mapping[str, str]],
+            key_tiers: Mapping[str, str],
+    ):
+        base = {scope: Rate.parse(text) for scope, text in defaults.items()}
+        base.update({scope: Rate.parse(text) for scope, text in tiers.get(RATE_LIMIT_DEFAULT_TIER, {}).items()})
+        self._tiers: Dict[str, Dict[str, Rate]] = {RATE_LIMIT_DEFAULT_TIER: base}
+        for tier, limits in tiers.items():
+            if tier != RATE_LIMIT_DEFAULT_TIER:
+                self._tiers[tier] = {**base, **{scope: Rate.parse(text) for scope, text in limits.items()}}
+        self._key_tiers = dict(key_tiers)
+
+    def rate_for(self, api_key: Optional[str], scope: str, tier: Optional[str] = None) -> Rate:
+        if tier is None:
+            tier = self._key_tiers.get(api_key, RATE_LIMIT_DEFAULT_TIER)
+        return self._tiers.get(tier, self._tiers[RATE_LIMIT_DEFAULT_TIER])[scope]
+
+
+class TokenBucketLimiter:
+    """Applies a policy to a bucket store; `enabled = False` lets every request through."""
+
+    def __init__(self, store: BucketStore, policy: RateLimitPolicy, enabled: bool = True):
+        self.store = store
+        self.policy = policy
+        self.enabled = enabled
+
+    def check(self, api_key: Optional[str], scope: str, tier: Optional[str] = None) -> None:
+        """Raise RateLimitExceededError when the key (or tenant) has no token left for this scope."""
+        if not self.enabled:
+            return
+        wait = self.store.take(f"{scope}:{api_key}", self.policy.rate_for(api_key, scope, tier))
+        if wait > 0:
+            raise RateLimitExceededError(retry_after=math.ceil(wait))
+
+    def limit(self, scope: str) -> Callable:
+        """
+        FastAPI dependency enforcing this scope's limit. Authenticated requests draw from their
+        tenant's bucket at the tenant's tier; others from a bucket per API key header.
+        """
+        async def dependency(request: Request) -> None:
+            tenant = getattr(request.state, "tenant", None)
+            if tenant is None:
+                self.check(request.headers.get(API_KEY_HEADER), scope)
+            else:
+                self.check(tenant.tenant_id, scope, tenant.tier)
+        return dependency
+
+
+def build_store(backend: str, path: str, slots: int) -> BucketStore:
+    if backend == RATE_LIMIT_BACKEND_SHARED:
+        return SharedMemoryBucketStore(path, slots)
+    return InMemoryBucketStore()
+
+
+# Process-wide limiter; rate limiting is disabled in test mode (TEST_ENV=true)
+limiter = TokenBucketLimiter(
+    build_store(settings.RATE_LIMIT_BACKEND, settings.RATE_LIMIT_SHARED_PATH, settings.RATE_LIMIT_SHARED_SLOTS),
+    RateLimitPolicy(
+        {RATE_SCOPE_POST_MESSAGE: RATE_LIMIT_POST_MESSAGES, RATE_SCOPE_POST_BATCH: RATE_LIMIT_POST_MESSAGES_BATCH},
+        settings.RATE_LIMIT_TIERS,
+        settings.RATE_LIMIT_API_KEY_TIERS,
+    ),
+    enabled=settings.RATE_LIMIT_ENABLED and not IS_TEST_ENV,
+)
@@ -0,0 +1,198 @@
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.constants import (
+    METRICS_NAMESPACE,
+    METRICS_UNMATCHED_ROUTE,
+    METRICS_HTTP_BUCKETS,
+    METRICS_FAST_BUCKETS,
+)
+
+"""
+Prometheus metrics served in text format by GET /metrics.
+
+Everything lives in a dedicated registry scraped in-process, so no collector or agent is needed.
+Hot-path cost is a perf_counter pair and one histogram observation per timed section; pool and
+cache figures are read from their owners only when /metrics is scraped.
+"""
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template, from the first ASGI event to the end of the response body.",
+    ["method", "route"],
+    namespace=METRICS_NAMESPACE,
+    buckets=METRICS_HTTP_BUCKETS,
+    registry=REGISTRY,
+)
+HTTP_REQUESTS = Counter(
+    "http_requests",
+    "Responses by route template and status code.",
+    ["method", "route", "status"],
+    namespace=METRICS_NAMESPACE,
+    registry=REGISTRY,
+)
+SERVICE_STAGE_SECONDS = Histogram(
+    "service_stage_duration_seconds",
+    "Time spent in each message pipeline stage (validate, filter, metadata), per message.",
+    ["stage"],
+    namespace=METRICS_NAMESPACE,
+    buckets=METRICS_FAST_BUCKETS,
+    registry=REGISTRY,
+)
+REPOSITORY_SECONDS = Histogram(
+    "repository_duration_seconds",
+    "Repository call latency, including the SQLite commit for writes.",
+    ["operation"],
+    namespace=METRICS_NAMESPACE,
+    buckets=METRICS_FAST_BUCKETS,
+    registry=REGISTRY,
+)
+RATE_LIMITED_REQUESTS = Counter(
+    "rate_limited_requests",
+    "Requests rejected by the rate limiter.",
+    ["route"],
+    namespace=METRICS_NAMESPACE,
+    registry=REGISTRY,
+)
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route (e.g. /api/messages/{session_id}), keeping label cardinality bounded."""
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or METRICS_UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route latency and status counters."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._children: Dict[Tuple[str, str], Tuple[object, Dict[int, object]]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._observe(scope, status, time.perf_counter() - start)
+
+    def _observe(self, scope: Scope, status: int, elapsed: float) -> None:
+        key = (scope["method"], route_template(scope))
+        children = self._children.get(key)
+        if children is None:
+            children = self._children[key] = (HTTP_REQUEST_SECONDS.labels(*key), {})
+        histogram, counters = children
+        counter = counters.get(status)
+        if counter is None:
+            counter = counters[status] = HTTP_REQUESTS.labels(key[0], key[1], str(status))
+        histogram.observe(elapsed)
+        counter.inc()
+
+
+class PoolCollector(Collector):
+    """Connection pool gauges of SQLAlchemy engines, read at scrape time."""
+
+    def __init__(self, engines: Dict[str, object]):
+        self.engines = engines
+
+    def collect(self) -> Iterable:
+        checked_out = GaugeMetricFamily(f"{METRICS_NAMESPACE}_db_pool_checked_out", "Connections currently checked out (in use).", labels=["engine"])
+        checked_in = GaugeMetricFamily(f"{METRICS_NAMESPACE}_db_pool_checked_in", "Idle connections kept by the pool.", labels=["engine"])
+        size = GaugeMetricFamily(f"{METRICS_NAMESPACE}_db_pool_size", "Configured pool size.", labels=["engine"])
+        overflow = GaugeMetricFamily(f"{METRICS_NAMESPACE}_db_pool_overflow", "Connections opened beyond the pool size.", labels=["engine"])
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            # Only QueuePool-style pools expose these counters (not StaticPool / SingletonThreadPool)
+            if not hasattr(pool, "checkedout"):
+                continue
+            checked_out.add_metric([name], pool.checkedout())
+            checked_in.add_metric([name], pool.checkedin())
+            size.add_metric([name], pool.size())
+            overflow.add_metric([name], pool.overflow())
+        return [checked_out, checked_in, size, overflow]
+
+
+class CacheCollector(Collector):
+    """Read-cache counters from any object exposing stats() -> CacheStats."""
+
+    def __init__(self, cache: object):
+        self.cache = cache
+
+    def collect(self) -> Iterable:
+        stats = self.cache.stats()
+        prefix = f"{METRICS_NAMESPACE}_message_cache"
+        yield CounterMetricFamily(f"{prefix}_hits", "Pages served from the read cache.", value=stats.hits)
+        yield CounterMetricFamily(f"{prefix}_misses", "Page lookups that went to the repository.", value=stats.misses)
+        yield CounterMetricFamily(f"{prefix}_evictions", "Entries dropped for capacity or expiry.", value=stats.evictions)
+        yield CounterMetricFamily(f"{prefix}_invalidations", "Entries dropped because their session received a message.", value=stats.invalidations)
+        yield GaugeMetricFamily(f"{prefix}_entries", "Entries currently cached.", value=stats.size)
+
+
+class MessageIdFilterCollector(Collector):
+    """Size and hit counters of the message_id Bloom filter, from any object exposing stats()."""
+
+    def __init__(self, id_filter: object):
+        self.id_filter = id_filter
+
+    def collect(self) -> Iterable:
+        stats = self.id_filter.stats()
+        prefix = f"{METRICS_NAMESPACE}_message_id_filter"
+        yield GaugeMetricFamily(f"{prefix}_items", "Message ids added to the filter.", value=stats.items)
+        yield GaugeMetricFamily(f"{prefix}_memory_bytes", "Size of the filter bit array.", value=stats.memory_bytes)
+        yield GaugeMetricFamily(f"{prefix}_estimated_false_positive_rate", "False-positive probability implied by the bits set.", value=stats.estimated_false_positive_rate)
+        yield CounterMetricFamily(f"{prefix}_checks", "Inserted ids tested against the filter.", value=stats.checks)
+        yield CounterMetricFamily(f"{prefix}_probable_duplicates", "Checks answered 'probably stored' and confirmed by a lookup.", value=stats.probable_duplicates)
+        yield CounterMetricFamily(f"{prefix}_false_positives", "Probable duplicates the lookup did not find.", value=stats.false_positives)
+
+
+class HubCollector(Collector):
+    """Live-tail subscribers and delivery counters, from any object exposing stats() -> HubStats."""
+
+    def __init__(self, hub: object):
+        self.hub = hub
+
+    def collect(self) -> Iterable:
+        stats = self.hub.stats()
+        prefix = f"{METRICS_NAMESPACE}_message_hub"
+        yield GaugeMetricFamily(f"{prefix}_subscribers", "Open live-tail subscriptions (SSE and WebSocket).", value=stats.subscribers)
+        yield GaugeMetricFamily(f"{prefix}_sessions", "Sessions with at least one subscriber.", value=stats.sessions)
+        yield CounterMetricFamily(f"{prefix}_published", "Stored messages offered to the hub.", value=stats.published)
+        yield CounterMetricFamily(f"{prefix}_delivered", "Messages handed to subscribers (one per subscriber).", value=stats.delivered)
+        yield CounterMetricFamily(f"{prefix}_evictions", "Subscribers disconnected for falling behind.", value=stats.evictions)
+
+
+_registered: Dict[str, Collector] = {}
+
+
+def register_collector(name: str, collector: Collector) -> None:
+    """Register a scrape-time collector once; re-registering a name replaces the previous one."""
+    previous: Optional[Collector] = _registered.pop(name, None)
+    if previous is not None:
+        REGISTRY.unregister(previous)
+    REGISTRY.register(collector)
+    _registered[name] = collector
+
+
+def metrics_response() -> Response:
+    """Render the registry in the Prometheus text exposition format."""
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
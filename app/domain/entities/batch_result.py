@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from app.domain.entities.message import Message
+
+@dataclass
+class BatchItemResult:
+    """
+    Outcome of a single entry of a batch ingest request.
+    Holds the stored message when it was created, or the error code explaining why it was rejected.
+    """
+    index: int
+    message_id: str
+    status: str
+    message: Optional[Message] = None
+    error_code: Optional[str] = None
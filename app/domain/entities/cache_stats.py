@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+@dataclass
+class CacheStats:
+    """
+    Counters of a message read cache since it was created.
+    `evictions` counts entries dropped for capacity or expiry, not explicit invalidations.
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    size: int = 0
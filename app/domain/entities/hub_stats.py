@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+@dataclass
+class HubStats:
+    """
+    Subscribers and counters of a live-tail hub since it was created.
+    `delivered` counts messages handed to subscribers (one per subscriber); `evictions` counts
+    subscribers disconnected because their buffer was full.
+    """
+    subscribers: int = 0
+    sessions: int = 0
+    published: int = 0
+    delivered: int = 0
+    evictions: int = 0
@@ -1,16 +1,56 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Any, Dict, Optional
 
-@dataclass
+from app.core.constants import METADATA_FIELDS
+
+@dataclass(slots=True)
+class MessageMetadata:
+    """Fixed-shape metadata generated for every processed message."""
+    word_count: int
+    character_count: int
+    processed_at: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            METADATA_FIELDS["WORD_COUNT"]: self.word_count,
+            METADATA_FIELDS["CHAR_COUNT"]: self.character_count,
+            METADATA_FIELDS["PROCESSED_AT"]: self.processed_at,
+        }
+
+    @staticmethod
+    def from_dict(values: Optional[Dict[str, Any]]) -> Optional["MessageMetadata"]:
+        """Build metadata from its stored JSON form (None stays None)."""
+        if values is None:
+            return None
+        return MessageMetadata(
+            word_count=values[METADATA_FIELDS["WORD_COUNT"]],
+            character_count=values[METADATA_FIELDS["CHAR_COUNT"]],
+            processed_at=values[METADATA_FIELDS["PROCESSED_AT"]],
+        )
+
+
+@dataclass(slots=True)
 class Message:
     """
     Domain entity representing a processed chat message.
     Includes unique identifiers, message content, sender details, and optional metadata.
+    Slotted (no per-instance __dict__) to keep large exports and caches compact.
     """
     message_id: str
     session_id: str
     content: str
     timestamp: datetime
     sender : str
-    metadata: Optional[Dict] = None
\ No newline at end of file
+    metadata: Optional[MessageMetadata] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the message, with metadata as a dict (the MessageOut shape)."""
+        return {
+            "message_id": self.message_id,
+            "session_id": self.session_id,
+            "content": self.content,
+            "timestamp": self.timestamp,
+            "sender": self.sender,
+            "metadata": self.metadata.to_dict() if self.metadata is not None else None,
+        }
@@ -0,0 +1,13 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from app.domain.entities.message import Message
+
+@dataclass
+class MessagePage:
+    """
+    One page of messages of a session.
+    `next_cursor` is an opaque token for the following page, or None when this is the last one.
+    """
+    messages: List[Message] = field(default_factory=list)
+    next_cursor: Optional[str] = None
@@ -0,0 +1,17 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict
+
+@dataclass
+class SessionStats:
+    """
+    Aggregates of a session, maintained incrementally as messages are stored.
+    `senders` maps each sender to its number of messages.
+    """
+    session_id: str
+    message_count: int
+    word_count: int
+    character_count: int
+    first_timestamp: datetime
+    last_timestamp: datetime
+    senders: Dict[str, int] = field(default_factory=dict)
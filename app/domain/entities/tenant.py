@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass(frozen=True, slots=True)
+class Tenant:
+    """
+    Owner of an API key, attached to `request.state.tenant` once the key is verified.
+    `tier` selects the tenant's rate limits; None uses the default tier.
+    """
+    tenant_id: str
+    tier: Optional[str] = None
@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from typing import Hashable, Optional
+from app.domain.entities.cache_stats import CacheStats
+from app.domain.entities.message_page import MessagePage
+
+class MessageCache(ABC):
+    """
+    Abstract read cache for pages of a session.
+    Keys are opaque tuples built by the service; every key belongs to exactly one session so that
+    all pages of a session can be dropped at once when a new message lands in it.
+    """
+    @abstractmethod # pragma: no cover
+    def get(self, session_id: str, key: Hashable) -> Optional[MessagePage]:
+        """Return the cached page, or None when it is missing or expired."""
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    def generation(self, session_id: str) -> int:
+        """
+        Version token of a session; it changes with every invalidation of that session.
+        Read it before querying the repository and pass it to `put`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    def put(self, session_id: str, key: Hashable, page: MessagePage, generation: int) -> None:
+        """Store a page, unless the session was invalidated since `generation` was read (the page may be stale)."""
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    def invalidate_session(self, session_id: str) -> None:
+        """Drop every cached page of a session."""
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the hit/miss/eviction counters."""
+        raise NotImplementedError
@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+from typing import List
+from app.domain.entities.hub_stats import HubStats
+from app.domain.entities.message import Message
+
+class MessageHub(ABC):
+    """
+    Abstract fan-out of newly stored messages to the live subscribers of their session.
+    Publishing never blocks on subscribers and never fails the write that triggered it.
+    """
+    @abstractmethod # pragma: no cover
+    def publish(self, messages: List[Message]) -> None:
+        """Hand committed messages to the current subscribers of their sessions."""
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    def stats(self) -> HubStats:
+        """Return a snapshot of the subscriber gauges and delivery counters."""
+        raise NotImplementedError
@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, Iterator, List, Optional
+from app.core.constants import SORT_TIME, EXPORT_BATCH_SIZE
 from app.domain.entities.message import Message
+from app.domain.entities.message_page import MessagePage
+from app.domain.entities.session_stats import SessionStats
 
 class MessageRepository(ABC):
     """
@@ -11,8 +14,87 @@ class MessageRepository(ABC):
     def save(self, message: Message):
         """Persist a message and return it (may include DB-generated fields)."""
         raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    def save_many(self, messages: List[Message]) -> List[Optional[Message]]:
+        """
+        Persist several messages in a single transaction.
+        Returns one entry per input, in order: the stored message, or None if its message_id already exists.
+        """
+        raise NotImplementedError
     
     @abstractmethod # pragma: no cover
     def get_by_session(self, session_id: str, limit: int, offset: int, sender: Optional[str] = None) -> List[Message]:
         """Fetch messages for a session with optional sender filter and pagination."""
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    def get_page_by_session(self, session_id: str, limit: int, offset: int = 0, sender: Optional[str] = None, cursor: Optional[str] = None, query: Optional[str] = None, sort: str = SORT_TIME) -> MessagePage:
+        """
+        Fetch one page of messages for a session.
+        When `cursor` is given it replaces `offset`: the page starts right after the row the cursor points to.
+        `query` is a full-text search applied before pagination; `sort` is 'time' or 'relevance'.
+        """
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    def iter_by_session(self, session_id: str, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Message]:
+        """
+        Iterate over every message of a session in (timestamp, id) order.
+        Rows are fetched `batch_size` at a time, so memory does not grow with the session.
+        """
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    def get_session_stats(self, session_id: str) -> Optional[SessionStats]:
+        """Return the stored aggregates of a session, or None when it has no messages."""
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    def get_session_version(self, session_id: str) -> int:
+        """
+        Return the session's version: a counter bumped by every insert into the session, 0 when it has none.
+        Must not read the messages themselves; it decides whether a listing changed.
+        """
+        raise NotImplementedError
+
+
+class AsyncMessageRepository(ABC):
+    """
+    Asyncio variant of MessageRepository.
+    Same contract, but every operation is awaited so callers never block the event loop.
+    """
+    @abstractmethod # pragma: no cover
+    async def save(self, message: Message) -> Message:
+        """Persist a message and return it (may include DB-generated fields)."""
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    async def save_many(self, messages: List[Message]) -> List[Optional[Message]]:
+        """Persist several messages in a single transaction; None marks a duplicate message_id."""
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    async def get_by_session(self, session_id: str, limit: int, offset: int, sender: Optional[str] = None) -> List[Message]:
+        """Fetch messages for a session with optional sender filter and pagination."""
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    async def get_page_by_session(self, session_id: str, limit: int, offset: int = 0, sender: Optional[str] = None, cursor: Optional[str] = None, query: Optional[str] = None, sort: str = SORT_TIME) -> MessagePage:
+        """Fetch one page of messages for a session; `cursor` replaces `offset`, `query` is a full-text search."""
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    def iter_by_session(self, session_id: str, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[Message]:
+        """Asynchronously iterate over every message of a session, `batch_size` rows per fetch."""
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    async def get_session_stats(self, session_id: str) -> Optional[SessionStats]:
+        """Return the stored aggregates of a session, or None when it has no messages."""
+        raise NotImplementedError
+
+    @abstractmethod # pragma: no cover
+    async def get_session_version(self, session_id: str) -> int:
+        """Return the session's insert counter (0 when it has no messages)."""
+        raise NotImplementedError
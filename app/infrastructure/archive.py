@@ -0,0 +1,167 @@
+from __future__ import annotations
+import fcntl
+import gzip
+import json
+import os
+import re
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.constants import SORT_TIME
+from app.domain.entities.message_page import MessagePage
+from app.infrastructure.archive_index import ArchivedSessionModel
+from app.infrastructure.message_repository_impl import MessageModel, SQLiteMessageRepository
+from app.infrastructure.pagination import decode_cursor, encode_cursor
+from app.infrastructure.schema import init_db
+
+"""
+Archive of cold sessions in compressed, append-only segment files.
+
+Each archived chunk of a session is one gzip member holding its rows as JSON lines (all columns,
+including the row id, so keyset cursors stay valid) appended to the current segment file, which
+rolls over once it reaches ARCHIVE_SEGMENT_MAX_BYTES. Concatenated gzip members are still a valid
+gzip file, and archived_sessions records the offset and length of every member, so one chunk is
+read back with a single seek. Appends are serialized across processes by a lock file.
+
+Reading an archived session merges its chunks with any messages it received since, then pages in
+memory; full-text queries build a throwaway in-memory FTS index of the session.
+"""
+
+_SEGMENT_PATTERN = re.compile(r"^segment-(\d+)\.jsonl\.gz$")
+_LOCK_FILE = "segments.lock"
+
+# One messages row in table order: id, message_id, session_id, content, timestamp, sender, metadata
+_Row = Tuple[int, str, str, str, datetime, str, Optional[dict]]
+_MESSAGES = MessageModel.__table__
+
+
+def _encode(rows: Sequence[_Row]) -> bytes:
+    lines = [
+        json.dumps([row[0], row[1], row[2], row[3], row[4].isoformat(), row[5], row[6]], separators=(",", ":"))
+        for row in rows
+    ]
+    return gzip.compress(("\n".join(lines) + "\n").encode(), compresslevel=6)
+
+
+def _decode(data: bytes) -> List[_Row]:
+    rows = []
+    for line in gzip.decompress(data).decode().splitlines():
+        row_id, message_id, session_id, content, timestamp, sender, metadata = json.loads(line)
+        rows.append((row_id, message_id, session_id, content, datetime.fromisoformat(timestamp), sender, metadata))
+    return rows
+
+
+def _sort_key(row: _Row) -> Tuple[datetime, int]:
+    return row[4], row[0]
+
+
+class SessionArchive:
+    """Segment files under `directory` plus the read path over them."""
+
+    def __init__(self, directory: str, segment_max_bytes: int):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+
+    def append(self, rows: Sequence[_Row]) -> Tuple[str, int, int]:
+        """Write rows as one gzip member and fsync it; returns (segment name, offset, length)."""
+        data = _encode(rows)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, _LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            segment = self._current_segment()
+            with open(os.path.join(self.directory, segment), "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        return segment, offset, len(data)
+
+    def _current_segment(self) -> str:
+        numbers = [int(m.group(1)) for m in map(_SEGMENT_PATTERN.match, os.listdir(self.directory)) if m]
+        number = max(numbers, default=0)
+        segment = f"segment-{number:06d}.jsonl.gz"
+        path = os.path.join(self.directory, segment)
+        if os.path.exists(path) and os.path.getsize(path) >= self.segment_max_bytes:
+            segment = f"segment-{number + 1:06d}.jsonl.gz"
+        return segment
+
+    def read(self, segment: str, offset: int, length: int) -> List[_Row]:
+        with open(os.path.join(self.directory, segment), "rb") as f:
+            f.seek(offset)
+            return _decode(f.read(length))
+
+    def session_rows(self, db: Session, session_id: str) -> Optional[List[_Row]]:
+        """
+        Every row of an archived session - archived chunks plus hot rows - in (timestamp, id) order.
+        None when the session has no archived chunk (one lookup on the archived_sessions index).
+        """
+        chunks = db.execute(
+            select(ArchivedSessionModel.segment, ArchivedSessionModel.offset, ArchivedSessionModel.length)
+            .where(ArchivedSessionModel.session_id == session_id)
+        ).all()
+        if not chunks:
+            return None
+        rows = [row for chunk in chunks for row in self.read(*chunk)]
+        rows.extend(tuple(row) for row in db.execute(SQLiteMessageRepository.export_statement(session_id)))
+        rows.sort(key=_sort_key)
+        return rows
+
+    def get_page(
+            self,
+            db: Session,
+            session_id: str,
+            limit: int,
+            offset: int = 0,
+            sender: Optional[str] = None,
+            cursor: Optional[str] = None,
+            query: Optional[str] = None,
+            sort: str = SORT_TIME,
+    ) -> Optional[MessagePage]:
+        """
+        Same contract as SQLiteMessageRepository.get_page_by_session; None when the session is not archived.
+        Every call reads and inflates all chunks of the session and pages in memory, so a page of an
+        archived session costs O(session size) rather than O(limit): fine for the rarely read cold
+        sessions retention targets, not for walking a large one page by page.
+        """
+        rows = self.session_rows(db, session_id)
+        if rows is None:
+            return None
+        if query:
+            return _search(rows, session_id, limit, offset, sender, cursor, query, sort)
+
+        if sender:
+            rows = [row for row in rows if row[5] == sender]
+        if cursor:
+            seek = decode_cursor(cursor)
+            rows = [row for row in rows if _sort_key(row) > seek]
+        elif offset:
+            rows = rows[offset:]
+        page = rows[:limit]
+        next_cursor = encode_cursor(page[-1][4], page[-1][0]) if len(rows) > limit and page else None
+        return MessagePage([MessageModel.row_to_domain(row) for row in page], next_cursor)
+
+
+def _search(rows: List[_Row], session_id: str, limit: int, offset: int, sender: Optional[str], cursor: Optional[str], query: str, sort: str) -> MessagePage:
+    """Run a full-text query over one archived session through a temporary in-memory index."""
+    engine = create_engine("sqlite://")
+    try:
+        init_db(engine)
+        db = Session(engine)
+        try:
+            db.execute(insert(_MESSAGES), [dict(zip(_MESSAGES.c.keys(), row)) for row in rows])
+            return SQLiteMessageRepository(db).get_page_by_session(session_id, limit, offset, sender, cursor, query, sort)
+        finally:
+            db.close()
+    finally:
+        engine.dispose()
+
+
+# Process-wide archive; None unless RETENTION_ENABLED is set
+session_archive: Optional[SessionArchive] = (
+    SessionArchive(settings.ARCHIVE_DIR, settings.ARCHIVE_SEGMENT_MAX_BYTES)
+    if settings.RETENTION_ENABLED else None
+)
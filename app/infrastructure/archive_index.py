@@ -0,0 +1,55 @@
+from __future__ import annotations
+from datetime import datetime
+
+from sqlalchemy import String, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infrastructure.database import Base
+from app.core.constants import (
+    DB_TABLE_MESSAGES,
+    DB_TABLE_ARCHIVED_SESSIONS,
+    DB_TABLE_ARCHIVED_MESSAGE_IDS,
+    MESSAGE_ID_MAX_LENGTH,
+    SESSION_ID_MAX_LENGTH,
+)
+
+"""
+Index of the sessions moved out of the messages table into archive segment files.
+
+archived_sessions records where each archived chunk of a session lives (segment file, byte offset
+and length of its gzip member); a session archived again after new messages has several chunks.
+archived_message_ids keeps the ids of archived messages, so a BEFORE INSERT trigger can reject a
+retried id with the same UNIQUE error the messages table raises, without keeping the rows hot.
+"""
+
+
+class ArchivedSessionModel(Base):
+    """SQLAlchemy ORM model of one archived chunk of a session."""
+
+    __tablename__ = DB_TABLE_ARCHIVED_SESSIONS
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    session_id: Mapped[str] = mapped_column(String(SESSION_ID_MAX_LENGTH), index=True, nullable=False)
+    segment: Mapped[str] = mapped_column(String(255), nullable=False)
+    offset: Mapped[int] = mapped_column(Integer, nullable=False)
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
+    message_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class ArchivedMessageIdModel(Base):
+    """message_id of every archived message (a rowid-less B-tree keyed by the id alone)."""
+
+    __tablename__ = DB_TABLE_ARCHIVED_MESSAGE_IDS
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    message_id: Mapped[str] = mapped_column(String(MESSAGE_ID_MAX_LENGTH), primary_key=True)
+
+
+ARCHIVE_DDL = [
+    f"DROP TRIGGER IF EXISTS {DB_TABLE_ARCHIVED_MESSAGE_IDS}_bi",
+    f"""CREATE TRIGGER {DB_TABLE_ARCHIVED_MESSAGE_IDS}_bi BEFORE INSERT ON {DB_TABLE_MESSAGES}
+    WHEN EXISTS (SELECT 1 FROM {DB_TABLE_ARCHIVED_MESSAGE_IDS} WHERE message_id = new.message_id) BEGIN
+        SELECT RAISE(ABORT, 'UNIQUE constraint failed: {DB_TABLE_MESSAGES}.message_id');
+    END""",
+]
@@ -0,0 +1,38 @@
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from app.core.config import settings
+from app.infrastructure.database import to_async_database_url, apply_sqlite_profile, pool_args
+
+"""
+Asyncio counterpart of app.infrastructure.database.
+Used when DATABASE_URL selects an async driver (e.g. 'sqlite+aiosqlite:///./data/chat.db').
+Like the blocking path, writes and reads get separate engines and pools.
+"""
+
+ASYNC_DATABASE_URL = to_async_database_url(settings.DATABASE_URL)
+ASYNC_READ_DATABASE_URL = to_async_database_url(settings.READ_DATABASE_URL or settings.DATABASE_URL)
+
+# Create SQLAlchemy async engines (no connection is opened until first use)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **pool_args(ASYNC_DATABASE_URL, settings.DB_WRITE_POOL_SIZE, settings.DB_WRITE_MAX_OVERFLOW),
+)
+apply_sqlite_profile(async_engine.sync_engine)
+
+async_read_engine = create_async_engine(
+    ASYNC_READ_DATABASE_URL,
+    **pool_args(ASYNC_READ_DATABASE_URL, settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW),
+)
+apply_sqlite_profile(async_read_engine.sync_engine, read_only=True)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    """Yield an async write database session for FastAPI dependency injection."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    """Yield an async read-only database session (read pool) for FastAPI dependency injection."""
+    async with AsyncReadSessionLocal() as db:
+        yield db
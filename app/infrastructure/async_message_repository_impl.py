@@ -0,0 +1,68 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.entities.message import Message
+from app.domain.entities.message_page import MessagePage
+from app.domain.entities.session_stats import SessionStats
+from app.domain.repositories.message_repository import AsyncMessageRepository
+from app.infrastructure.message_repository_impl import MessageModel, SQLiteMessageRepository
+from app.core.constants import SORT_TIME, EXPORT_BATCH_SIZE
+
+if TYPE_CHECKING:  # pragma: no cover
+    from app.infrastructure.message_id_filter import MessageIdFilter
+    from app.infrastructure.archive import SessionArchive
+
+
+class AsyncSQLiteMessageRepository(AsyncMessageRepository):
+    """
+    Async repository implementation for SQLite over aiosqlite.
+
+    Each call runs SQLiteMessageRepository through AsyncSession.run_sync: the ORM code is the
+    same as the blocking repository, but every statement is awaited on the aiosqlite connection,
+    so no threadpool slot is held while SQLite works.
+    """
+
+    def __init__(self, db: AsyncSession, id_filter: Optional["MessageIdFilter"] = None, archive: Optional["SessionArchive"] = None):
+        self.db = db
+        self.id_filter = id_filter
+        self.archive = archive
+
+    async def save(self, message: Message) -> Message:
+        return await self.db.run_sync(lambda session: SQLiteMessageRepository(session, self.id_filter).save(message))
+
+    async def save_many(self, messages: List[Message]) -> List[Optional[Message]]:
+        return await self.db.run_sync(lambda session: SQLiteMessageRepository(session, self.id_filter).save_many(messages))
+
+    async def get_by_session(self, session_id: str, limit: int, offset: int, sender: Optional[str] = None) -> List[Message]:
+        """Retrieve messages for a given session, optionally filtered by sender and paginated."""
+        return await self.db.run_sync(
+            lambda session: SQLiteMessageRepository(session, archive=self.archive).get_by_session(session_id, limit, offset, sender)
+        )
+
+    async def get_page_by_session(self, session_id: str, limit: int, offset: int = 0, sender: Optional[str] = None, cursor: Optional[str] = None, query: Optional[str] = None, sort: str = SORT_TIME) -> MessagePage:
+        """Retrieve one page of a session, using the keyset cursor and full-text query when given."""
+        return await self.db.run_sync(
+            lambda session: SQLiteMessageRepository(session, archive=self.archive).get_page_by_session(session_id, limit, offset, sender, cursor, query, sort)
+        )
+
+    async def get_session_stats(self, session_id: str) -> Optional[SessionStats]:
+        return await self.db.run_sync(lambda session: SQLiteMessageRepository(session).get_session_stats(session_id))
+
+    async def get_session_version(self, session_id: str) -> int:
+        return await self.db.run_sync(lambda session: SQLiteMessageRepository(session).get_session_version(session_id))
+
+    async def iter_by_session(self, session_id: str, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[Message]:
+        """Stream a whole session through AsyncSession.stream, `batch_size` rows per fetch; archived sessions are read whole."""
+        if self.archive is not None:
+            rows = await self.db.run_sync(lambda session: self.archive.session_rows(session, session_id))
+            if rows is not None:
+                for row in rows:
+                    yield MessageModel.row_to_domain(row)
+                return
+        result = await self.db.stream(
+            SQLiteMessageRepository.export_statement(session_id), execution_options={"yield_per": batch_size}
+        )
+        async for row in result:
+            yield MessageModel.row_to_domain(row)
@@ -0,0 +1,72 @@
+import zlib
+from typing import Optional, Union
+
+from sqlalchemy import Text, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+from app.core.constants import CONTENT_COMPRESSION_MARKER, SQL_FUNCTION_DECOMPRESS_CONTENT
+
+"""
+Transparent compression of large message bodies.
+
+Contents of at least CONTENT_COMPRESSION_MIN_BYTES are stored as a BLOB holding a format marker
+followed by their zlib stream; smaller ones (and any that would not shrink) stay plain TEXT.
+SQLite keeps a BLOB as-is in a TEXT column, so both forms live in messages.content and reads tell
+them apart by type: plain text is returned untouched, only compressed values pay for inflating.
+Values stored compressed stay readable whatever the current settings.
+
+The FTS index and the session aggregates are maintained by triggers inside SQLite, so a
+decompress_content() SQL function is registered on every SQLite connection for them to index and
+count the original text. init_db only installs triggers calling it once compression is enabled or a
+compressed row exists; from then on every connection writing to the database needs the function
+(plain sqlite3 clients included), otherwise the triggers read the column directly.
+"""
+
+_Stored = Union[str, bytes]
+
+
+def compress_content(text: str) -> _Stored:
+    """Stored form of a message body under the current settings."""
+    if not settings.CONTENT_COMPRESSION_ENABLED:
+        return text
+    raw = text.encode()
+    if len(raw) < settings.CONTENT_COMPRESSION_MIN_BYTES:
+        return text
+    packed = CONTENT_COMPRESSION_MARKER + zlib.compress(raw, settings.CONTENT_COMPRESSION_LEVEL)
+    return packed if len(packed) < len(raw) else text
+
+
+def decompress_content(value: Optional[_Stored]) -> Optional[str]:
+    """Original text of a stored body (plain or compressed)."""
+    if isinstance(value, bytes):
+        if value.startswith(CONTENT_COMPRESSION_MARKER):
+            return zlib.decompress(value[len(CONTENT_COMPRESSION_MARKER):]).decode()
+        return value.decode()
+    return value
+
+
+def sql_content_text(column: str, compressed: bool) -> str:
+    """SQL expression of the original text of a stored `column`: decompressed only when it may hold compressed values."""
+    return f"{SQL_FUNCTION_DECOMPRESS_CONTENT}({column})" if compressed else column
+
+
+class CompressedText(TypeDecorator):
+    """Text column type applying compress_content on write and decompress_content on read."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return compress_content(value) if value is not None else None
+
+    def process_result_value(self, value, dialect):
+        return decompress_content(value)
+
+
+@event.listens_for(Engine, "connect")
+def _register_sql_functions(dbapi_connection, _connection_record) -> None:
+    # Every engine, including test and maintenance ones: the triggers call the function on any insert
+    if hasattr(dbapi_connection, "create_function"):
+        dbapi_connection.create_function(SQL_FUNCTION_DECOMPRESS_CONTENT, 1, decompress_content, deterministic=True)
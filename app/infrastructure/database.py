@@ -1,27 +1,126 @@
-from sqlalchemy import create_engine
+from typing import List
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
-from app.core.constants import SQLITE_PREFIX, SQLITE_CONNECT_ARGS
+from app.core.constants import SQLITE_PREFIX, SQLITE_ASYNC_PREFIX, SQLITE_CONNECT_ARGS
 
 """
 Infrastructure module responsible for database initialization and session management.
-This defines the SQLAlchemy engine, session factory, and FastAPI dependency for DB access.
+This defines the SQLAlchemy engines, session factories, and FastAPI dependencies for DB access.
+
+Writes and reads use separate engines: a small write pool (SQLite has a single writer, so extra
+write connections would only queue on its lock) and a larger pool of query_only connections,
+optionally on a replica file. Long GET scans therefore never hold a connection a POST needs.
 """
 
-# Create SQLAlchemy engine
+def is_async_database_url(url: str) -> bool:
+    """Return True when the URL selects the asyncio driver (e.g. 'sqlite+aiosqlite:///...')."""
+    return url.startswith(SQLITE_ASYNC_PREFIX)
+
+def to_sync_database_url(url: str) -> str:
+    """Map an asyncio database URL to the equivalent blocking-driver URL."""
+    if is_async_database_url(url):
+        return SQLITE_PREFIX + url[len(SQLITE_ASYNC_PREFIX):]
+    return url
+
+def to_async_database_url(url: str) -> str:
+    """Map a blocking-driver SQLite URL to the equivalent asyncio URL."""
+    if url.startswith(SQLITE_PREFIX) and not is_async_database_url(url):
+        return SQLITE_ASYNC_PREFIX + url[len(SQLITE_PREFIX):]
+    return url
+
+def sqlite_pragmas(read_only: bool = False) -> List[str]:
+    """
+    PRAGMA statements of the SQLite performance profile configured in Settings.
+    Read-only connections leave the journal mode to the writer and refuse writes (query_only).
+    """
+    if read_only:
+        return [
+            "PRAGMA query_only=ON",
+            f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}",
+            f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}",
+            f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}",
+            f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        ]
+    return [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}",
+        f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}",
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+    ]
+
+def apply_sqlite_profile(target: Engine, read_only: bool = False) -> None:
+    """
+    Run the performance profile on every new DBAPI connection of a SQLite engine:
+    WAL lets readers proceed while a writer commits, synchronous=NORMAL syncs at checkpoints
+    instead of on every commit, and the cache/mmap/temp_store settings keep hot pages in memory.
+    For async engines pass `async_engine.sync_engine`.
+    With read_only, connections are switched to query_only even when tuning is disabled.
+    """
+    if target.dialect.name != SQLITE_PREFIX or not (settings.SQLITE_TUNING_ENABLED or read_only):
+        return
+    pragmas = sqlite_pragmas(read_only) if settings.SQLITE_TUNING_ENABLED else ["PRAGMA query_only=ON"]
+
+    @event.listens_for(target, "connect")
+    def _set_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+def pool_args(url: str, pool_size: int, max_overflow: int) -> dict:
+    """Pool sizing for file databases; in-memory SQLite uses a single-connection pool that takes no size."""
+    if url.startswith(SQLITE_PREFIX) and ":memory:" in url:
+        return {}
+    return {"pool_size": pool_size, "max_overflow": max_overflow}
+
+def connect_args(url: str) -> dict:
+    return SQLITE_CONNECT_ARGS if url.startswith(SQLITE_PREFIX) else {}
+
+# Create SQLAlchemy engines.
+# With an async DATABASE_URL these still point at the same files through the blocking driver,
+# so schema creation and maintenance scripts keep working.
+SYNC_DATABASE_URL = to_sync_database_url(settings.DATABASE_URL)
+SYNC_READ_DATABASE_URL = to_sync_database_url(settings.READ_DATABASE_URL or settings.DATABASE_URL)
+
+# Write engine: schema management, inserts and the write-behind writer
 engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args=SQLITE_CONNECT_ARGS if settings.DATABASE_URL.startswith(SQLITE_PREFIX) else {}
+    SYNC_DATABASE_URL,
+    connect_args=connect_args(SYNC_DATABASE_URL),
+    **pool_args(SYNC_DATABASE_URL, settings.DB_WRITE_POOL_SIZE, settings.DB_WRITE_MAX_OVERFLOW),
+)
+apply_sqlite_profile(engine)
+
+# Read engine: query_only connections for GET endpoints
+read_engine = create_engine(
+    SYNC_READ_DATABASE_URL,
+    connect_args=connect_args(SYNC_READ_DATABASE_URL),
+    **pool_args(SYNC_READ_DATABASE_URL, settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW),
 )
+apply_sqlite_profile(read_engine, read_only=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
 def get_db():
-    """Yield a database session for FastAPI dependency injection."""
+    """Yield a write database session for FastAPI dependency injection."""
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def get_read_db():
+    """Yield a read-only database session (read pool) for FastAPI dependency injection."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,74 @@
+import re
+from typing import List, Optional
+
+from sqlalchemy import column, table
+
+from app.core.constants import DB_TABLE_MESSAGES, DB_TABLE_MESSAGES_FTS
+from app.infrastructure.compression import sql_content_text
+
+"""
+SQLite FTS5 full-text index over messages.content.
+
+The index is an external-content table (it stores only the inverted index, not a copy of the text)
+kept in sync by triggers, so every writer - ORM, bulk insert or raw SQL - updates it in the same transaction.
+Bodies may be stored compressed, so the triggers then index decompress_content(content), never the raw column.
+The triggers are dropped and recreated on every start, so changed definitions reach existing databases.
+"""
+
+
+def fts_ddl(compressed: bool) -> List[str]:
+    """Statements creating the index and its triggers; `compressed` makes them index the decompressed text."""
+    text_new = sql_content_text("new.content", compressed)
+    text_old = sql_content_text("old.content", compressed)
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {DB_TABLE_MESSAGES_FTS} USING fts5(
+        content, content='{DB_TABLE_MESSAGES}', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+        f"DROP TRIGGER IF EXISTS {DB_TABLE_MESSAGES_FTS}_ai",
+        f"""CREATE TRIGGER {DB_TABLE_MESSAGES_FTS}_ai AFTER INSERT ON {DB_TABLE_MESSAGES} BEGIN
+        INSERT INTO {DB_TABLE_MESSAGES_FTS}(rowid, content) VALUES (new.id, {text_new});
+    END""",
+        f"DROP TRIGGER IF EXISTS {DB_TABLE_MESSAGES_FTS}_ad",
+        f"""CREATE TRIGGER {DB_TABLE_MESSAGES_FTS}_ad AFTER DELETE ON {DB_TABLE_MESSAGES} BEGIN
+        INSERT INTO {DB_TABLE_MESSAGES_FTS}({DB_TABLE_MESSAGES_FTS}, rowid, content) VALUES ('delete', old.id, {text_old});
+    END""",
+        f"DROP TRIGGER IF EXISTS {DB_TABLE_MESSAGES_FTS}_au",
+        f"""CREATE TRIGGER {DB_TABLE_MESSAGES_FTS}_au AFTER UPDATE OF content ON {DB_TABLE_MESSAGES} BEGIN
+        INSERT INTO {DB_TABLE_MESSAGES_FTS}({DB_TABLE_MESSAGES_FTS}, rowid, content) VALUES ('delete', old.id, {text_old});
+        INSERT INTO {DB_TABLE_MESSAGES_FTS}(rowid, content) VALUES (new.id, {text_new});
+    END""",
+    ]
+
+
+def fts_rebuild(compressed: bool) -> str:
+    """Index rows stored before the FTS table existed ('rebuild' would read the stored, possibly compressed, column)."""
+    return f"""INSERT INTO {DB_TABLE_MESSAGES_FTS}(rowid, content)
+SELECT id, {sql_content_text("content", compressed)} FROM {DB_TABLE_MESSAGES}"""
+
+
+# Lightweight table construct used to query the index from SQLAlchemy
+messages_fts = table(DB_TABLE_MESSAGES_FTS, column("rowid"), column("rank"), column(DB_TABLE_MESSAGES_FTS))
+
+_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r"\w", re.UNICODE)
+
+
+def to_fts_query(text: str) -> Optional[str]:
+    """
+    Translate a user search string into a safe FTS5 MATCH expression.
+    - bare words must all appear (any order, case-insensitive): `hello world`
+    - a trailing `*` makes a word a prefix: `hel*`
+    - double quotes search for an exact phrase: `"hello world"`
+    Every term is quoted, so FTS5 operators and column filters typed by users are treated as text.
+    Returns None when the string contains nothing searchable.
+    """
+    terms = []
+    for phrase, word in _TOKEN_RE.findall(text):
+        raw = phrase if phrase else word
+        prefix = not phrase and raw.endswith("*")
+        raw = raw.rstrip("*") if prefix else raw
+        if not _WORD_RE.search(raw):
+            continue
+        quoted = '"' + raw.replace('"', '""') + '"'
+        terms.append(quoted + "*" if prefix else quoted)
+    return " ".join(terms) if terms else None
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.domain.entities.cache_stats import CacheStats
+from app.domain.entities.message_page import MessagePage
+from app.domain.repositories.message_cache import MessageCache
+
+"""
+In-process LRU + TTL implementation of the message read cache.
+Entries are only visible to the worker process that stored them; a shared implementation
+(e.g. backed by an external key-value store) can be plugged in through the MessageCache port.
+"""
+
+
+class InMemoryMessageCache(MessageCache):
+    """Bounded LRU cache whose entries also expire `ttl_seconds` after they were stored."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[str, float, MessagePage]]" = OrderedDict()
+        self._keys_by_session: Dict[str, Set[Hashable]] = {}
+        # Bumped by every invalidation; a single counter keeps memory bounded at the price of
+        # occasionally skipping a put that raced with a write to another session
+        self._generation = 0
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, key: Hashable) -> Optional[MessagePage]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            if entry[1] <= self.clock():
+                self._remove(key)
+                self._stats.evictions += 1
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry[2]
+
+    def generation(self, session_id: str) -> int:
+        with self._lock:
+            return self._generation
+
+    def put(self, session_id: str, key: Hashable, page: MessagePage, generation: int) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if self._generation != generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (session_id, self.clock() + self.ttl, page)
+            self._keys_by_session.setdefault(session_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def invalidate_session(self, session_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in self._keys_by_session.pop(session_id, set()):
+                del self._entries[key]
+                self._stats.invalidations += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                invalidations=self._stats.invalidations,
+                size=len(self._entries),
+            )
+
+    def _remove(self, key: Hashable) -> None:
+        session_id = self._entries.pop(key)[0]
+        keys = self._keys_by_session[session_id]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_session[session_id]
+
+
+# Process-wide cache; the routers only use it when MESSAGE_CACHE_ENABLED is set
+message_cache = InMemoryMessageCache(
+    max_entries=settings.MESSAGE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.MESSAGE_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,170 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.errors import TooManySubscribersError
+from app.domain.entities.hub_stats import HubStats
+from app.domain.entities.message import Message
+from app.domain.repositories.message_hub import MessageHub
+
+"""
+In-process implementation of the live-tail hub.
+
+Subscribers are plain objects owned by the event loop that serves their connection, so an idle
+SSE stream or WebSocket costs one buffer and one asyncio.Event - no thread and no database query.
+Writes are published from threadpool workers (sync routes) or from the event loop (async routes):
+the hub only looks up the session's channel under a lock and schedules the delivery on each
+subscriber's loop with call_soon_threadsafe, so a publish never waits on a subscriber.
+
+A subscriber whose buffer would exceed its bound is evicted - removed from its channel and ended -
+rather than slowing the writer or growing without limit; it is expected to reload the session and
+subscribe again. Only messages stored by this worker process are seen.
+"""
+
+_Delivery = Tuple["Subscription", List[Message]]
+
+
+class Subscription:
+    """One subscriber's bounded buffer, filled on its event loop and drained by its connection handler."""
+
+    __slots__ = ("session_id", "loop", "max_buffer", "closed", "evicted", "_buffer", "_ready")
+
+    def __init__(self, session_id: str, loop: asyncio.AbstractEventLoop, max_buffer: int):
+        self.session_id = session_id
+        self.loop = loop
+        self.max_buffer = max_buffer
+        self.closed = False
+        self.evicted = False
+        self._buffer: Deque[Message] = deque()
+        self._ready = asyncio.Event()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[List[Message]]:
+        """
+        Messages published since the last call, waiting up to `timeout` seconds ([] if none came).
+        None once the subscription has ended: unsubscribed, or evicted as a slow consumer (see `evicted`).
+        """
+        if not self._buffer and not self.closed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        if self.closed:
+            return None
+        batch = list(self._buffer)
+        self._buffer.clear()
+        return batch
+
+    def _push(self, messages: List[Message]) -> bool:
+        """Buffer messages (on the subscriber's loop); False when they do not fit."""
+        if len(self._buffer) + len(messages) > self.max_buffer:
+            return False
+        self._buffer.extend(messages)
+        self._ready.set()
+        return True
+
+    def _close(self) -> None:
+        self.closed = True
+        self._buffer.clear()
+        self._ready.set()
+
+
+class InProcessMessageHub(MessageHub):
+    """Per-session channels of subscriptions, with bounded buffers and at most `max_subscribers` at once."""
+
+    def __init__(self, subscriber_buffer: int, max_subscribers: int):
+        self.subscriber_buffer = subscriber_buffer
+        self.max_subscribers = max_subscribers
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self._subscribers = 0
+        self._stats = HubStats()
+        self._lock = threading.Lock()
+
+    def subscribe(self, session_id: str) -> Subscription:
+        """Open a subscription drained by the running event loop; raises TooManySubscribersError at the limit."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._subscribers >= self.max_subscribers:
+                raise TooManySubscribersError()
+            subscription = Subscription(session_id, loop, self.subscriber_buffer)
+            self._channels.setdefault(session_id, set()).add(subscription)
+            self._subscribers += 1
+        return subscription
+
+    def full(self) -> bool:
+        """Whether subscribe would be refused right now (a hint: another subscriber may take the last slot)."""
+        with self._lock:
+            return self._subscribers >= self.max_subscribers
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """End a subscription; called from its own event loop (idempotent)."""
+        with self._lock:
+            self._remove(subscription)
+        subscription._close()
+
+    def publish(self, messages: List[Message]) -> None:
+        deliveries: Dict[asyncio.AbstractEventLoop, List[_Delivery]] = {}
+        with self._lock:
+            self._stats.published += len(messages)
+            if not self._channels:
+                return
+            by_session: Dict[str, List[Message]] = {}
+            for message in messages:
+                by_session.setdefault(message.session_id, []).append(message)
+            for session_id, session_messages in by_session.items():
+                for subscription in self._channels.get(session_id, ()):
+                    deliveries.setdefault(subscription.loop, []).append((subscription, session_messages))
+
+        for loop, items in deliveries.items():
+            try:
+                loop.call_soon_threadsafe(self._deliver, items)
+            except RuntimeError:
+                # The loop is closed, and with it every connection it served
+                with self._lock:
+                    for subscription, _ in items:
+                        self._remove(subscription)
+
+    def _deliver(self, items: List[_Delivery]) -> None:
+        """Runs on the subscribers' event loop."""
+        delivered = 0
+        evicted = []
+        for subscription, messages in items:
+            if subscription.closed:
+                continue
+            if subscription._push(messages):
+                delivered += len(messages)
+            else:
+                subscription.evicted = True
+                subscription._close()
+                evicted.append(subscription)
+        with self._lock:
+            self._stats.delivered += delivered
+            self._stats.evictions += len(evicted)
+            for subscription in evicted:
+                self._remove(subscription)
+
+    def _remove(self, subscription: Subscription) -> None:
+        """Drop a subscription from its channel (lock held)."""
+        channel = self._channels.get(subscription.session_id)
+        if channel is None or subscription not in channel:
+            return
+        channel.remove(subscription)
+        if not channel:
+            del self._channels[subscription.session_id]
+        self._subscribers -= 1
+
+    def stats(self) -> HubStats:
+        with self._lock:
+            return HubStats(
+                subscribers=self._subscribers,
+                sessions=len(self._channels),
+                published=self._stats.published,
+                delivered=self._stats.delivered,
+                evictions=self._stats.evictions,
+            )
+
+
+# Process-wide hub shared by every route of this worker
+message_hub = InProcessMessageHub(settings.STREAM_SUBSCRIBER_BUFFER, settings.STREAM_MAX_SUBSCRIBERS)
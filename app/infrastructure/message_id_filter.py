@@ -0,0 +1,141 @@
+from __future__ import annotations
+import hashlib
+import math
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.infrastructure.message_repository_impl import MessageModel
+from app.infrastructure.archive_index import ArchivedMessageIdModel
+
+"""
+Bloom filter over stored message_ids, used to reject retried inserts without a write transaction.
+
+A negative answer is definite: the id was never added, so the insert is attempted directly with no
+pre-check. A positive answer only means "probably stored" and is confirmed by an indexed lookup
+before the repository decides. The filter never replaces the UNIQUE constraint: ids stored by
+another worker process are missing from this process's filter and simply take the normal insert
+path, and ids deleted from the database stay in the filter and cost one extra lookup.
+"""
+
+# Ids read per round trip while the filter is built
+_BUILD_BATCH_SIZE = 10000
+
+
+@dataclass
+class MessageIdFilterStats:
+    """
+    Size and counters of a message_id filter since it was built.
+    `estimated_false_positive_rate` follows from the fraction of bits set; `false_positives`
+    counts probable duplicates whose confirming lookup found nothing.
+    """
+    items: int = 0
+    memory_bytes: int = 0
+    hash_count: int = 0
+    estimated_false_positive_rate: float = 0.0
+    checks: int = 0
+    probable_duplicates: int = 0
+    false_positives: int = 0
+
+
+class MessageIdFilter:
+    """Thread-safe Bloom filter sized for `capacity` ids at `error_rate` false positives."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        """Optimal bit and hash counts: m = -n ln p / (ln 2)^2, k = m / n ln 2."""
+        self.capacity = max(capacity, 1)
+        self.bit_count = max(8, math.ceil(-self.capacity * math.log(self.error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / self.capacity * math.log(2)))
+        self._bits = bytearray((self.bit_count + 7) // 8)
+        self._items = 0
+        self._checks = 0
+        self._probable = 0
+        self._false_positives = 0
+
+    def _positions(self, message_id: str) -> Iterable[int]:
+        """k bit positions by double hashing two 64-bit halves of one blake2b digest."""
+        digest = hashlib.blake2b(message_id.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bit_count for i in range(self.hash_count)]
+
+    def add(self, message_id: str) -> None:
+        positions = self._positions(message_id)
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self._items += 1
+
+    def add_many(self, message_ids: Iterable[str]) -> None:
+        for message_id in message_ids:
+            self.add(message_id)
+
+    def might_contain(self, message_id: str) -> bool:
+        """False when the id was definitely never added; True when it probably was."""
+        positions = self._positions(message_id)
+        bits = self._bits
+        found = all(bits[position >> 3] & (1 << (position & 7)) for position in positions)
+        with self._lock:
+            self._checks += 1
+            self._probable += found
+        return found
+
+    def record_false_positives(self, count: int = 1) -> None:
+        """Called when the confirming lookup of `count` probable duplicates found nothing."""
+        with self._lock:
+            self._false_positives += count
+
+    def build(self, engines: Iterable[Engine]) -> int:
+        """
+        Replace the contents with every message_id stored (or archived) behind `engines`; returns the number of ids.
+        The filter is resized to hold at least twice the stored ids at the configured error rate; the
+        size comes from counting the rows, then the ids are streamed in batches and never held at once.
+        """
+        engines = list(engines)
+        stored = 0
+        for engine in engines:
+            with engine.connect() as conn:
+                stored += conn.execute(select(func.count()).select_from(MessageModel)).scalar_one()
+                stored += conn.execute(select(func.count()).select_from(ArchivedMessageIdModel)).scalar_one()
+        with self._lock:
+            self._allocate(max(self.capacity, 2 * stored))
+
+        added = 0
+        for engine in engines:
+            with engine.connect() as conn:
+                result = conn.execution_options(yield_per=_BUILD_BATCH_SIZE).execute(
+                    select(MessageModel.message_id).union_all(select(ArchivedMessageIdModel.message_id))
+                )
+                for batch in result.scalars().partitions():
+                    self.add_many(batch)
+                    added += len(batch)
+        return added
+
+    def stats(self) -> MessageIdFilterStats:
+        with self._lock:
+            bits_set = int.from_bytes(self._bits, "little").bit_count()
+            return MessageIdFilterStats(
+                items=self._items,
+                memory_bytes=len(self._bits),
+                hash_count=self.hash_count,
+                estimated_false_positive_rate=(bits_set / self.bit_count) ** self.hash_count,
+                checks=self._checks,
+                probable_duplicates=self._probable,
+                false_positives=self._false_positives,
+            )
+
+
+# Process-wide filter, built on startup; None unless MESSAGE_ID_FILTER_ENABLED is set
+message_id_filter: Optional[MessageIdFilter] = (
+    MessageIdFilter(settings.MESSAGE_ID_FILTER_CAPACITY, settings.MESSAGE_ID_FILTER_ERROR_RATE)
+    if settings.MESSAGE_ID_FILTER_ENABLED else None
+)
@@ -1,31 +1,54 @@
 from __future__ import annotations
-from typing import List, Optional
+from typing import TYPE_CHECKING, Iterator, List, Optional
 from datetime import datetime
 
-from sqlalchemy import String, Text, DateTime, JSON, select
+from sqlalchemy import String, DateTime, JSON, Index, Row, Select, bindparam, func, lambda_stmt, select, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Mapped, mapped_column, Session
 from sqlalchemy.exc import IntegrityError
 
 from app.infrastructure.database import Base
-from app.domain.entities.message import Message
+from app.domain.entities.message import Message, MessageMetadata
+from app.domain.entities.message_page import MessagePage
+from app.domain.entities.session_stats import SessionStats
 from app.domain.repositories.message_repository import MessageRepository
-from app.core.errors import DuplicateMessageIdError
+from app.core.errors import DuplicateMessageIdError, InvalidCursorError
+from app.core.metrics import REPOSITORY_SECONDS
+from app.infrastructure.pagination import encode_cursor, decode_cursor
+from app.infrastructure.fts import messages_fts, to_fts_query
+from app.infrastructure.session_stats import SessionStatsModel
+from app.infrastructure.archive_index import ArchivedMessageIdModel
+from app.infrastructure.compression import CompressedText
 from app.core.constants import (
     DB_TABLE_MESSAGES,
+    DB_INDEX_MESSAGES_SESSION_TIMESTAMP_ID,
     MESSAGE_ID_MAX_LENGTH,
     SESSION_ID_MAX_LENGTH,
     SENDER_MAX_LENGTH,
+    DB_TABLE_MESSAGES_FTS,
+    SORT_TIME,
+    SORT_RELEVANCE,
+    EXPORT_BATCH_SIZE,
 )
 
+if TYPE_CHECKING:  # pragma: no cover
+    from app.infrastructure.message_id_filter import MessageIdFilter
+    from app.infrastructure.archive import SessionArchive
+
 class MessageModel(Base):
     """SQLAlchemy ORM model mapping the 'messages' table to the domain Message entity."""
 
     __tablename__ = DB_TABLE_MESSAGES
+    # Serves session listings in sort order, so keyset pages and deep pages avoid a temp B-tree
+    __table_args__ = (
+        Index(DB_INDEX_MESSAGES_SESSION_TIMESTAMP_ID, "session_id", "timestamp", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     message_id: Mapped[str] = mapped_column(String(MESSAGE_ID_MAX_LENGTH), unique=True, index=True, nullable=False)
-    session_id: Mapped[str] = mapped_column(String(SESSION_ID_MAX_LENGTH), index=True, nullable=False)
-    content: Mapped[str] = mapped_column(Text, nullable=False)
+    session_id: Mapped[str] = mapped_column(String(SESSION_ID_MAX_LENGTH), nullable=False)
+    # Plain TEXT, or a compressed BLOB for large bodies when CONTENT_COMPRESSION_ENABLED is set
+    content: Mapped[str] = mapped_column(CompressedText, nullable=False)
     timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     sender: Mapped[str] = mapped_column(String(SENDER_MAX_LENGTH), nullable=False)
 
@@ -40,7 +63,7 @@ class MessageModel(Base):
             content=self.content,
             timestamp=self.timestamp,
             sender=self.sender,
-            metadata=self.metadata_json,
+            metadata=MessageMetadata.from_dict(self.metadata_json),
         )
 
     @staticmethod
@@ -52,32 +75,246 @@ class MessageModel(Base):
             content=m.content,
             timestamp=m.timestamp,
             sender=m.sender,
-            metadata_json=m.metadata,
+            metadata_json=m.metadata.to_dict() if m.metadata is not None else None,
         )
 
+    @staticmethod
+    def row_from_domain(m: Message) -> dict:
+        """Convert domain Message entity to a plain column mapping for Core bulk inserts."""
+        return {
+            "message_id": m.message_id,
+            "session_id": m.session_id,
+            "content": m.content,
+            "timestamp": m.timestamp,
+            "sender": m.sender,
+            "metadata": m.metadata.to_dict() if m.metadata is not None else None,
+        }
+
+    @staticmethod
+    def row_to_domain(row: Row) -> Message:
+        """
+        Convert a Core row of the messages table (all columns, table order) to a domain Message entity.
+        Rows are plain tuples: no ORM identity map or attribute instrumentation is involved.
+        """
+        _, message_id, session_id, content, timestamp, sender, metadata = row
+        return Message(message_id, session_id, content, timestamp, sender, MessageMetadata.from_dict(metadata))
+
+
+
+_MESSAGES = MessageModel.__table__
+_FTS_DOCUMENT = messages_fts.c[DB_TABLE_MESSAGES_FTS]
+
 
 class SQLiteMessageRepository(MessageRepository):
     """Concrete repository implementation for SQLite using SQLAlchemy."""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, id_filter: Optional["MessageIdFilter"] = None, archive: Optional["SessionArchive"] = None):
         self.db = db
+        # Optional Bloom filter of stored message_ids; when set, only probable duplicates are looked up
+        self.id_filter = id_filter
+        # Optional archive of cold sessions; when set, reads of archived sessions include their archived messages
+        self.archive = archive
 
+    @REPOSITORY_SECONDS.labels(operation="save").time()
     def save(self, message: Message) -> Message:
+        if self.id_filter is not None and self.id_filter.might_contain(message.message_id):
+            if self._stored_ids([message.message_id]):
+                self.db.rollback()
+                raise DuplicateMessageIdError()
+            self.id_filter.record_false_positives()
+
         model = MessageModel.from_domain(message)
         try:
             self.db.add(model)
             self.db.commit()
             self.db.refresh(model)
-            return model.to_domain()
         except IntegrityError:
             self.db.rollback()
             raise DuplicateMessageIdError()
+        if self.id_filter is not None:
+            self.id_filter.add(message.message_id)
+        return model.to_domain()
+
+    @REPOSITORY_SECONDS.labels(operation="save_many").time()
+    def save_many(self, messages: List[Message]) -> List[Optional[Message]]:
+        """
+        Insert all new messages with a single bulk statement and one commit.
+        Duplicates (already stored or repeated within the batch) are skipped and reported as None.
+        """
+        if not messages:
+            return []
+
+        ids = [m.message_id for m in messages]
+        if self.id_filter is not None:
+            # Ids the filter has never seen are new: only the probable duplicates need the lookup
+            ids = [message_id for message_id in ids if self.id_filter.might_contain(message_id)]
+        seen = self._stored_ids(ids) if ids else set()
+        if self.id_filter is not None:
+            self.id_filter.record_false_positives(len(set(ids)) - len(seen))
+
+        results: List[Optional[Message]] = []
+        rows = []
+        for m in messages:
+            if m.message_id in seen:
+                results.append(None)
+                continue
+            seen.add(m.message_id)
+            rows.append(MessageModel.row_from_domain(m))
+            results.append(m)
+
+        if rows:
+            stmt = sqlite_insert(MessageModel.__table__).on_conflict_do_nothing(
+                index_elements=[MessageModel.message_id]
+            )
+            try:
+                inserted = self.db.execute(stmt, rows).rowcount
+            except IntegrityError:
+                # An archived id the check skipped (the filter predates it): the archived-ids trigger
+                # aborts the whole statement, since ON CONFLICT DO NOTHING does not cover RAISE.
+                inserted = None
+            if inserted != len(rows):
+                # A concurrent writer stored some of these ids after the existence check:
+                # replay row by row so each conflict is attributed to the right message.
+                self.db.rollback()
+                stored = {row["message_id"] for row in rows if self._insert_row(stmt, row)}
+                results = [m if m is not None and m.message_id in stored else None for m in results]
+            self.db.commit()
+            if self.id_filter is not None:
+                self.id_filter.add_many(m.message_id for m in results if m is not None)
+        return results
+
+    def _insert_row(self, stmt, row: dict) -> bool:
+        """Insert one row in its own savepoint; False when its id is taken by a hot or an archived message."""
+        try:
+            with self.db.begin_nested():
+                return self.db.execute(stmt, row).rowcount == 1
+        except IntegrityError:
+            return False
+
+    def _stored_ids(self, ids: List[str]) -> set:
+        """The given ids that are already taken, by a hot or an archived message (two indexed lookups)."""
+        return set(self.db.execute(
+            select(MessageModel.message_id).where(MessageModel.message_id.in_(ids)).union_all(
+                select(ArchivedMessageIdModel.message_id).where(ArchivedMessageIdModel.message_id.in_(ids))
+            )
+        ).scalars())
 
     def get_by_session(self, session_id: str, limit: int, offset: int, sender: Optional[str] = None) -> List[Message]:
-        """Retrieve messages for a given session, optionally filtered by sender and paginated."""
-        stmt = select(MessageModel).where(MessageModel.session_id == session_id)
+        """
+        Retrieve messages for a given session, optionally filtered by sender and paginated.
+        Not timed itself: the call is observed once, as get_page_by_session.
+        """
+        return self.get_page_by_session(session_id, limit, offset, sender).messages
+
+    @REPOSITORY_SECONDS.labels(operation="get_page_by_session").time()
+    def get_page_by_session(
+            self,
+            session_id: str,
+            limit: int,
+            offset: int = 0,
+            sender: Optional[str] = None,
+            cursor: Optional[str] = None,
+            query: Optional[str] = None,
+            sort: str = SORT_TIME,
+    ) -> MessagePage:
+        """
+        Retrieve one page of a session ordered by (timestamp, id).
+        With a cursor the page is located by a keyset seek on the composite index, so deep pages
+        cost the same as the first one; without it the legacy offset is applied.
+        `query` is matched against the FTS5 index before LIMIT/OFFSET; with sort='relevance'
+        matches are ranked by bm25 and paginated by offset only.
+        Sessions with archived messages are served by the archive, with the same ordering and cursors.
+        """
+        if self.archive is not None:
+            archived = self.archive.get_page(self.db, session_id, limit, offset, sender, cursor, query, sort)
+            if archived is not None:
+                return archived
+
+        # Core projection built as lambda statements: rows come back as plain tuples, and both the
+        # statement construction and its compiled SQL are cached per code path, not rebuilt per call.
+        stmt = lambda_stmt(lambda: select(_MESSAGES).where(_MESSAGES.c.session_id == session_id))
         if sender:
-            stmt = stmt.where(MessageModel.sender == sender)
-        stmt = stmt.order_by(MessageModel.timestamp.asc()).offset(offset).limit(limit)
-        rows = self.db.execute(stmt).scalars().all()
-        return [row.to_domain() for row in rows]
+            stmt += lambda s: s.where(_MESSAGES.c.sender == sender)
+
+        if query:
+            match = to_fts_query(query)
+            if match is None:
+                return MessagePage()
+            if sort == SORT_RELEVANCE:
+                if cursor:
+                    raise InvalidCursorError()
+                stmt += lambda s: (
+                    s.join(messages_fts, messages_fts.c.rowid == _MESSAGES.c.id)
+                    .where(_FTS_DOCUMENT.op("MATCH")(match))
+                    .order_by(messages_fts.c.rank, _MESSAGES.c.id)
+                    .offset(offset)
+                    .limit(limit)
+                )
+                return MessagePage([MessageModel.row_to_domain(row) for row in self.db.execute(stmt)])
+            stmt += lambda s: s.where(_MESSAGES.c.id.in_(
+                select(messages_fts.c.rowid).where(_FTS_DOCUMENT.op("MATCH")(match))
+            ))
+
+        if cursor:
+            timestamp, row_id = decode_cursor(cursor)
+            seek = tuple_(
+                bindparam("cursor_timestamp", timestamp, type_=_MESSAGES.c.timestamp.type),
+                bindparam("cursor_id", row_id, type_=_MESSAGES.c.id.type),
+            )
+            stmt += lambda s: s.where(tuple_(_MESSAGES.c.timestamp, _MESSAGES.c.id) > seek)
+        elif offset:
+            stmt += lambda s: s.offset(offset)
+        # Fetch one extra row to know whether a next page exists
+        fetch = limit + 1
+        stmt += lambda s: s.order_by(_MESSAGES.c.timestamp.asc(), _MESSAGES.c.id.asc()).limit(fetch)
+        rows = self.db.execute(stmt).all()
+
+        page = rows[:limit]
+        next_cursor = encode_cursor(page[-1].timestamp, page[-1].id) if len(rows) > limit and page else None
+        return MessagePage([MessageModel.row_to_domain(row) for row in page], next_cursor)
+
+    @REPOSITORY_SECONDS.labels(operation="get_session_stats").time()
+    def get_session_stats(self, session_id: str) -> Optional[SessionStats]:
+        """Read the aggregates kept by the session_stats trigger (one row per sender)."""
+        rows = self.db.execute(
+            select(SessionStatsModel).where(SessionStatsModel.session_id == session_id)
+        ).scalars().all()
+        return SessionStatsModel.to_domain(session_id, rows)
+
+    @REPOSITORY_SECONDS.labels(operation="get_session_version").time()
+    def get_session_version(self, session_id: str) -> int:
+        """
+        The session's total message count in session_stats: the insert trigger bumps it in the same
+        transaction as every insert and nothing decrements it (archiving keeps the stats), so it is a
+        monotonic version read from at most one row per sender, without touching the messages table.
+        """
+        return self.db.execute(
+            select(func.coalesce(func.sum(SessionStatsModel.message_count), 0))
+            .where(SessionStatsModel.session_id == session_id)
+        ).scalar_one()
+
+    def iter_by_session(self, session_id: str, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Message]:
+        """
+        Stream a whole session with a server-side cursor.
+        Plain Core rows are fetched `batch_size` at a time (yield_per), skipping the ORM identity map,
+        so memory stays flat regardless of the session size.
+        Archived sessions are read back whole from the archive.
+        """
+        if self.archive is not None:
+            rows = self.archive.session_rows(self.db, session_id)
+            if rows is not None:
+                yield from map(MessageModel.row_to_domain, rows)
+                return
+        result = self.db.execute(self.export_statement(session_id), execution_options={"yield_per": batch_size})
+        for row in result:
+            yield MessageModel.row_to_domain(row)
+
+    @staticmethod
+    def export_statement(session_id: str) -> Select:
+        """Core SELECT of all columns of a session, in (timestamp, id) order; shared with the async repository."""
+        table = MessageModel.__table__
+        return (
+            select(table)
+            .where(table.c.session_id == session_id)
+            .order_by(table.c.timestamp.asc(), table.c.id.asc())
+        )
@@ -0,0 +1,32 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from typing import Tuple
+
+from app.core.errors import InvalidCursorError
+
+"""
+Opaque keyset cursors for message listings.
+A cursor encodes the sort key (timestamp, id) of the last row of a page; clients must treat it as an opaque string.
+Timestamps are stored and read back as naive UTC, so decoded cursors are too.
+"""
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    """Encode the sort key of the last row returned into a URL-safe token."""
+    raw = json.dumps([timestamp.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a token produced by encode_cursor; raises InvalidCursorError if it was tampered with."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(row_id, int):
+            raise ValueError(row_id)
+        seek = datetime.fromisoformat(timestamp)
+        if seek.tzinfo is not None:
+            seek = seek.astimezone(timezone.utc).replace(tzinfo=None)
+        return seek, row_id
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursorError()
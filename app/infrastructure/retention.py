@@ -0,0 +1,195 @@
+import argparse
+import logging
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.infrastructure.archive import SessionArchive, session_archive
+from app.infrastructure.archive_index import ArchivedMessageIdModel, ArchivedSessionModel
+from app.infrastructure.database import SessionLocal
+from app.infrastructure.message_repository_impl import MessageModel, SQLiteMessageRepository
+from app.infrastructure.session_stats import SessionStatsModel
+from app.infrastructure.sharding import message_shards
+
+"""
+Retention job: move sessions idle for RETENTION_IDLE_DAYS out of the messages table into the archive.
+
+For each idle session the rows are read, appended to a segment file (fsynced) and only then, in
+one write transaction, indexed in archived_sessions and archived_message_ids and deleted from
+messages (the FTS trigger drops them from the full-text index; session_stats keeps the
+aggregates). A crash before the commit leaves unreferenced bytes in a segment and the session
+hot, so the next run simply archives it again. Sessions whose newest message is also the newest
+row of the table are skipped: SQLite hands out max(id) + 1 as the next row id, so keeping that
+row guarantees archived ids are never reused and cursors stay unambiguous.
+
+Runs in the background of every worker when RETENTION_ENABLED is set, or once by hand:
+    python -m app.infrastructure.retention [--idle-days 90] [--limit 1000]
+"""
+
+logger = logging.getLogger(__name__)
+
+_MESSAGES = MessageModel.__table__
+
+
+@dataclass
+class RetentionReport:
+    sessions_archived: int = 0
+    messages_archived: int = 0
+
+
+def idle_sessions(db: Session, cutoff: datetime, limit: int) -> List[str]:
+    """Sessions with hot messages whose newest message is older than `cutoff` (from the aggregates)."""
+    newest = select(_MESSAGES.c.session_id).order_by(_MESSAGES.c.id.desc()).limit(1).scalar_subquery()
+    return db.execute(
+        select(SessionStatsModel.session_id)
+        .group_by(SessionStatsModel.session_id)
+        .having(func.max(SessionStatsModel.last_timestamp) < cutoff)
+        .having(exists().where(_MESSAGES.c.session_id == SessionStatsModel.session_id))
+        .having(SessionStatsModel.session_id != newest)
+        .limit(limit)
+    ).scalars().all()
+
+
+def archive_session(db: Session, archive: SessionArchive, session_id: str, now: datetime) -> int:
+    """Move one session's hot rows to the archive; returns the number of messages moved (0 if it lost a race)."""
+    rows = [tuple(row) for row in db.execute(SQLiteMessageRepository.export_statement(session_id))]
+    if not rows:
+        return 0
+    segment, offset, length = archive.append(rows)
+
+    db.execute(insert(ArchivedSessionModel).values(
+        session_id=session_id, segment=segment, offset=offset, length=length, message_count=len(rows), archived_at=now,
+    ))
+    db.execute(
+        sqlite_insert(ArchivedMessageIdModel).on_conflict_do_nothing(),
+        [{"message_id": row[1]} for row in rows],
+    )
+    # Rows inserted meanwhile have larger ids and stay hot; another worker archiving the same session
+    # first leaves fewer rows to delete, and this chunk is dropped
+    deleted = db.execute(
+        delete(_MESSAGES).where(_MESSAGES.c.session_id == session_id, _MESSAGES.c.id <= max(row[0] for row in rows))
+    ).rowcount
+    if deleted != len(rows):
+        db.rollback()
+        return 0
+    db.commit()
+    return len(rows)
+
+
+def run_retention(
+        session_factory: Callable[[], Session],
+        archive: SessionArchive,
+        idle: timedelta,
+        limit: int,
+        now: Optional[datetime] = None,
+) -> RetentionReport:
+    """Archive up to `limit` sessions idle for longer than `idle` in the database of `session_factory`."""
+    now = now or datetime.now(timezone.utc)
+    report = RetentionReport()
+    db = session_factory()
+    try:
+        for session_id in idle_sessions(db, now - idle, limit):
+            moved = archive_session(db, archive, session_id, now)
+            report.sessions_archived += bool(moved)
+            report.messages_archived += moved
+    finally:
+        db.close()
+    return report
+
+
+class RetentionJob:
+    """Background thread running the retention pass every `interval_seconds` over every database."""
+
+    def __init__(
+            self,
+            session_factories: Sequence[Callable[[], Session]],
+            archive: SessionArchive,
+            idle: timedelta,
+            interval_seconds: float,
+            batch_sessions: int,
+    ):
+        self.session_factories = list(session_factories)
+        self.archive = archive
+        self.idle = idle
+        self.interval_seconds = interval_seconds
+        self.batch_sessions = batch_sessions
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> RetentionReport:
+        total = RetentionReport()
+        for session_factory in self.session_factories:
+            report = run_retention(session_factory, self.archive, self.idle, self.batch_sessions)
+            total.sessions_archived += report.sessions_archived
+            total.messages_archived += report.messages_archived
+        return total
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="retention", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                report = self.run_once()
+                if report.sessions_archived:
+                    logger.info("archived %d sessions (%d messages)", report.sessions_archived, report.messages_archived)
+            except Exception:
+                # A failed pass leaves the sessions hot; the next one retries them
+                logger.exception("retention pass failed")
+
+
+def _session_factories() -> List[Callable[[], Session]]:
+    return list(message_shards.session_factories) if message_shards is not None else [SessionLocal]
+
+
+# Process-wide job; None unless RETENTION_ENABLED is set
+retention_job: Optional[RetentionJob] = (
+    RetentionJob(
+        _session_factories(),
+        session_archive,
+        timedelta(days=settings.RETENTION_IDLE_DAYS),
+        settings.RETENTION_INTERVAL_SECONDS,
+        settings.RETENTION_BATCH_SESSIONS,
+    )
+    if session_archive is not None else None
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle-days", type=float, default=settings.RETENTION_IDLE_DAYS)
+    parser.add_argument("--limit", type=int, default=settings.RETENTION_BATCH_SESSIONS, help="sessions per database")
+    parser.add_argument("--archive-dir", default=settings.ARCHIVE_DIR)
+    args = parser.parse_args(argv)
+
+    job = RetentionJob(
+        _session_factories(),
+        SessionArchive(args.archive_dir, settings.ARCHIVE_SEGMENT_MAX_BYTES),
+        timedelta(days=args.idle_days),
+        settings.RETENTION_INTERVAL_SECONDS,
+        args.limit,
+    )
+    report = job.run_once()
+    print(f"archived {report.sessions_archived} sessions ({report.messages_archived} messages)")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,46 @@
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from app.infrastructure.database import Base
+from app.infrastructure.message_repository_impl import MessageModel
+from app.infrastructure.fts import fts_ddl, fts_rebuild
+from app.infrastructure.session_stats import stats_ddl, stats_backfill
+from app.infrastructure.archive_index import ARCHIVE_DDL
+from app.core.config import settings
+from app.core.constants import SQLITE_PREFIX, DB_TABLE_MESSAGES, DB_TABLE_MESSAGES_FTS, DB_TABLE_SESSION_STATS
+
+"""
+Schema bootstrap for the message store.
+create_all only creates missing tables, so indexes added to existing tables, the FTS5 index
+and the triggers maintaining it, the session aggregates and the archived-id check are created here as well.
+The FTS and aggregate triggers only call the decompress_content() function once bodies may be stored
+compressed (compression enabled, or a compressed row left from when it was), so databases that never
+used compression stay writable from connections without it.
+"""
+
+def init_db(bind: Engine) -> None:
+    """Create missing tables, indexes, the full-text index and aggregate triggers (idempotent, safe on every startup)."""
+    stats_existed = inspect(bind).has_table(DB_TABLE_SESSION_STATS)
+    Base.metadata.create_all(bind=bind)
+    for index in MessageModel.__table__.indexes:
+        index.create(bind=bind, checkfirst=True)
+
+    if bind.dialect.name != SQLITE_PREFIX:  # pragma: no cover
+        return
+    with bind.begin() as conn:
+        existed = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", (DB_TABLE_MESSAGES_FTS,)
+        ).first()
+        compressed = settings.CONTENT_COMPRESSION_ENABLED or conn.exec_driver_sql(
+            f"SELECT 1 FROM {DB_TABLE_MESSAGES} WHERE typeof(content) = 'blob' LIMIT 1"
+        ).first() is not None
+        for ddl in fts_ddl(compressed):
+            conn.exec_driver_sql(ddl)
+        if not existed:
+            conn.exec_driver_sql(fts_rebuild(compressed))
+        for ddl in stats_ddl(compressed):
+            conn.exec_driver_sql(ddl)
+        if not stats_existed:
+            conn.exec_driver_sql(stats_backfill(compressed))
+        for ddl in ARCHIVE_DDL:
+            conn.exec_driver_sql(ddl)
@@ -0,0 +1,97 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import String, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.infrastructure.database import Base
+from app.domain.entities.session_stats import SessionStats
+from app.core.constants import (
+    DB_TABLE_MESSAGES,
+    DB_TABLE_SESSION_STATS,
+    METADATA_FIELDS,
+    SESSION_ID_MAX_LENGTH,
+    SENDER_MAX_LENGTH,
+)
+from app.infrastructure.compression import sql_content_text
+
+"""
+Per-session aggregates (message, word and character counts, first/last timestamp), one row per
+(session_id, sender).
+
+Rows are upserted by an AFTER INSERT trigger on messages, so every writer - single save, bulk
+save_many, write-behind group commit - updates them in the same transaction as the insert, and a
+rolled-back insert never leaves counts behind. Reading the stats of a session touches at most one
+row per sender, whatever the session size.
+"""
+
+
+class SessionStatsModel(Base):
+    """SQLAlchemy ORM model of the 'session_stats' aggregates table."""
+
+    __tablename__ = DB_TABLE_SESSION_STATS
+
+    session_id: Mapped[str] = mapped_column(String(SESSION_ID_MAX_LENGTH), primary_key=True)
+    sender: Mapped[str] = mapped_column(String(SENDER_MAX_LENGTH), primary_key=True)
+    message_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    word_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    character_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    first_timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    @staticmethod
+    def to_domain(session_id: str, rows: List["SessionStatsModel"]) -> Optional[SessionStats]:
+        """Fold the per-sender rows of a session into one SessionStats (None when there are none)."""
+        if not rows:
+            return None
+        return SessionStats(
+            session_id=session_id,
+            message_count=sum(r.message_count for r in rows),
+            word_count=sum(r.word_count for r in rows),
+            character_count=sum(r.character_count for r in rows),
+            first_timestamp=min(r.first_timestamp for r in rows),
+            last_timestamp=max(r.last_timestamp for r in rows),
+            senders={r.sender: r.message_count for r in sorted(rows, key=lambda r: r.sender)},
+        )
+
+
+_WORDS = f"coalesce(json_extract(new.metadata, '$.{METADATA_FIELDS['WORD_COUNT']}'), 0)"
+
+
+def _characters(row: str, compressed: bool) -> str:
+    # Without a stored character count, measure the original text: the column may hold a compressed BLOB
+    return (
+        f"coalesce(json_extract({row}metadata, '$.{METADATA_FIELDS['CHAR_COUNT']}'), "
+        f"length({sql_content_text(row + 'content', compressed)}))"
+    )
+
+
+def stats_ddl(compressed: bool) -> List[str]:
+    """Statements creating the aggregate trigger; `compressed` makes it count the decompressed text."""
+    return [
+        f"DROP TRIGGER IF EXISTS {DB_TABLE_SESSION_STATS}_ai",
+        f"""CREATE TRIGGER {DB_TABLE_SESSION_STATS}_ai AFTER INSERT ON {DB_TABLE_MESSAGES} BEGIN
+        INSERT INTO {DB_TABLE_SESSION_STATS}
+            (session_id, sender, message_count, word_count, character_count, first_timestamp, last_timestamp)
+        VALUES (new.session_id, new.sender, 1, {_WORDS}, {_characters("new.", compressed)}, new.timestamp, new.timestamp)
+        ON CONFLICT(session_id, sender) DO UPDATE SET
+            message_count = message_count + 1,
+            word_count = word_count + excluded.word_count,
+            character_count = character_count + excluded.character_count,
+            first_timestamp = min(first_timestamp, excluded.first_timestamp),
+            last_timestamp = max(last_timestamp, excluded.last_timestamp);
+    END""",
+    ]
+
+
+def stats_backfill(compressed: bool) -> str:
+    """Aggregate rows stored before the stats table existed."""
+    return f"""INSERT INTO {DB_TABLE_SESSION_STATS}
+    (session_id, sender, message_count, word_count, character_count, first_timestamp, last_timestamp)
+SELECT session_id, sender, count(*),
+       sum(coalesce(json_extract(metadata, '$.{METADATA_FIELDS['WORD_COUNT']}'), 0)),
+       sum({_characters("", compressed)}),
+       min(timestamp), max(timestamp)
+FROM {DB_TABLE_MESSAGES}
+GROUP BY session_id, sender"""
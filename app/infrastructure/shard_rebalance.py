@@ -0,0 +1,213 @@
+import argparse
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.config import settings
+from app.domain.entities.message import Message
+from app.infrastructure.archive import SessionArchive
+from app.infrastructure.archive_index import ArchivedMessageIdModel, ArchivedSessionModel
+from app.infrastructure.message_repository_impl import MessageModel, SQLiteMessageRepository
+from app.infrastructure.session_stats import SessionStatsModel
+from app.infrastructure.sharding import MessageShards, jump_hash, shard_urls, stable_hash
+
+"""
+Move sessions to their new shard after the shard count changes.
+
+For every session stored in one of the current shards whose jump hash under the new count points
+elsewhere, the messages are copied to the target shard in batches (the triggers rebuild its
+full-text index and aggregates) and only then deleted from the source, together with the
+session's aggregate rows. A crash in between leaves copies that a re-run skips as duplicates, so
+the tool is safe to run again until it reports nothing to move. When the target does not end up
+holding all of a session's messages (a message_id already used on that shard), the partial copy
+and its aggregates are deleted from the target and the session is reported, still whole on its
+source shard. Because the hash is consistent, growing from N to M shards only moves
+sessions into the new shards.
+
+Archived sessions move too: the segment files are shared by all shards, so only their index rows
+(archived_sessions, the archived_message_ids read back from their chunks) are copied to the target
+before the hot rows, and their aggregate rows, which also count the archived messages, after them.
+An archived id already taken on the target is a conflict like any other.
+
+Run it while the API is stopped, then restart it with SHARD_COUNT set to the new count.
+
+Usage:
+    python -m app.infrastructure.shard_rebalance --from-count 4 --to-count 8 [--template URL] [--archive-dir DIR] [--batch-size 1000]
+"""
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+@dataclass
+class RebalanceReport:
+    sessions_moved: int = 0
+    messages_moved: int = 0
+    # Sessions left in place because some message_id already exists on the target shard
+    sessions_conflicting: List[str] = field(default_factory=list)
+
+
+def _count(db, session_id: str) -> int:
+    return db.execute(select(func.count()).where(MessageModel.session_id == session_id)).scalar_one()
+
+
+def _delete_session(db, session_id: str, archived_ids: List[str]) -> None:
+    """
+    Remove a session's messages, aggregate and archive index rows (the triggers keep the full-text
+    index in step) and commit.
+    """
+    db.execute(delete(MessageModel).where(MessageModel.session_id == session_id))
+    db.execute(delete(SessionStatsModel).where(SessionStatsModel.session_id == session_id))
+    db.execute(delete(ArchivedSessionModel).where(ArchivedSessionModel.session_id == session_id))
+    for start in range(0, len(archived_ids), DEFAULT_BATCH_SIZE):
+        chunk = archived_ids[start:start + DEFAULT_BATCH_SIZE]
+        db.execute(delete(ArchivedMessageIdModel).where(ArchivedMessageIdModel.message_id.in_(chunk)))
+    db.commit()
+
+
+def _taken(db, model, ids: List[str]) -> bool:
+    """True when any of the ids is a message_id of `model` (messages or archived_message_ids) on this shard."""
+    for start in range(0, len(ids), DEFAULT_BATCH_SIZE):
+        chunk = ids[start:start + DEFAULT_BATCH_SIZE]
+        if db.execute(select(model.message_id).where(model.message_id.in_(chunk)).limit(1)).first():
+            return True
+    return False
+
+
+def _copy_archive_index(source_db, target_db, archive: SessionArchive, session_id: str) -> Optional[List[str]]:
+    """
+    Copy an archived session's chunk and archived-id rows to the target shard in one transaction; returns the archived ids ([] when the session has no archived chunk), or None when
+    one of them is already taken on the target, in which case nothing is written.
+    """
+    chunks = source_db.execute(select(ArchivedSessionModel).where(ArchivedSessionModel.session_id == session_id)).scalars().all()
+    if not chunks:
+        return []
+    archived_ids = [row[1] for chunk in chunks for row in archive.read(chunk.segment, chunk.offset, chunk.length)]
+    # A run that crashed after this step left the rows on the target: they are ours, not a conflict
+    resumed = target_db.execute(
+        select(ArchivedSessionModel.id).where(ArchivedSessionModel.session_id == session_id).limit(1)
+    ).first() is not None
+    if _taken(target_db, MessageModel, archived_ids) or (not resumed and _taken(target_db, ArchivedMessageIdModel, archived_ids)):
+        target_db.rollback()
+        return None
+
+    target_db.execute(delete(ArchivedSessionModel).where(ArchivedSessionModel.session_id == session_id))
+    target_db.execute(insert(ArchivedSessionModel), [
+        {"session_id": session_id, "segment": c.segment, "offset": c.offset, "length": c.length,
+         "message_count": c.message_count, "archived_at": c.archived_at}
+        for c in chunks
+    ])
+    target_db.execute(
+        sqlite_insert(ArchivedMessageIdModel).on_conflict_do_nothing(),
+        [{"message_id": message_id} for message_id in archived_ids],
+    )
+    target_db.commit()
+    return archived_ids
+
+
+def _copy_stats(source_db, target_db, session_id: str) -> None:
+    """Replace the target's aggregate rows of a session with the source's, which also count its archived messages."""
+    stats = source_db.execute(select(SessionStatsModel).where(SessionStatsModel.session_id == session_id)).scalars().all()
+    target_db.execute(delete(SessionStatsModel).where(SessionStatsModel.session_id == session_id))
+    target_db.execute(insert(SessionStatsModel), [
+        {column: getattr(row, column) for column in SessionStatsModel.__table__.c.keys()} for row in stats
+    ])
+    target_db.commit()
+
+
+def _copy_session(source, target, session_id: str, batch_size: int) -> int:
+    """Copy every message of a session from source to target repository; returns the number of messages read."""
+    count = 0
+    batch: List[Message] = []
+    for message in source.iter_by_session(session_id, batch_size):
+        batch.append(message)
+        if len(batch) == batch_size:
+            target.save_many(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        target.save_many(batch)
+        count += len(batch)
+    return count
+
+
+def rebalance(
+        source_urls: List[str],
+        target_urls: List[str],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        archive: Optional[SessionArchive] = None,
+) -> RebalanceReport:
+    """
+    Move every session stored in `source_urls` that belongs to another shard of `target_urls`,
+    archived ones included; `archive` holds their segment files (ARCHIVE_DIR by default).
+    """
+    if archive is None:
+        archive = SessionArchive(settings.ARCHIVE_DIR, settings.ARCHIVE_SEGMENT_MAX_BYTES)
+    target = MessageShards(target_urls)
+    target.init_schema()
+    source = MessageShards(source_urls)
+    report = RebalanceReport()
+    try:
+        for index, url in enumerate(source.urls):
+            db = source.session(index)
+            try:
+                session_ids = db.execute(
+                    select(MessageModel.session_id).union(select(ArchivedSessionModel.session_id))
+                ).scalars().all()
+                for session_id in session_ids:
+                    destination = jump_hash(stable_hash(session_id), len(target))
+                    if target.urls[destination] == url:
+                        continue
+                    target_db = target.session(destination)
+                    try:
+                        archived_ids = _copy_archive_index(db, target_db, archive, session_id)
+                        complete = archived_ids is not None
+                        if complete:
+                            moved = _copy_session(SQLiteMessageRepository(db), SQLiteMessageRepository(target_db), session_id, batch_size)
+                            complete = _count(target_db, session_id) == moved
+                            if not complete:
+                                # Reads would go to the target after the restart and see a partial session
+                                _delete_session(target_db, session_id, archived_ids)
+                            elif archived_ids:
+                                # The target's triggers only counted the hot rows
+                                _copy_stats(db, target_db, session_id)
+                    finally:
+                        target_db.close()
+                    if not complete:
+                        report.sessions_conflicting.append(session_id)
+                        continue
+                    _delete_session(db, session_id, archived_ids)
+                    report.sessions_moved += 1
+                    report.messages_moved += moved + len(archived_ids)
+            finally:
+                db.close()
+    finally:
+        source.dispose()
+        target.dispose()
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--from-count", type=int, required=True, help="shard count the data was written with")
+    parser.add_argument("--to-count", type=int, required=True, help="new shard count")
+    parser.add_argument("--template", default=settings.SHARD_DATABASE_URL_TEMPLATE, help="shard URL with a {shard} placeholder")
+    parser.add_argument("--archive-dir", default=settings.ARCHIVE_DIR, help="segment files of archived sessions")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    report = rebalance(
+        shard_urls(args.template, args.from_count), shard_urls(args.template, args.to_count), args.batch_size,
+        SessionArchive(args.archive_dir, settings.ARCHIVE_SEGMENT_MAX_BYTES),
+    )
+    print(f"moved {report.sessions_moved} sessions ({report.messages_moved} messages) "
+          f"from {args.from_count} to {args.to_count} shards")
+    for session_id in report.sessions_conflicting:
+        print(f"not moved (message_id conflict on the target shard): {session_id}", file=sys.stderr)
+    return 1 if report.sessions_conflicting else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
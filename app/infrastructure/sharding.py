@@ -0,0 +1,161 @@
+from __future__ import annotations
+import hashlib
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.constants import SQLITE_CONNECT_ARGS, SQLITE_PREFIX, SORT_TIME, EXPORT_BATCH_SIZE
+from app.domain.entities.message import Message
+from app.domain.entities.message_page import MessagePage
+from app.domain.entities.session_stats import SessionStats
+from app.domain.repositories.message_repository import MessageRepository
+from app.infrastructure.database import apply_sqlite_profile
+from app.infrastructure.message_repository_impl import SQLiteMessageRepository
+from app.infrastructure.schema import init_db
+
+if TYPE_CHECKING:  # pragma: no cover
+    from app.infrastructure.message_id_filter import MessageIdFilter
+    from app.infrastructure.archive import SessionArchive
+
+"""
+Hash-sharded message storage.
+
+Every session lives in exactly one of N SQLite databases, chosen by a jump consistent hash of
+its session_id. Each shard has its own engine, connection pool and write lock, so writes to
+different shards commit in parallel. Every repository call concerns a single session, so it
+opens a session on that session's shard only.
+
+Uniqueness of message_id is enforced per shard: ids reused in sessions that live on different
+shards are not detected. A batch spanning several shards is committed as one transaction per shard.
+"""
+
+
+def stable_hash(session_id: str) -> int:
+    """64-bit hash of a session_id that is identical across processes and Python versions."""
+    return int.from_bytes(hashlib.blake2b(session_id.encode(), digest_size=8).digest(), "little")
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """
+    Jump consistent hash (Lamping & Veach): maps a 64-bit key to [0, buckets).
+    Growing from N to N + 1 buckets moves only 1/(N + 1) of the keys, all of them to the new bucket.
+    """
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+
+def shard_urls(template: str, count: int) -> List[str]:
+    """Database URL of every shard, e.g. 'sqlite:///./data/chat-shard{shard}.db' -> one URL per index."""
+    return [template.format(shard=index) for index in range(count)]
+
+
+def create_shard_engine(url: str) -> Engine:
+    """Engine of one shard, configured like the main engine (connect args and SQLite profile)."""
+    engine = create_engine(url, connect_args=SQLITE_CONNECT_ARGS if url.startswith(SQLITE_PREFIX) else {})
+    apply_sqlite_profile(engine)
+    return engine
+
+
+class MessageShards:
+    """The shard databases: one engine and session factory per shard, addressed by session_id."""
+
+    def __init__(self, urls: List[str]):
+        self.urls = list(urls)
+        self.engines = [create_shard_engine(url) for url in self.urls]
+        self.session_factories = [
+            sessionmaker(autocommit=False, autoflush=False, bind=engine) for engine in self.engines
+        ]
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def index_for(self, session_id: str) -> int:
+        return jump_hash(stable_hash(session_id), len(self.engines))
+
+    def session(self, index: int) -> Session:
+        return self.session_factories[index]()
+
+    def init_schema(self) -> None:
+        """Run init_db on every shard (idempotent)."""
+        for engine in self.engines:
+            init_db(engine)
+
+    def dispose(self) -> None:
+        for engine in self.engines:
+            engine.dispose()
+
+
+class ShardedMessageRepository(MessageRepository):
+    """MessageRepository routing every call to the shard of its session_id."""
+
+    def __init__(self, shards: MessageShards, id_filter: Optional["MessageIdFilter"] = None, archive: Optional["SessionArchive"] = None):
+        self.shards = shards
+        # One filter covers every shard; probable duplicates are confirmed on the session's shard
+        self.id_filter = id_filter
+        # Each shard indexes its own archived sessions; the segment files are shared
+        self.archive = archive
+
+    @contextmanager
+    def _repository(self, session_id: str) -> Iterator[SQLiteMessageRepository]:
+        db = self.shards.session(self.shards.index_for(session_id))
+        try:
+            yield SQLiteMessageRepository(db, self.id_filter, self.archive)
+        finally:
+            db.close()
+
+    def save(self, message: Message) -> Message:
+        with self._repository(message.session_id) as repo:
+            return repo.save(message)
+
+    def save_many(self, messages: List[Message]) -> List[Optional[Message]]:
+        """Split the batch by shard, store each part with one save_many, and return results in input order."""
+        positions: Dict[int, List[int]] = {}
+        for position, message in enumerate(messages):
+            positions.setdefault(self.shards.index_for(message.session_id), []).append(position)
+
+        results: List[Optional[Message]] = [None] * len(messages)
+        for index, shard_positions in positions.items():
+            db = self.shards.session(index)
+            try:
+                stored = SQLiteMessageRepository(db, self.id_filter, self.archive).save_many([messages[p] for p in shard_positions])
+            finally:
+                db.close()
+            for position, message in zip(shard_positions, stored):
+                results[position] = message
+        return results
+
+    def get_by_session(self, session_id: str, limit: int, offset: int, sender: Optional[str] = None) -> List[Message]:
+        with self._repository(session_id) as repo:
+            return repo.get_by_session(session_id, limit, offset, sender)
+
+    def get_page_by_session(self, session_id: str, limit: int, offset: int = 0, sender: Optional[str] = None, cursor: Optional[str] = None, query: Optional[str] = None, sort: str = SORT_TIME) -> MessagePage:
+        with self._repository(session_id) as repo:
+            return repo.get_page_by_session(session_id, limit, offset, sender, cursor, query, sort)
+
+    def iter_by_session(self, session_id: str, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Message]:
+        """Stream the session from its shard; the shard session stays open until the iterator is exhausted or closed."""
+        with self._repository(session_id) as repo:
+            yield from repo.iter_by_session(session_id, batch_size)
+
+    def get_session_stats(self, session_id: str) -> Optional[SessionStats]:
+        with self._repository(session_id) as repo:
+            return repo.get_session_stats(session_id)
+
+    def get_session_version(self, session_id: str) -> int:
+        with self._repository(session_id) as repo:
+            return repo.get_session_version(session_id)
+
+
+# Process-wide shards; None keeps every message in DATABASE_URL
+message_shards: Optional[MessageShards] = (
+    MessageShards(shard_urls(settings.SHARD_DATABASE_URL_TEMPLATE, settings.SHARD_COUNT))
+    if settings.SHARD_COUNT > 1 else None
+)
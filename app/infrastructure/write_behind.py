@@ -0,0 +1,245 @@
+from __future__ import annotations
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.errors import DuplicateMessageIdError, WriteQueueFullError
+from app.domain.entities.message import Message
+from app.domain.entities.message_page import MessagePage
+from app.domain.entities.session_stats import SessionStats
+from app.domain.repositories.message_repository import MessageRepository, AsyncMessageRepository
+from app.infrastructure.database import SessionLocal
+from app.infrastructure.message_repository_impl import SQLiteMessageRepository
+from app.infrastructure.message_id_filter import MessageIdFilter, message_id_filter
+from app.core.constants import SORT_TIME, EXPORT_BATCH_SIZE
+
+"""
+Write-behind (group commit) mode for message inserts.
+
+Requests hand their messages to an in-process queue and wait on a future. A single writer
+thread drains the queue and stores whatever accumulated - up to WRITE_BEHIND_BATCH_SIZE messages
+or WRITE_BEHIND_MAX_DELAY_MS after the first one - with one save_many call, i.e. one transaction
+and one fsync for the whole group. A caller is answered only after its group committed, so a
+201 still means the message is durable.
+
+Stopping never blocks past its timeout: the stop marker is queued with a timeout and backed by an
+event the idle writer polls, and whatever a dead or stalled writer leaves queued is failed with
+WriteQueueFullError (a 503 the client may retry) instead of hanging shutdown.
+"""
+
+_STOP = object()
+# How often an idle writer checks whether it was asked to stop
+_IDLE_POLL_SECONDS = 0.5
+
+# One queued request: its messages and the future resolved with their per-message outcome
+_Entry = Tuple[List[Message], Future]
+
+
+class WriteBehindWriter:
+    """Single background writer that commits queued inserts in grouped transactions."""
+
+    def __init__(
+            self,
+            session_factory: Callable[[], Session],
+            batch_size: int,
+            max_delay_ms: int,
+            queue_depth: int,
+            id_filter: Optional[MessageIdFilter] = None,
+    ):
+        self.session_factory = session_factory
+        self.id_filter = id_filter
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_depth)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def submit(self, messages: List[Message]) -> Future:
+        """
+        Queue messages for the next group commit.
+        The future resolves to one entry per message: the stored message, or None for a duplicate message_id.
+        Raises WriteQueueFullError instead of blocking when the queue is at capacity.
+        """
+        self.start()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((messages, future))
+        except queue.Full:
+            raise WriteQueueFullError()
+        return future
+
+    def start(self) -> None:
+        """Start the writer thread (idempotent; also called lazily by submit)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Flush everything already queued, then stop the writer thread, waiting at most `timeout`
+        seconds (WRITE_BEHIND_STOP_TIMEOUT_SECONDS by default). Entries the writer did not take
+        by then are failed with WriteQueueFullError.
+        """
+        if timeout is None:
+            timeout = settings.WRITE_BEHIND_STOP_TIMEOUT_SECONDS
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        deadline = time.monotonic() + timeout
+        self._stopping.set()
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass  # a live writer drains the queue, then sees the event
+        thread.join(max(0.0, deadline - time.monotonic()))
+        if thread.is_alive():
+            self._fail_queued()
+
+    def _fail_queued(self) -> None:
+        while True:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if entry is not _STOP:
+                entry[1].set_exception(WriteQueueFullError())
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=_IDLE_POLL_SECONDS)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            if first is _STOP:
+                return
+            group, stop = self._collect(first)
+            self._flush(group)
+            if stop:
+                return
+
+    def _collect(self, first: _Entry) -> Tuple[List[_Entry], bool]:
+        """Gather entries until the group is full or the oldest one waited max_delay."""
+        group = [first]
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_delay
+        while size < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                return group, True
+            group.append(entry)
+            size += len(entry[0])
+        return group, False
+
+    def _flush(self, group: List[_Entry]) -> None:
+        messages = [m for entry_messages, _ in group for m in entry_messages]
+        try:
+            db = self.session_factory()
+            try:
+                stored = SQLiteMessageRepository(db, self.id_filter).save_many(messages)
+            finally:
+                db.close()
+        except Exception as exc:
+            for _, future in group:
+                future.set_exception(exc)
+            return
+
+        start = 0
+        for entry_messages, future in group:
+            future.set_result(stored[start:start + len(entry_messages)])
+            start += len(entry_messages)
+
+
+def _single(results: List[Optional[Message]]) -> Message:
+    if results[0] is None:
+        raise DuplicateMessageIdError()
+    return results[0]
+
+
+class WriteBehindMessageRepository(MessageRepository):
+    """Repository decorator routing writes through the group-commit writer; reads go to the wrapped repository."""
+
+    def __init__(self, inner: MessageRepository, writer: WriteBehindWriter):
+        self.inner = inner
+        self.writer = writer
+
+    def save(self, message: Message) -> Message:
+        return _single(self.writer.submit([message]).result())
+
+    def save_many(self, messages: List[Message]) -> List[Optional[Message]]:
+        if not messages:
+            return []
+        return self.writer.submit(messages).result()
+
+    def get_by_session(self, session_id: str, limit: int, offset: int, sender: Optional[str] = None) -> List[Message]:
+        return self.inner.get_by_session(session_id, limit, offset, sender)
+
+    def get_page_by_session(self, session_id: str, limit: int, offset: int = 0, sender: Optional[str] = None, cursor: Optional[str] = None, query: Optional[str] = None, sort: str = SORT_TIME) -> MessagePage:
+        return self.inner.get_page_by_session(session_id, limit, offset, sender, cursor, query, sort)
+
+    def iter_by_session(self, session_id: str, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Message]:
+        return self.inner.iter_by_session(session_id, batch_size)
+
+    def get_session_stats(self, session_id: str) -> Optional[SessionStats]:
+        return self.inner.get_session_stats(session_id)
+
+    def get_session_version(self, session_id: str) -> int:
+        return self.inner.get_session_version(session_id)
+
+
+class AsyncWriteBehindMessageRepository(AsyncMessageRepository):
+    """Asyncio variant: awaits the writer's future without holding a thread."""
+
+    def __init__(self, inner: AsyncMessageRepository, writer: WriteBehindWriter):
+        self.inner = inner
+        self.writer = writer
+
+    async def save(self, message: Message) -> Message:
+        return _single(await asyncio.wrap_future(self.writer.submit([message])))
+
+    async def save_many(self, messages: List[Message]) -> List[Optional[Message]]:
+        if not messages:
+            return []
+        return await asyncio.wrap_future(self.writer.submit(messages))
+
+    async def get_by_session(self, session_id: str, limit: int, offset: int, sender: Optional[str] = None) -> List[Message]:
+        return await self.inner.get_by_session(session_id, limit, offset, sender)
+
+    async def get_page_by_session(self, session_id: str, limit: int, offset: int = 0, sender: Optional[str] = None, cursor: Optional[str] = None, query: Optional[str] = None, sort: str = SORT_TIME) -> MessagePage:
+        return await self.inner.get_page_by_session(session_id, limit, offset, sender, cursor, query, sort)
+
+    def iter_by_session(self, session_id: str, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[Message]:
+        return self.inner.iter_by_session(session_id, batch_size)
+
+    async def get_session_stats(self, session_id: str) -> Optional[SessionStats]:
+        return await self.inner.get_session_stats(session_id)
+
+    async def get_session_version(self, session_id: str) -> int:
+        return await self.inner.get_session_version(session_id)
+
+
+# Process-wide writer; its thread only starts on first use when WRITE_BEHIND_ENABLED is set
+write_behind_writer = WriteBehindWriter(
+    SessionLocal,
+    batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+    max_delay_ms=settings.WRITE_BEHIND_MAX_DELAY_MS,
+    queue_depth=settings.WRITE_BEHIND_QUEUE_DEPTH,
+    id_filter=message_id_filter,
+)
@@ -0,0 +1,35 @@
+import hashlib
+from typing import Optional
+
+from starlette.responses import Response
+
+from app.core.constants import ETAG_HEADER, VARY_HEADER, ACCEPT_HEADER
+
+"""
+Conditional GETs on session listings.
+
+A page's ETag is the session version (its insert counter, see MessageRepository.get_session_version)
+plus a digest of the query parameters that select the page, so it changes with every insert into the
+session and differs between pages of the same version. The version is one indexed read of the
+session_stats rows; when it matches `If-None-Match` the route answers 304 without reading messages.
+"""
+
+
+def page_etag(version: int, *params: object) -> str:
+    """Strong ETag of a listing page: `"<version>-<digest of params>"` (params include the media type)."""
+    digest = hashlib.blake2b(repr(params).encode(), digest_size=8).hexdigest()
+    return f'"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header (a list of tags, or `*`), as RFC 9110 prescribes for GET."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current ETag; listings are negotiated, hence Vary: Accept."""
+    return Response(status_code=304, headers={ETAG_HEADER: etag, VARY_HEADER: ACCEPT_HEADER})
@@ -1,61 +1,54 @@
 
 from sqlalchemy.orm import Session
-from app.core.constants import DEFAULT_LIMIT, DEFAULT_OFFSET, ROUTER_TAG_MESSAGES, RATE_LIMIT_POST_MESSAGES
+from app.core.constants import DEFAULT_LIMIT, DEFAULT_OFFSET, ROUTER_TAG_MESSAGES, RATE_SCOPE_POST_MESSAGE
+from app.core.constants import RATE_SCOPE_POST_BATCH, NEXT_CURSOR_HEADER, MEDIA_TYPE_NDJSON, ETAG_HEADER, IF_NONE_MATCH_HEADER
+from app.core.constants import ACCEPT_HEADER, VARY_HEADER
 from app.core.auth import verify_api_key
-from app.domain.entities.message import Message
+from app.core.config import settings
 from app.application.services.message_service import MessageService
-from app.infrastructure.database import get_db
+from app.infrastructure.database import get_db, get_read_db
 from app.infrastructure.message_repository_impl import SQLiteMessageRepository
-from app.interfaces.schemas.message_schema import MessageIn, MessageOut
-from app.interfaces.schemas.error_schema import ErrorResponse
+from app.infrastructure.message_cache_impl import message_cache
+from app.infrastructure.message_hub_impl import message_hub
+from app.infrastructure.write_behind import WriteBehindMessageRepository, write_behind_writer
+from app.infrastructure.sharding import ShardedMessageRepository, message_shards
+from app.infrastructure.message_id_filter import message_id_filter
+from app.infrastructure.archive import session_archive
+from app.interfaces.schemas.message_schema import MessageIn, MessageBatchIn, MessageSort
+from app.interfaces.schemas.message_schema import session_stats_json
+from app.interfaces.api.responses import JSONBytesResponse
+from app.interfaces.api.etag import page_etag, etag_matches, not_modified
+from app.interfaces.api.negotiation import negotiate, batch_body, message_response, message_list_response, batch_response
+from app.interfaces.api.route_docs import CREATE_MESSAGE_ROUTE, CREATE_MESSAGES_BATCH_ROUTE, LIST_MESSAGES_ROUTE
+from app.interfaces.api.route_docs import EXPORT_MESSAGES_ROUTE, SESSION_STATS_ROUTE
+from app.interfaces.api.ndjson import iter_ndjson
 
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, status, Request
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query, status
+from fastapi.responses import StreamingResponse
 from app.core.limiter import limiter
 
 router = APIRouter(tags=[ROUTER_TAG_MESSAGES], dependencies=[Depends(verify_api_key)])
 
+# Selects JSON or MessagePack bodies (see negotiation); OpenAPI ignores Accept parameters
+_ACCEPT = Header(None, alias=ACCEPT_HEADER, include_in_schema=False)
+
 # --- Dependency injection ---
 def get_service(db: Session) -> MessageService:
-    repo = SQLiteMessageRepository(db)
-    return MessageService(repo)
+    if message_shards is not None:
+        # Each shard has its own write lock, so writes go straight to it rather than through the single writer
+        repo = ShardedMessageRepository(message_shards, message_id_filter, session_archive)
+    else:
+        repo = SQLiteMessageRepository(db, message_id_filter, session_archive)
+        if settings.WRITE_BEHIND_ENABLED:
+            repo = WriteBehindMessageRepository(repo, write_behind_writer)
+    cache = message_cache if settings.MESSAGE_CACHE_ENABLED else None
+    return MessageService(repo, cache=cache, hub=message_hub)
 
 
 # --- POST /api/messages ---
-@router.post(
-    "",
-    response_model=MessageOut,
-    status_code=status.HTTP_201_CREATED,
-    summary="Create Message",
-    description=(
-            "Creates a new message for a specific chat session. "
-            "The message must include a unique `message_id`, valid `sender` (`user` or `system`), "
-            "and non-empty `content`."
-    ),
-    responses={
-        201: {
-            "description": "Message created successfully",
-            "model": MessageOut,
-        },
-        400: {
-            "description": "Bad Request (invalid format, sender or missing fields)",
-            "model": ErrorResponse,
-        },
-        401: {"description": "Unauthorized",
-              "model": ErrorResponse
-        },
-        409: {
-            "description": "Conflict (duplicate message_id)",
-            "model": ErrorResponse,
-        },
-        500: {
-            "description": "Internal Server Error",
-            "model": ErrorResponse,
-        },
-    },
-)
-@limiter.limit(RATE_LIMIT_POST_MESSAGES)
-def create_message(request: Request, payload: MessageIn, db: Session = Depends(get_db)):
+@router.post("", dependencies=[Depends(limiter.limit(RATE_SCOPE_POST_MESSAGE))], **CREATE_MESSAGE_ROUTE)
+def create_message(payload: MessageIn, db: Session = Depends(get_db), accept: Optional[str] = _ACCEPT):
     """
     Create a new message for the given session.
     - **message_id**: unique identifier for the message
@@ -65,64 +58,86 @@ def create_message(request: Request, payload: MessageIn, db: Session = Depends(g
     """
     service = get_service(db)
 
-    domain_msg = Message(
-        message_id=payload.message_id,
-        session_id=payload.session_id,
-        content=payload.content,
-        timestamp=None,  # will be set by the service if missing
-        sender=payload.sender,
-    )
+    saved = service.process_and_save(payload.to_domain())
+    return message_response(negotiate(accept), saved, status.HTTP_201_CREATED)
+
+
+# --- POST /api/messages/batch ---
+@router.post("/batch", dependencies=[Depends(limiter.limit(RATE_SCOPE_POST_BATCH))], **CREATE_MESSAGES_BATCH_ROUTE)
+def create_messages_batch(payload: MessageBatchIn = Depends(batch_body), db: Session = Depends(get_db), accept: Optional[str] = _ACCEPT):
+    """
+    Create a batch of messages.
+    - **messages**: list of messages with the same fields as `POST /api/messages`
+    """
+    service = get_service(db)
+
+    results = service.process_and_save_many([item.to_domain() for item in payload.messages])
+    return batch_response(negotiate(accept), results)
+
+
+# --- GET /api/messages/{session_id}/export ---
+@router.get("/{session_id}/export", **EXPORT_MESSAGES_ROUTE)
+def export_messages(session_id: str, db: Session = Depends(get_read_db)):
+    """
+    Export a whole session as NDJSON (one message per line, ordered by timestamp).
+    The response is streamed while rows are read in batches, so memory stays flat for any session size.
+    """
+    service = get_service(db)
+
+    messages = service.export_messages(session_id)
+    return StreamingResponse(iter_ndjson(messages), media_type=MEDIA_TYPE_NDJSON)
+
+
+# --- GET /api/messages/{session_id}/stats ---
+@router.get("/{session_id}/stats", **SESSION_STATS_ROUTE)
+def get_session_stats(session_id: str, db: Session = Depends(get_read_db)):
+    """
+    Aggregates of a session: message count (total and per sender), words, characters
+    and the first/last message timestamps.
+    """
+    service = get_service(db)
 
-    saved = service.process_and_save(domain_msg)
-    return MessageOut(**saved.__dict__)
+    stats = service.get_session_stats(session_id)
+    return JSONBytesResponse(session_stats_json.dump_json(stats))
 
 
 # --- GET /api/messages/{session_id} ---
-@router.get(
-    "/{session_id}",
-    response_model=List[MessageOut],
-    summary="List Messages by Session",
-    description=(
-            "Retrieves all messages associated with a given session ID. "
-            "Supports pagination (`limit`, `offset`) and optional filtering by `sender`."
-    ),
-    responses={
-        200: {
-            "description": "Successful retrieval of messages",
-            "model": List[MessageOut],
-        },
-        400: {
-            "description": "Bad Request (invalid query parameters)",
-            "model": ErrorResponse,
-        },
-        401: {"description": "Unauthorized",
-              "model": ErrorResponse
-        },
-        404: {
-            "description": "No messages found for the given session ID",
-            "model": ErrorResponse,
-        },
-        500: {
-            "description": "Internal Server Error",
-            "model": ErrorResponse,
-        },
-    },
-)
+@router.get("/{session_id}", **LIST_MESSAGES_ROUTE)
 def list_messages(
         session_id: str,
-        db: Session = Depends(get_db),
+        db: Session = Depends(get_read_db),
         limit: Optional[int] = Query(DEFAULT_LIMIT, ge=0, le=100, description="Maximum number of results to return"),
-        offset: Optional[int] = Query(DEFAULT_OFFSET, ge=0, description="Starting position of results"),
+        offset: Optional[int] = Query(DEFAULT_OFFSET, ge=0, description="Starting position of results (ignored when `cursor` is given)"),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from the `X-Next-Cursor` header of the previous page"),
         sender: Optional[str] = Query(None, description="Filter messages by sender (`user` or `system`)"),
-        query: Optional[str] = Query(None, description="Search text within message content"),
+        query: Optional[str] = Query(
+            None,
+            description=(
+                "Full-text search within message content: all words must match (`hello world`), "
+                "`hel*` matches a prefix and `\"hello world\"` an exact phrase"
+            ),
+        ),
+        sort: MessageSort = Query(MessageSort.TIME, description="`time` (default) or `relevance` (requires `query`)"),
+        if_none_match: Optional[str] = Header(None, alias=IF_NONE_MATCH_HEADER, description="ETag of a previously returned page"),
+        accept: Optional[str] = _ACCEPT,
 ):
     """
     List all messages belonging to a given session.
     Returns a list of messages ordered by insertion time.
+    When more messages are available, the `X-Next-Cursor` response header holds the cursor of the next page.
+    Answers `304 Not Modified` when `If-None-Match` holds the page's current ETag.
     """
     service = get_service(db)
 
-    results = service.get_messages(
-        session_id=session_id, limit=limit, offset=offset, sender=sender, query=query
+    media_type = negotiate(accept)
+    version = service.get_session_version(session_id)
+    etag = page_etag(version, media_type, limit, offset, cursor, sender, query, sort.value)
+    if version and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    page = service.get_message_page(
+        session_id=session_id, limit=limit, offset=offset, sender=sender, query=query, cursor=cursor, sort=sort.value, version=version
     )
-    return [MessageOut(**m.__dict__) for m in results]
+    headers = {ETAG_HEADER: etag, VARY_HEADER: ACCEPT_HEADER}
+    if page.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return message_list_response(media_type, page.messages, headers)
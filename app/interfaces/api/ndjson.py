@@ -0,0 +1,38 @@
+from typing import AsyncIterator, Iterable, Iterator, List
+
+from app.core.constants import EXPORT_BATCH_SIZE
+from app.domain.entities.message import Message
+from app.interfaces.schemas.message_schema import message_json
+
+"""
+NDJSON encoding of message streams for the export endpoint.
+Lines are grouped into chunks of EXPORT_BATCH_SIZE so each ASGI send carries many messages.
+"""
+
+
+def _line(message: Message) -> bytes:
+    return message_json.dump_json(message) + b"\n"
+
+
+def iter_ndjson(messages: Iterable[Message], chunk_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Encode messages as NDJSON, one chunk per `chunk_size` lines."""
+    chunk: List[bytes] = []
+    for message in messages:
+        chunk.append(_line(message))
+        if len(chunk) == chunk_size:
+            yield b"".join(chunk)
+            chunk = []
+    if chunk:
+        yield b"".join(chunk)
+
+
+async def aiter_ndjson(messages: AsyncIterator[Message], chunk_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[bytes]:
+    """Asyncio variant of iter_ndjson."""
+    chunk: List[bytes] = []
+    async for message in messages:
+        chunk.append(_line(message))
+        if len(chunk) == chunk_size:
+            yield b"".join(chunk)
+            chunk = []
+    if chunk:
+        yield b"".join(chunk)
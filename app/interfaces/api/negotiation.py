@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+from typing import Any, List, Mapping, Optional
+
+import msgpack
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from starlette.responses import Response
+
+from app.core.constants import MEDIA_TYPE_JSON, MEDIA_TYPE_MSGPACK, MEDIA_TYPES_MSGPACK
+from app.domain.entities.batch_result import BatchItemResult
+from app.domain.entities.message import Message
+from app.interfaces.api.responses import JSONBytesResponse, MsgPackResponse
+from app.interfaces.schemas.message_schema import BatchOut, MessageBatchIn, message_json, message_list_json
+
+"""
+Content negotiation between JSON and MessagePack for the message endpoints.
+
+`Accept: application/msgpack` (or `application/x-msgpack`) selects a MessagePack body with the
+same shape as the JSON one: maps keyed by the MessageOut field names. Timestamps are sent as the
+MessagePack timestamp extension (UTC) instead of ISO strings, so neither side formats or parses
+dates; `metadata.processed_at` stays the stored string. Errors are always JSON.
+`POST /api/messages/batch` also accepts a MessagePack body when its Content-Type says so.
+"""
+
+
+def _pack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        # Stored timestamps are UTC but read back naive from SQLite
+        return msgpack.Timestamp.from_datetime(value.replace(tzinfo=timezone.utc))
+    raise TypeError(f"Cannot encode {type(value).__name__} as MessagePack")
+
+
+def packb(value: Any) -> bytes:
+    return msgpack.packb(value, datetime=True, default=_pack_default)
+
+
+def _quality(media_range: str) -> float:
+    for param in media_range.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """
+    Media type of the response body: MessagePack when the client lists it with a quality at least
+    as high as application/json's, JSON otherwise (wildcards and a missing header mean JSON).
+    """
+    if not accept or "msgpack" not in accept:
+        return MEDIA_TYPE_JSON
+    msgpack_q = json_q = 0.0
+    for media_range in accept.split(","):
+        media_type = media_range.split(";", 1)[0].strip().lower()
+        if media_type in MEDIA_TYPES_MSGPACK:
+            msgpack_q = max(msgpack_q, _quality(media_range))
+        elif media_type == MEDIA_TYPE_JSON:
+            json_q = max(json_q, _quality(media_range))
+    return MEDIA_TYPE_MSGPACK if msgpack_q > 0 and msgpack_q >= json_q else MEDIA_TYPE_JSON
+
+
+def message_response(media_type: str, message: Message, status_code: int) -> Response:
+    if media_type == MEDIA_TYPE_MSGPACK:
+        return MsgPackResponse(packb(message.to_dict()), status_code=status_code)
+    return JSONBytesResponse(message_json.dump_json(message), status_code=status_code)
+
+
+def message_list_response(media_type: str, messages: List[Message], headers: Optional[Mapping[str, str]] = None) -> Response:
+    if media_type == MEDIA_TYPE_MSGPACK:
+        return MsgPackResponse(packb([message.to_dict() for message in messages]), headers=headers)
+    return JSONBytesResponse(message_list_json.dump_json(messages), headers=headers)
+
+
+def batch_response(media_type: str, results: List[BatchItemResult]) -> Response:
+    body = BatchOut.from_results(results)
+    if media_type == MEDIA_TYPE_MSGPACK:
+        return MsgPackResponse(packb(body.model_dump()))
+    return JSONBytesResponse(body.model_dump_json())
+
+
+def _body_errors(exc: ValidationError) -> List[dict]:
+    """Pydantic errors located under `body`, like the ones FastAPI reports for a declared body."""
+    return [{**error, "loc": ("body", *error["loc"])} for error in exc.errors()]
+
+
+async def batch_body(request: Request) -> MessageBatchIn:
+    """
+    Dependency decoding a batch body from JSON or, with a MessagePack Content-Type, from MessagePack.
+    Malformed or invalid bodies raise RequestValidationError, so they get the usual 400 error.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    try:
+        if content_type in MEDIA_TYPES_MSGPACK:
+            try:
+                data = msgpack.unpackb(body)
+            except ValueError:  # every unpacking error (extra data, bad format, truncated) is one
+                raise RequestValidationError([{"type": "msgpack_invalid", "loc": ("body",), "msg": "Invalid MessagePack", "input": None}])
+            return MessageBatchIn.model_validate(data)
+        return MessageBatchIn.model_validate_json(body)
+    except ValidationError as exc:
+        raise RequestValidationError(_body_errors(exc))
@@ -0,0 +1,20 @@
+from starlette.responses import Response
+
+from app.core.constants import MEDIA_TYPE_JSON, MEDIA_TYPE_MSGPACK
+
+"""
+Response fast path: handlers serialize domain objects to JSON bytes themselves (see the precompiled
+TypeAdapters in message_schema) and return them in a JSONBytesResponse. FastAPI passes Response
+instances through untouched, so `response_model` on the route keeps documenting the schema without
+validating and encoding the body a second time. MessagePack bodies take the same path (see negotiation).
+"""
+
+
+class JSONBytesResponse(Response):
+    """Response whose body is already-encoded JSON bytes."""
+    media_type = MEDIA_TYPE_JSON
+
+
+class MsgPackResponse(Response):
+    """Response whose body is already-encoded MessagePack bytes."""
+    media_type = MEDIA_TYPE_MSGPACK
@@ -0,0 +1,237 @@
+from typing import List
+from fastapi import status
+from fastapi.responses import StreamingResponse
+from app.interfaces.schemas.message_schema import MessageOut, MessageBatchIn, BatchOut, SessionStatsOut
+from app.interfaces.schemas.error_schema import ErrorResponse
+from app.core.constants import NEXT_CURSOR_HEADER, MEDIA_TYPE_NDJSON, MEDIA_TYPE_EVENT_STREAM, ETAG_HEADER, IF_NONE_MATCH_HEADER
+from app.core.constants import MEDIA_TYPE_JSON, MEDIA_TYPE_MSGPACK
+
+"""
+OpenAPI route definitions shared by the sync and async message routers,
+so both data paths publish exactly the same schema.
+"""
+
+_COMPONENT_REF = "#/components/schemas/{model}"
+_MSGPACK_NOTE = f" Send `Accept: {MEDIA_TYPE_MSGPACK}` to receive the same fields as MessagePack (timestamps as MessagePack timestamps)."
+
+
+def _msgpack_content(schema: dict) -> dict:
+    return {MEDIA_TYPE_MSGPACK: {"schema": schema}}
+
+
+# The batch body is decoded by a dependency (JSON or MessagePack), so its schema is declared here;
+# MessageIn itself is already a component through POST /api/messages
+_BATCH_IN_SCHEMA = {
+    key: value
+    for key, value in MessageBatchIn.model_json_schema(ref_template=_COMPONENT_REF).items()
+    if key != "$defs"
+}
+
+# --- POST /api/messages ---
+CREATE_MESSAGE_ROUTE = dict(
+    response_model=MessageOut,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create Message",
+    description=(
+            "Creates a new message for a specific chat session. "
+            "The message must include a unique `message_id`, valid `sender` (`user` or `system`), "
+            "and non-empty `content`." + _MSGPACK_NOTE
+    ),
+    responses={
+        201: {
+            "description": "Message created successfully",
+            "model": MessageOut,
+            "content": _msgpack_content({"$ref": _COMPONENT_REF.format(model="MessageOut")}),
+        },
+        400: {
+            "description": "Bad Request (invalid format, sender or missing fields)",
+            "model": ErrorResponse,
+        },
+        401: {"description": "Unauthorized",
+              "model": ErrorResponse
+        },
+        409: {
+            "description": "Conflict (duplicate message_id)",
+            "model": ErrorResponse,
+        },
+        500: {
+            "description": "Internal Server Error",
+            "model": ErrorResponse,
+        },
+    },
+)
+
+# --- POST /api/messages/batch ---
+CREATE_MESSAGES_BATCH_ROUTE = dict(
+    response_model=BatchOut,
+    status_code=status.HTTP_200_OK,
+    summary="Create Messages in Batch",
+    description=(
+            "Creates several messages in a single request and a single database transaction. "
+            "Each entry goes through the same validation, filtering and metadata pipeline as `POST /api/messages`. "
+            "Invalid entries and duplicate `message_id`s are reported per item and never fail the whole batch. "
+            f"The body may also be sent as MessagePack with `Content-Type: {MEDIA_TYPE_MSGPACK}`." + _MSGPACK_NOTE
+    ),
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {MEDIA_TYPE_JSON: {"schema": _BATCH_IN_SCHEMA}, **_msgpack_content(_BATCH_IN_SCHEMA)},
+        },
+    },
+    responses={
+        200: {
+            "description": "Batch processed; see the status of each entry",
+            "model": BatchOut,
+            "content": _msgpack_content({"$ref": _COMPONENT_REF.format(model="BatchOut")}),
+        },
+        400: {
+            "description": "Bad Request (malformed batch body)",
+            "model": ErrorResponse,
+        },
+        401: {"description": "Unauthorized",
+              "model": ErrorResponse
+        },
+        500: {
+            "description": "Internal Server Error",
+            "model": ErrorResponse,
+        },
+    },
+)
+
+# --- GET /api/messages/{session_id} ---
+LIST_MESSAGES_ROUTE = dict(
+    response_model=List[MessageOut],
+    summary="List Messages by Session",
+    description=(
+            "Retrieves all messages associated with a given session ID. "
+            "Supports pagination (`limit`, `offset`) and optional filtering by `sender`. "
+            f"For long sessions prefer keyset pagination: pass the `{NEXT_CURSOR_HEADER}` header of a page "
+            "as `cursor` to fetch the next one at constant cost. "
+            f"Every page carries an `{ETAG_HEADER}` that changes whenever the session receives a message; send it back "
+            f"in `{IF_NONE_MATCH_HEADER}` to get an empty `304` while nothing changed." + _MSGPACK_NOTE
+    ),
+    responses={
+        200: {
+            "description": "Successful retrieval of messages",
+            "model": List[MessageOut],
+            "content": _msgpack_content({"type": "array", "items": {"$ref": _COMPONENT_REF.format(model="MessageOut")}}),
+            "headers": {
+                NEXT_CURSOR_HEADER: {
+                    "description": "Cursor of the next page; absent on the last page",
+                    "schema": {"type": "string"},
+                },
+                ETAG_HEADER: {
+                    "description": "Version of this page, for `If-None-Match`",
+                    "schema": {"type": "string"},
+                },
+            },
+        },
+        304: {"description": "Not Modified (the session has not changed since the page tagged `If-None-Match`)"},
+        400: {
+            "description": "Bad Request (invalid query parameters or cursor)",
+            "model": ErrorResponse,
+        },
+        401: {"description": "Unauthorized",
+              "model": ErrorResponse
+        },
+        404: {
+            "description": "No messages found for the given session ID",
+            "model": ErrorResponse,
+        },
+        500: {
+            "description": "Internal Server Error",
+            "model": ErrorResponse,
+        },
+    },
+)
+
+# --- GET /api/messages/{session_id}/export ---
+EXPORT_MESSAGES_ROUTE = dict(
+    response_class=StreamingResponse,
+    summary="Export Session as NDJSON",
+    description=(
+            "Streams every message of a session as newline-delimited JSON, one `MessageOut` object per line, "
+            "ordered by timestamp. Rows are read from the database in batches while the response is sent, "
+            "so sessions of any size can be archived in a single request."
+    ),
+    responses={
+        200: {
+            "description": "NDJSON stream of the session's messages",
+            "content": {
+                MEDIA_TYPE_NDJSON: {
+                    "schema": {"type": "string", "description": "One MessageOut JSON object per line"},
+                },
+            },
+        },
+        401: {"description": "Unauthorized",
+              "model": ErrorResponse
+        },
+        404: {
+            "description": "No messages found for the given session ID",
+            "model": ErrorResponse,
+        },
+        500: {
+            "description": "Internal Server Error",
+            "model": ErrorResponse,
+        },
+    },
+)
+
+# --- GET /api/messages/{session_id}/stats ---
+SESSION_STATS_ROUTE = dict(
+    response_model=SessionStatsOut,
+    summary="Session Statistics",
+    description=(
+            "Returns the message count (total and per sender), total words and characters, and the first "
+            "and last message timestamps of a session. The aggregates are updated in the same transaction "
+            "as every insert, so the cost of this call does not depend on the size of the session."
+    ),
+    responses={
+        200: {
+            "description": "Aggregates of the session",
+            "model": SessionStatsOut,
+        },
+        401: {"description": "Unauthorized",
+              "model": ErrorResponse
+        },
+        404: {
+            "description": "No messages found for the given session ID",
+            "model": ErrorResponse,
+        },
+        500: {
+            "description": "Internal Server Error",
+            "model": ErrorResponse,
+        },
+    },
+)
+
+# --- GET /api/messages/{session_id}/stream ---
+STREAM_MESSAGES_ROUTE = dict(
+    response_class=StreamingResponse,
+    summary="Live Tail of a Session (Server-Sent Events)",
+    description=(
+            "Keeps the connection open and pushes every message stored in the session from now on, as soon "
+            "as it is committed, as a `message` event whose data is a `MessageOut` object. Replaces polling "
+            "`GET /api/messages/{session_id}`; load the history with that endpoint first. A subscriber that falls "
+            "too far behind receives an `error` event (`SLOW_CONSUMER`) and the stream ends; so does one that "
+            "loses the last free slot to another stream opened at the same time (`TOO_MANY_SUBSCRIBERS`). "
+            "The same feed is available over WebSocket at `/api/messages/{session_id}/ws`."
+    ),
+    responses={
+        200: {
+            "description": "Event stream of the session's new messages",
+            "content": {
+                MEDIA_TYPE_EVENT_STREAM: {
+                    "schema": {"type": "string", "description": "`message` events carrying one MessageOut JSON object each"},
+                },
+            },
+        },
+        401: {"description": "Unauthorized",
+              "model": ErrorResponse
+        },
+        503: {
+            "description": "Service Unavailable (too many open streams on this worker)",
+            "model": ErrorResponse,
+        },
+    },
+)
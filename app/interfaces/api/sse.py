@@ -0,0 +1,55 @@
+import json
+from typing import AsyncIterator
+
+from app.core.constants import ERRORS, ERROR_FIELD, STATUS_ERROR, STATUS_FIELD, SSE_EVENT_ERROR, SSE_EVENT_MESSAGE
+from app.core.constants import ERROR_CODE_SLOW_CONSUMER, ERROR_CODE_TOO_MANY_SUBSCRIBERS
+from app.core.errors import TooManySubscribersError
+from app.domain.entities.message import Message
+from app.infrastructure.message_hub_impl import InProcessMessageHub
+from app.interfaces.schemas.message_schema import message_json
+
+"""
+Server-Sent Events encoding of a live-tail subscription.
+Each message is one `message` event whose data is its MessageOut JSON (a single line: JSON escapes
+newlines); messages delivered together are sent in one chunk. Comment lines keep idle streams open through proxies.
+"""
+
+_OPENED = b": subscribed\n\n"
+_HEARTBEAT = b": keep-alive\n\n"
+_MESSAGE_PREFIX = f"event: {SSE_EVENT_MESSAGE}\ndata: ".encode()
+
+
+def _error(code: str) -> bytes:
+    return f"event: {SSE_EVENT_ERROR}\ndata: {json.dumps({STATUS_FIELD: STATUS_ERROR, ERROR_FIELD: ERRORS[code]})}\n\n".encode()
+
+
+_SLOW_CONSUMER = _error(ERROR_CODE_SLOW_CONSUMER)
+_TOO_MANY_SUBSCRIBERS = _error(ERROR_CODE_TOO_MANY_SUBSCRIBERS)
+
+
+def _event(message: Message) -> bytes:
+    return _MESSAGE_PREFIX + message_json.dump_json(message) + b"\n\n"
+
+
+async def iter_sse(hub: InProcessMessageHub, session_id: str, heartbeat_seconds: float) -> AsyncIterator[bytes]:
+    """
+    Subscribe to a session and stream it until the subscription ends; an evicted subscriber gets a
+    final SLOW_CONSUMER `error` event, one refused at the subscriber limit a TOO_MANY_SUBSCRIBERS one.
+    The subscription only exists while the generator runs and is always released, including when the
+    client disconnects mid-stream; a response whose body is never iterated holds none.
+    """
+    subscription = None
+    try:
+        try:
+            subscription = hub.subscribe(session_id)
+        except TooManySubscribersError:
+            yield _TOO_MANY_SUBSCRIBERS
+            return
+        yield _OPENED
+        while (batch := await subscription.get(heartbeat_seconds)) is not None:
+            yield b"".join(map(_event, batch)) if batch else _HEARTBEAT
+        if subscription.evicted:
+            yield _SLOW_CONSUMER
+    finally:
+        if subscription is not None:
+            hub.unsubscribe(subscription)
@@ -0,0 +1,73 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, WebSocket
+from fastapi.responses import StreamingResponse
+
+from app.core.auth import verify_api_key
+from app.core.config import settings
+from app.core.constants import ROUTER_TAG_MESSAGES, MEDIA_TYPE_EVENT_STREAM, WS_CLOSE_TRY_AGAIN_LATER
+from app.core.constants import ERROR_CODE_SLOW_CONSUMER, ERROR_CODE_TOO_MANY_SUBSCRIBERS
+from app.core.errors import TooManySubscribersError
+from app.infrastructure.message_hub_impl import Subscription, message_hub
+from app.interfaces.api.route_docs import STREAM_MESSAGES_ROUTE
+from app.interfaces.api.sse import iter_sse
+from app.interfaces.schemas.message_schema import message_json
+
+"""
+Live-tail routes, mounted next to the message routes on both data paths.
+They never touch the database: each connection is one subscription to the worker's message hub,
+served on the event loop, so idle subscribers cost no thread and no query.
+"""
+
+router = APIRouter(tags=[ROUTER_TAG_MESSAGES], dependencies=[Depends(verify_api_key)])
+
+_STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+# --- GET /api/messages/{session_id}/stream ---
+@router.get("/{session_id}/stream", **STREAM_MESSAGES_ROUTE)
+async def stream_messages(session_id: str):
+    """
+    Push the session's new messages as Server-Sent Events until the client disconnects.
+    The subscription is opened by the body itself; the limit is checked here first so that a full
+    worker still answers 503.
+    """
+    if message_hub.full():
+        raise TooManySubscribersError()
+    return StreamingResponse(
+        iter_sse(message_hub, session_id, settings.STREAM_HEARTBEAT_SECONDS),
+        media_type=MEDIA_TYPE_EVENT_STREAM,
+        headers=_STREAM_HEADERS,
+    )
+
+
+# --- WebSocket /api/messages/{session_id}/ws ---
+@router.websocket("/{session_id}/ws")
+async def tail_messages(websocket: WebSocket, session_id: str):
+    """
+    Push the session's new messages as WebSocket text frames (one MessageOut JSON object each).
+    Evicted or rejected subscribers are closed with code 1013 and the error code as reason.
+    """
+    try:
+        subscription = message_hub.subscribe(session_id)
+    except TooManySubscribersError:
+        await websocket.close(code=WS_CLOSE_TRY_AGAIN_LATER, reason=ERROR_CODE_TOO_MANY_SUBSCRIBERS)
+        return
+    await websocket.accept()
+    watcher = asyncio.create_task(_unsubscribe_on_disconnect(websocket, subscription))
+    try:
+        while (batch := await subscription.get()) is not None:
+            for message in batch:
+                await websocket.send_text(message_json.dump_json(message).decode())
+        if subscription.evicted:
+            await websocket.close(code=WS_CLOSE_TRY_AGAIN_LATER, reason=ERROR_CODE_SLOW_CONSUMER)
+    finally:
+        watcher.cancel()
+        message_hub.unsubscribe(subscription)
+
+
+async def _unsubscribe_on_disconnect(websocket: WebSocket, subscription: Subscription) -> None:
+    """Read (and ignore) client frames until the client goes away, then end the subscription."""
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+    message_hub.unsubscribe(subscription)
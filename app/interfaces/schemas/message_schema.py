@@ -1,8 +1,28 @@
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from enum import Enum
-from pydantic import BaseModel, Field
-from app.core.constants import METADATA_FIELDS, EXAMPLE_TIMESTAMP
+from pydantic import BaseModel, Field, TypeAdapter
+from app.domain.entities.message import Message
+from app.domain.entities.batch_result import BatchItemResult
+from app.domain.entities.session_stats import SessionStats
+from app.core.constants import (
+    ERRORS,
+    SORT_TIME,
+    SORT_RELEVANCE,
+    METADATA_FIELDS,
+    EXAMPLE_TIMESTAMP,
+    MAX_BATCH_SIZE,
+    BATCH_STATUS_CREATED,
+    ERROR_CODE_DUPLICATE_MESSAGE_ID,
+    ERROR_MSG_DUPLICATE_MESSAGE_ID,
+    ERROR_DETAIL_DUPLICATE_MESSAGE_ID,
+)
+
+class MessageSort(str, Enum):
+    """Ordering of a session listing."""
+    TIME = SORT_TIME
+    RELEVANCE = SORT_RELEVANCE
+
 
 class MessageIn(BaseModel):
     """Input model for creating a message."""
@@ -11,6 +31,16 @@ class MessageIn(BaseModel):
     content: str = Field(..., example="Hello world!", description="Message text content")
     sender: str = Field(..., example="user", description="Who sent the message (user or system)")
 
+    def to_domain(self) -> Message:
+        """Convert the request body to a domain Message (timestamp is set by the service)."""
+        return Message(
+            message_id=self.message_id,
+            session_id=self.session_id,
+            content=self.content,
+            timestamp=None,
+            sender=self.sender,
+        )
+
 
 class MetadataOut(BaseModel):
     """Metadata information automatically generated for a message."""
@@ -35,3 +65,71 @@ class MessageOut(BaseModel):
         },
         description="Automatically generated metadata about the message content",
     )
+
+
+class MessageBatchIn(BaseModel):
+    """Input model for creating several messages in one request."""
+    messages: List[MessageIn] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description=f"Messages to create (between 1 and {MAX_BATCH_SIZE} per request)",
+    )
+
+
+class BatchItemOut(BaseModel):
+    """Result of a single entry of a batch request."""
+    index: int = Field(..., example=0, description="Position of the entry in the submitted batch")
+    message_id: str = Field(..., example="ms001")
+    status: str = Field(..., example=BATCH_STATUS_CREATED, description="`created` or `rejected`")
+    message: Optional[MessageOut] = Field(None, description="Stored message, present when the entry was created")
+    error: Optional[Dict[str, Any]] = Field(
+        None,
+        example={
+            "code": ERROR_CODE_DUPLICATE_MESSAGE_ID,
+            "message": ERROR_MSG_DUPLICATE_MESSAGE_ID,
+            "details": ERROR_DETAIL_DUPLICATE_MESSAGE_ID,
+        },
+        description="Error explaining why the entry was rejected",
+    )
+
+
+class BatchOut(BaseModel):
+    """Output model for a batch request, with one result per submitted message."""
+    created: int = Field(..., example=1)
+    rejected: int = Field(..., example=0)
+    results: List[BatchItemOut]
+
+    @staticmethod
+    def from_results(results: List[BatchItemResult]) -> "BatchOut":
+        """Build the response body from the per-item results of the service."""
+        items = [
+            BatchItemOut(
+                index=r.index,
+                message_id=r.message_id,
+                status=r.status,
+                message=MessageOut(**r.message.to_dict()) if r.message else None,
+                error=ERRORS[r.error_code] if r.error_code else None,
+            )
+            for r in results
+        ]
+        created = sum(1 for r in results if r.status == BATCH_STATUS_CREATED)
+        return BatchOut(created=created, rejected=len(results) - created, results=items)
+
+
+
+class SessionStatsOut(BaseModel):
+    """Aggregates of a session."""
+    session_id: str = Field(..., example="sn001")
+    message_count: int = Field(..., example=3)
+    word_count: int = Field(..., example=12, description="Sum of the word counts of all messages")
+    character_count: int = Field(..., example=64, description="Sum of the character counts of all messages")
+    first_timestamp: datetime = Field(..., example=EXAMPLE_TIMESTAMP, description="Timestamp of the oldest message")
+    last_timestamp: datetime = Field(..., example=EXAMPLE_TIMESTAMP, description="Timestamp of the newest message")
+    senders: Dict[str, int] = Field(..., example={"user": 2, "system": 1}, description="Number of messages per sender")
+
+# Precompiled serializers for the response fast path: domain messages are dumped straight to JSON
+# bytes with the same field names and formats as MessageOut, without building or validating models.
+message_json = TypeAdapter(Message)
+message_list_json = TypeAdapter(List[Message])
+session_stats_json = TypeAdapter(SessionStats)
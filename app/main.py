@@ -1,11 +1,30 @@
 from fastapi import FastAPI
-from app.interfaces.api.messages_router import router as messages_router
 from app.core.config import settings
-from app.infrastructure.database import Base, engine
+from app.infrastructure.database import engine, read_engine, is_async_database_url
+from app.infrastructure.schema import init_db
+from app.infrastructure.write_behind import write_behind_writer
 from app.core.errors import init_error_handlers
-from app.core.limiter import limiter
-from app.core.constants import ROUTER_TAG_MESSAGES
+from app.core.api_keys import api_key_registry
+from app.core.constants import ROUTER_TAG_MESSAGES, METRICS_PATH
+from app.core.metrics import MetricsMiddleware, PoolCollector, CacheCollector, MessageIdFilterCollector, HubCollector
+from app.core.metrics import register_collector, metrics_response
+from app.infrastructure.message_cache_impl import message_cache
+from app.infrastructure.message_hub_impl import message_hub
+from app.interfaces.api.stream_router import router as stream_router
+from app.infrastructure.sharding import message_shards
+from app.infrastructure.message_id_filter import message_id_filter
+from app.infrastructure.retention import retention_job
 
+# Select the data path from the driver in DATABASE_URL
+if is_async_database_url(settings.DATABASE_URL):  # pragma: no cover
+    from app.interfaces.api.async_messages_router import router as messages_router
+    from app.infrastructure.async_database import async_engine, async_read_engine
+    pool_engines = {"async": async_engine.sync_engine, "async_read": async_read_engine.sync_engine}
+else:
+    from app.interfaces.api.messages_router import router as messages_router
+    pool_engines = {"sync": engine, "sync_read": read_engine}
+    if message_shards is not None:  # pragma: no cover
+        pool_engines.update({f"shard{index}": shard for index, shard in enumerate(message_shards.engines)})
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -13,17 +32,44 @@ app = FastAPI(
     version=settings.API_VERSION,
 )
 
-# Register global limiter
-app.state.limiter = limiter
-
 # Register global error handlers
 init_error_handlers(app)
 
+# Prometheus metrics: request timing middleware and scrape-time collectors
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    register_collector("db_pool", PoolCollector(pool_engines))
+    register_collector("message_cache", CacheCollector(message_cache))
+    register_collector("message_hub", HubCollector(message_hub))
+    if message_id_filter is not None:  # pragma: no cover
+        register_collector("message_id_filter", MessageIdFilterCollector(message_id_filter))
+
+    @app.get(METRICS_PATH, include_in_schema=False)
+    def metrics():
+        """Prometheus text exposition of the process metrics."""
+        return metrics_response()
+
 
 @app.on_event("startup")
 def on_startup():
-    """Initialize database schema on application startup."""
-    Base.metadata.create_all(bind=engine)
+    """Initialize database schema, load the message_id filter and start refreshing the API key file on application startup."""
+    init_db(engine)
+    if message_shards is not None:  # pragma: no cover
+        message_shards.init_schema()
+    if message_id_filter is not None:  # pragma: no cover
+        message_id_filter.build(message_shards.engines if message_shards is not None else [engine])
+    api_key_registry.start()
+    if retention_job is not None:  # pragma: no cover
+        retention_job.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    """Commit any queued write-behind inserts before the process exits."""
+    write_behind_writer.stop()
+    api_key_registry.stop()
+    if retention_job is not None:  # pragma: no cover
+        retention_job.stop()
 
 
 # Register main routes
@@ -32,3 +78,8 @@ app.include_router(
     prefix=f"{settings.API_PREFIX}/messages",
     tags=[ROUTER_TAG_MESSAGES],
 )
+app.include_router(
+    stream_router,
+    prefix=f"{settings.API_PREFIX}/messages",
+    tags=[ROUTER_TAG_MESSAGES],
+)
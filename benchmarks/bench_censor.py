@@ -0,0 +1,77 @@
+"""
+Microbenchmark: per-message censoring cost as the blocklist grows.
+
+Compares the legacy implementation (one `in` check and one `str.replace` per banned word)
+with CensorEngine as configured by default (substring matching; one str.find per word up to
+CENSOR_SIMPLE_MAX_WORDS, the trie-compiled regex over the lowercased text above) and with its
+case-insensitive regex alone, the path taken only by texts whose length changes when lowercased.
+
+Usage:
+    python -m benchmarks.bench_censor [--sizes 3 10 100 1000 10000] [--messages 2000]
+"""
+import argparse
+import random
+import string
+import time
+
+from app.application.services.censor import CensorEngine
+from app.core.constants import CENSOR_MASK
+
+SEED = 1234
+MESSAGE_WORDS = 40
+
+
+def legacy_filter(content, words):
+    lowered = content.lower()
+    for word in words:
+        if word in lowered:
+            lowered = lowered.replace(word, CENSOR_MASK)
+    return lowered
+
+
+def random_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+
+
+def build_messages(rng, words, count):
+    vocabulary = [random_word(rng) for _ in range(500)]
+    messages = []
+    for _ in range(count):
+        tokens = [rng.choice(vocabulary) for _ in range(MESSAGE_WORDS)]
+        # Roughly one banned word every other message
+        if rng.random() < 0.5:
+            tokens[rng.randrange(MESSAGE_WORDS)] = rng.choice(words)
+        messages.append(" ".join(tokens).capitalize() + ".")
+    return messages
+
+
+def per_message_us(func, messages):
+    start = time.perf_counter()
+    for message in messages:
+        func(message)
+    return (time.perf_counter() - start) / len(messages) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 10, 100, 1000, 10000])
+    parser.add_argument("--messages", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(SEED)
+    print(f"{'words':>7} | {'legacy us/msg':>14} | {'engine us/msg':>14} | {'regex us/msg':>13} | {'build ms':>9} | speedup")
+    for size in args.sizes:
+        words = sorted({random_word(rng) for _ in range(size * 2)})[:size]
+        messages = build_messages(rng, words, args.messages)
+
+        start = time.perf_counter()
+        engine = CensorEngine(words)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        legacy = per_message_us(lambda m: legacy_filter(m, words), messages)
+        configured = per_message_us(engine.censor, messages)
+        regex = per_message_us(lambda m: engine.pattern.sub(CENSOR_MASK, m), messages)
+        print(f"{size:>7} | {legacy:>14.2f} | {configured:>14.2f} | {regex:>13.2f} | {build_ms:>9.1f} | {legacy / configured:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
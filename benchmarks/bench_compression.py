@@ -0,0 +1,122 @@
+"""
+Benchmark: database size and read latency with content compression off and on.
+
+Seeds the same realistic mix into two databases - mostly short chat turns, some paragraphs and a
+few multi-kilobyte tool outputs (log-like lines) - one with CONTENT_COMPRESSION_ENABLED and one
+without, then reports the file size after VACUUM and the time to read pages of a session, to
+export it and to run a full-text query on it.
+
+Usage:
+    python -m benchmarks.bench_compression [--sessions 50] [--messages 200] [--rounds 200]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+from typing import List
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.constants import VALID_SENDERS
+from app.domain.entities.message import Message
+from app.infrastructure.message_repository_impl import SQLiteMessageRepository
+from benchmarks.seed import SEED, START_TIME, content, make_engine, vocabulary
+
+# (share of messages, words or log lines) per kind of message
+MIX = [(0.80, "chat", (5, 40)), (0.15, "paragraph", (60, 200)), (0.05, "tool output", (40, 300))]
+PAGE = 50
+
+
+def tool_output(rng: random.Random, words: List[str], lines: int) -> str:
+    return "\n".join(
+        f"2025-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}Z INFO worker-{rng.randint(1, 8)} "
+        f"{rng.choice(words)} {rng.choice(words)} status=ok elapsed_ms={rng.randint(1, 999)}"
+        for i in range(lines)
+    )
+
+
+def make_content(rng: random.Random, words: List[str]) -> str:
+    roll, cumulative = rng.random(), 0.0
+    for share, kind, (low, high) in MIX:
+        cumulative += share
+        if roll < cumulative:
+            break
+    count = rng.randint(low, high)
+    return tool_output(rng, words, count) if kind == "tool output" else content(rng, words, count)
+
+
+def seed(engine, sessions: int, messages: int) -> int:
+    """Insert the mix; returns the total UTF-8 size of the bodies."""
+    rng = random.Random(SEED)
+    words = vocabulary(rng)
+    db = sessionmaker(bind=engine)()
+    repo = SQLiteMessageRepository(db)
+    total = 0
+    for s in range(sessions):
+        batch = []
+        for m in range(messages):
+            body = make_content(rng, words)
+            total += len(body.encode())
+            batch.append(Message(
+                f"bench-s{s}-m{m}", f"bench-s{s}", body, START_TIME + timedelta(seconds=m), VALID_SENDERS[m % len(VALID_SENDERS)],
+            ))
+        repo.save_many(batch)
+    db.close()
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+    return total
+
+
+def mean_ms(func, rounds: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def measure(engine, sessions: int, messages: int, rounds: int) -> List[float]:
+    db = sessionmaker(bind=engine)()
+    repo = SQLiteMessageRepository(db)
+    rng = random.Random(SEED)
+
+    def page():
+        repo.get_by_session(f"bench-s{rng.randrange(sessions)}", PAGE, rng.randrange(messages - PAGE))
+
+    def export():
+        list(repo.iter_by_session(f"bench-s{rng.randrange(sessions)}"))
+
+    def search():
+        repo.get_page_by_session(f"bench-s{rng.randrange(sessions)}", PAGE, query="status")
+
+    timings = [mean_ms(page, rounds), mean_ms(export, rounds // 10 or 1), mean_ms(search, rounds // 10 or 1)]
+    db.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=200, help="page reads timed per case")
+    args = parser.parse_args()
+
+    print(f"{'compression':<11} | {'body MiB':>8} | {'file MiB':>8} | {'page ms':>7} | {'export ms':>9} | {'search ms':>9}")
+    with tempfile.TemporaryDirectory(prefix="bench_compression_") as directory:
+        for enabled in (False, True):
+            settings.CONTENT_COMPRESSION_ENABLED = enabled
+            path = os.path.join(directory, f"compression-{enabled}.db")
+            engine = make_engine(path)
+            body_bytes = seed(engine, args.sessions, args.messages)
+            page_ms, export_ms, search_ms = measure(engine, args.sessions, args.messages, args.rounds)
+            engine.dispose()
+            print(f"{'on' if enabled else 'off':<11} | {body_bytes / 2**20:>8.1f} | {os.path.getsize(path) / 2**20:>8.1f} | "
+                  f"{page_ms:>7.2f} | {export_ms:>9.2f} | {search_ms:>9.2f}")
+    print(f"threshold {settings.CONTENT_COMPRESSION_MIN_BYTES} bytes, zlib level {settings.CONTENT_COMPRESSION_LEVEL}, {PAGE} messages per page")
+
+
+if __name__ == "__main__":
+    main()
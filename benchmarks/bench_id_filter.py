@@ -0,0 +1,89 @@
+"""
+Benchmark: cost of rejecting a duplicate message_id with and without the Bloom filter, plus the
+filter's memory use and false-positive rate.
+
+Seeds a database, builds the filter from it, then times single-message saves (like POST
+/api/messages) of ids that are already stored (retries) and of new ids. Without the filter every
+duplicate costs an INSERT, the UNIQUE violation and a rollback; with it a duplicate costs one
+indexed lookup and a new id costs a few hash probes.
+
+Usage:
+    python -m benchmarks.bench_id_filter [--sessions 100] [--messages 100] [--attempts 2000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.errors import DuplicateMessageIdError
+from app.domain.entities.message import Message
+from app.infrastructure.message_id_filter import MessageIdFilter
+from app.infrastructure.message_repository_impl import SQLiteMessageRepository
+from benchmarks.seed import START_TIME, Shape, make_engine, seed_database
+
+
+def false_positive_rate(id_filter, probes=100000):
+    return sum(id_filter.might_contain(f"absent-{i}") for i in range(probes)) / probes
+
+
+def time_saves(session_factory, id_filter, message_ids):
+    """Mean microseconds per save of `message_ids`, one commit each; duplicates are expected to raise."""
+    db = session_factory()
+    repo = SQLiteMessageRepository(db, id_filter)
+    start = time.perf_counter()
+    for message_id in message_ids:
+        try:
+            repo.save(Message(message_id, "bench-s0", "retried message", START_TIME, "user"))
+        except DuplicateMessageIdError:
+            pass
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed / len(message_ids) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--attempts", type=int, default=2000, help="saves timed per case")
+    args = parser.parse_args()
+
+    shape = Shape(args.sessions, args.messages)
+    with tempfile.TemporaryDirectory(prefix="bench_id_filter_") as directory:
+        engine = make_engine(os.path.join(directory, "chat.db"))
+        seed_database(engine, shape)
+        session_factory = sessionmaker(bind=engine)
+
+        started = time.perf_counter()
+        id_filter = MessageIdFilter(settings.MESSAGE_ID_FILTER_CAPACITY, settings.MESSAGE_ID_FILTER_ERROR_RATE)
+        loaded = id_filter.build([engine])
+        build_ms = (time.perf_counter() - started) * 1000
+
+        # The same number of ids in a filter sized exactly for them shows the rate at full capacity
+        full = MessageIdFilter(loaded, settings.MESSAGE_ID_FILTER_ERROR_RATE)
+        full.add_many(f"bench-s{s}-m{m}" for s in range(shape.sessions) for m in range(shape.messages))
+
+        print(f"{'filter':<16} | {'ids':>8} | {'capacity':>8} | {'KiB':>7} | {'measured fp':>11} | {'estimated fp':>12}")
+        for name, current in (("as built", id_filter), ("at capacity", full)):
+            stats = current.stats()
+            print(f"{name:<16} | {stats.items:>8} | {current.capacity:>8} | {stats.memory_bytes / 1024:>7.0f} | "
+                  f"{false_positive_rate(current):>11.4%} | {stats.estimated_false_positive_rate:>12.4%}")
+        print(f"built from the database in {build_ms:.0f} ms, {id_filter.hash_count} hashes per id")
+
+        stored = [f"bench-s{i % shape.sessions}-m{i // shape.sessions % shape.messages}" for i in range(args.attempts)]
+        print(f"{'save':<16} | {'no filter':>9} | {'filter':>9}  (us per save)")
+        duplicate = (time_saves(session_factory, None, stored), time_saves(session_factory, id_filter, stored))
+        new = (
+            time_saves(session_factory, None, [f"new-a{i}" for i in range(args.attempts)]),
+            time_saves(session_factory, id_filter, [f"new-b{i}" for i in range(args.attempts)]),
+        )
+        for case, (baseline, filtered) in (("duplicate id", duplicate), ("new id", new)):
+            print(f"{case:<16} | {baseline:>9.1f} | {filtered:>9.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Microbenchmark: memory held per Message entity.
+
+Compares the previous representation (plain dataclass with a per-instance __dict__ and a dict of
+metadata) with the slotted Message / MessageMetadata pair. String and datetime values are shared
+between both runs, so the figures isolate the container overhead.
+
+Usage:
+    python -m benchmarks.bench_message_memory [--count 100000]
+"""
+import argparse
+import gc
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from app.domain.entities.message import Message, MessageMetadata
+
+
+@dataclass
+class LegacyMessage:
+    message_id: str
+    session_id: str
+    content: str
+    timestamp: datetime
+    sender: str
+    metadata: Optional[Dict] = None
+
+
+def legacy(ids, now, content, processed_at):
+    return [
+        LegacyMessage(message_id, "s1", content, now, "user",
+                      {"word_count": 8, "character_count": len(content), "processed_at": processed_at})
+        for message_id in ids
+    ]
+
+
+def slotted(ids, now, content, processed_at):
+    return [
+        Message(message_id, "s1", content, now, "user", MessageMetadata(8, len(content), processed_at))
+        for message_id in ids
+    ]
+
+
+def bytes_per_object(build, count, *args) -> float:
+    gc.collect()
+    tracemalloc.start()
+    objects = build(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(objects) == count
+    return size / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    ids = [f"m{i}" for i in range(args.count)]
+    now = datetime.now(timezone.utc)
+    content = "benchmark message with a handful of words in it"
+    processed_at = now.isoformat()
+
+    old = bytes_per_object(legacy, args.count, ids, now, content, processed_at)
+    new = bytes_per_object(slotted, args.count, ids, now, content, processed_at)
+    print(f"{'representation':>16} | {'bytes/message':>13}")
+    print(f"{'dict + dict':>16} | {old:>13.0f}")
+    print(f"{'slots':>16} | {new:>13.0f}")
+    print(f"saving: {old - new:.0f} bytes per message ({(old - new) / old:.0%})")
+
+
+if __name__ == "__main__":
+    main()
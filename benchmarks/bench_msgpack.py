@@ -0,0 +1,89 @@
+"""
+Microbenchmark: JSON vs MessagePack bodies for the message endpoints.
+
+For pages of GET /api/messages/{session_id} it measures the server's encode cost (TypeAdapter JSON
+fast path vs MessagePack), the client's decode cost to typed values (json.loads plus
+datetime.fromisoformat per timestamp vs unpackb with native timestamps) and the payload size.
+For POST /api/messages/batch it measures decoding and validating the request body in both formats.
+
+Usage:
+    python -m benchmarks.bench_msgpack [--sizes 10 100 1000] [--rounds 2000]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from typing import Callable, List
+
+import msgpack
+
+from app.core.constants import MEDIA_TYPE_JSON, MEDIA_TYPE_MSGPACK
+from app.domain.entities.message import Message, MessageMetadata
+from app.interfaces.api.negotiation import message_list_response
+from app.interfaces.schemas.message_schema import MessageBatchIn
+
+CONTENT = "hello there, this is a chat message of an ordinary length for a widget"
+
+
+def page(size: int) -> List[Message]:
+    now = datetime.now(timezone.utc)
+    metadata = MessageMetadata(14, len(CONTENT), now.isoformat())
+    return [Message(f"m{i}", "s1", CONTENT, now, "user", metadata) for i in range(size)]
+
+
+def batch(size: int) -> dict:
+    return {"messages": [{"message_id": f"b{i}", "session_id": "s1", "content": CONTENT, "sender": "user"} for i in range(size)]}
+
+
+def decode_json(body: bytes) -> list:
+    items = json.loads(body)
+    for item in items:
+        item["timestamp"] = datetime.fromisoformat(item["timestamp"])
+    return items
+
+
+def decode_msgpack(body: bytes) -> list:
+    return msgpack.unpackb(body, timestamp=3)
+
+
+def per_call_us(func: Callable[[], object], rounds: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    print("GET page (server encode, client decode to typed values)")
+    print(f"{'page':>5} | {'format':>7} | {'bytes':>8} | {'encode us':>10} | {'decode us':>10}")
+    for size in args.sizes:
+        messages = page(size)
+        rounds = max(1, args.rounds * 10 // max(size, 10))
+        for media_type, decode in ((MEDIA_TYPE_JSON, decode_json), (MEDIA_TYPE_MSGPACK, decode_msgpack)):
+            body = message_list_response(media_type, messages).body
+            encode_us = per_call_us(lambda: message_list_response(media_type, messages), rounds)
+            decode_us = per_call_us(lambda: decode(body), rounds)
+            print(f"{size:>5} | {media_type.split('/')[1]:>7} | {len(body):>8} | {encode_us:>10.1f} | {decode_us:>10.1f}")
+
+    print()
+    print("POST batch (server decode and validate)")
+    print(f"{'batch':>5} | {'format':>7} | {'bytes':>8} | {'decode us':>10}")
+    for size in args.sizes:
+        body = batch(size)
+        rounds = max(1, args.rounds * 10 // max(size, 10))
+        json_body = json.dumps(body).encode()
+        msgpack_body = msgpack.packb(body)
+        json_us = per_call_us(lambda: MessageBatchIn.model_validate_json(json_body), rounds)
+        msgpack_us = per_call_us(lambda: MessageBatchIn.model_validate(msgpack.unpackb(msgpack_body)), rounds)
+        print(f"{size:>5} | {'json':>7} | {len(json_body):>8} | {json_us:>10.1f}")
+        print(f"{size:>5} | {'msgpack':>7} | {len(msgpack_body):>8} | {msgpack_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
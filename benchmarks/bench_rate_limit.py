@@ -0,0 +1,46 @@
+"""
+Microbenchmark: cost of one rate limit check per request.
+
+Times TokenBucketLimiter.check against the in-memory and the shared (mmap + flock) bucket
+stores over a population of API keys, with limits high enough that every check is allowed.
+
+Usage:
+    python -m benchmarks.bench_rate_limit [--keys 1000] [--checks 200000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from app.core.limiter import InMemoryBucketStore, RateLimitPolicy, SharedMemoryBucketStore, TokenBucketLimiter
+
+SCOPE = "post_message"
+
+
+def per_check_us(limiter: TokenBucketLimiter, keys, checks: int) -> float:
+    for key in keys:
+        limiter.check(key, SCOPE)
+    start = time.perf_counter()
+    for i in range(checks):
+        limiter.check(keys[i % len(keys)], SCOPE)
+    return (time.perf_counter() - start) / checks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--checks", type=int, default=200000)
+    args = parser.parse_args()
+
+    keys = [f"key-{i}" for i in range(args.keys)]
+    policy = RateLimitPolicy({SCOPE: "1000000/second"}, {}, {})
+    with tempfile.TemporaryDirectory(prefix="bench_rate_") as directory:
+        shared = SharedMemoryBucketStore(os.path.join(directory, "buckets.bin"), slots=65536)
+        print(f"{'store':>7} | {'us/check':>9}")
+        for name, store in (("memory", InMemoryBucketStore()), ("shared", shared)):
+            print(f"{name:>7} | {per_check_us(TokenBucketLimiter(store, policy), keys, args.checks):>9.2f}")
+        shared.close()
+
+
+if __name__ == "__main__":
+    main()
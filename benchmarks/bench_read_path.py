@@ -0,0 +1,88 @@
+"""
+Microbenchmark: time and allocations to read one page of a session.
+
+Compares the previous read path (full MessageModel ORM entities, identity map and attribute
+instrumentation, then to_domain()) with the repository's Core column projection.
+
+Usage:
+    python -m benchmarks.bench_read_path [--page 100] [--messages 2000] [--rounds 500]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.infrastructure.message_repository_impl import MessageModel, SQLiteMessageRepository
+from benchmarks.seed import Shape, make_engine, seed_database
+
+
+def legacy_page(db, session_id, limit, offset):
+    stmt = (
+        select(MessageModel)
+        .where(MessageModel.session_id == session_id)
+        .order_by(MessageModel.timestamp.asc(), MessageModel.id.asc())
+        .offset(offset)
+        .limit(limit + 1)
+    )
+    rows = db.execute(stmt).scalars().all()
+    return [row.to_domain() for row in rows[:limit]]
+
+
+def projected_page(db, session_id, limit, offset):
+    return SQLiteMessageRepository(db).get_page_by_session(session_id, limit, offset).messages
+
+
+def measure(func, session_factory, session_id, limit, offset, rounds):
+    """Mean time per page (fresh session per call, like a request) and allocations of one call."""
+    db = session_factory()
+    assert len(func(db, session_id, limit, offset)) == limit
+    db.close()
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        db = session_factory()
+        func(db, session_id, limit, offset)
+        db.close()
+    per_page_us = (time.perf_counter() - start) / rounds * 1e6
+
+    db = session_factory()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func(db, session_id, limit, offset)
+    after = tracemalloc.take_snapshot()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(s.count_diff for s in stats if s.count_diff > 0)
+    del result
+    db.close()
+    return per_page_us, blocks, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    shape = Shape(sessions=1, messages=args.messages, words=20)
+    with tempfile.TemporaryDirectory(prefix="bench_read_") as directory:
+        engine = make_engine(os.path.join(directory, "read.db"))
+        seed_database(engine, shape)
+        session_factory = sessionmaker(bind=engine)
+        offset = args.messages // 2
+
+        print(f"{'path':>10} | {'us/page':>9} | {'live blocks':>11} | {'peak KiB':>9}")
+        for name, func in (("orm", legacy_page), ("core", projected_page)):
+            us, blocks, peak = measure(func, session_factory, shape.session_id(0), args.page, offset, args.rounds)
+            print(f"{name:>10} | {us:>9.1f} | {blocks:>11} | {peak / 1024:>9.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Microbenchmark: cost of turning a page of messages into the GET /api/messages/{session_id} body.
+
+Compares the previous path (build MessageOut per row, then FastAPI's response_model pass:
+model_dump, validation against List[MessageOut], JSON-mode serialization and JSONResponse
+rendering) with the fast path (one precompiled TypeAdapter dump to JSON bytes).
+
+Usage:
+    python -m benchmarks.bench_serialization [--sizes 10 100] [--rounds 2000]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.domain.entities.message import Message, MessageMetadata
+from app.interfaces.api.messages_router import router
+from app.interfaces.api.responses import JSONBytesResponse
+from app.interfaces.schemas.message_schema import MessageOut, message_list_json
+
+CONTENT = "hello there, this is a chat message of an ordinary length for a widget"
+
+
+def page(size: int) -> List[Message]:
+    now = datetime.now(timezone.utc)
+    metadata = MessageMetadata(14, len(CONTENT), now.isoformat())
+    return [Message(f"m{i}", "s1", CONTENT, now, "user", metadata) for i in range(size)]
+
+
+def list_route() -> APIRoute:
+    return next(r for r in router.routes if isinstance(r, APIRoute) and r.path == "/{session_id}")
+
+
+async def legacy(messages: List[Message], field) -> bytes:
+    content = await serialize_response(field=field, response_content=[MessageOut(**m.to_dict()) for m in messages])
+    return JSONResponse(content).body
+
+
+async def fast(messages: List[Message], _field) -> bytes:
+    return JSONBytesResponse(message_list_json.dump_json(messages)).body
+
+
+def per_page_us(func, messages, field, rounds) -> float:
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(func(messages, field))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            loop.run_until_complete(func(messages, field))
+        return (time.perf_counter() - start) / rounds * 1e6
+    finally:
+        loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    field = list_route().response_field
+    print(f"{'page':>5} | {'legacy us/page':>15} | {'fast us/page':>13} | speedup")
+    for size in args.sizes:
+        messages = page(size)
+        old = per_page_us(legacy, messages, field, args.rounds)
+        new = per_page_us(fast, messages, field, args.rounds)
+        print(f"{size:>5} | {old:>15.1f} | {new:>13.1f} | {old / new:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: write throughput against the number of SQLite shards.
+
+Starts `--workers` processes (like uvicorn workers) that each insert `--writes` single messages,
+one transaction per message, into random sessions through ShardedMessageRepository, and reports
+the aggregate commits per second for every shard count. With one shard every commit waits for
+the same file's write lock; with N shards writers to different sessions proceed in parallel.
+
+Usage:
+    python -m benchmarks.bench_sharding [--shards 1 2 4 8] [--workers 8] [--writes 500] [--sessions 1000]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from app.core.constants import VALID_SENDERS
+from app.domain.entities.message import Message
+from app.infrastructure.sharding import MessageShards, ShardedMessageRepository, shard_urls
+from benchmarks.seed import START_TIME, content, vocabulary
+
+
+def write(template: str, count: int, worker: int, writes: int, sessions: int, start, done) -> None:
+    """Worker process: wait for the start signal, then insert `writes` messages one commit at a time."""
+    rng = random.Random(worker)
+    words = vocabulary(rng)
+    shards = MessageShards(shard_urls(template, count))
+    repo = ShardedMessageRepository(shards)
+    start.wait()
+    for i in range(writes):
+        repo.save(Message(
+            message_id=f"w{worker}-{i}",
+            session_id=f"bench-s{rng.randrange(sessions)}",
+            content=content(rng, words, 20),
+            timestamp=START_TIME,
+            sender=VALID_SENDERS[i % len(VALID_SENDERS)],
+        ))
+    shards.dispose()
+    done.put(worker)
+
+
+def writes_per_second(count: int, workers: int, writes: int, sessions: int) -> float:
+    with tempfile.TemporaryDirectory(prefix="bench_shards_") as directory:
+        template = f"sqlite:///{os.path.join(directory, 'chat-shard{shard}.db')}"
+        shards = MessageShards(shard_urls(template, count))
+        shards.init_schema()
+        shards.dispose()
+
+        context = multiprocessing.get_context("spawn")
+        start, done = context.Event(), context.Queue()
+        processes = [
+            context.Process(target=write, args=(template, count, w, writes, sessions, start, done))
+            for w in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        time.sleep(1.0)  # let every worker import the app and open its engines
+        began = time.perf_counter()
+        start.set()
+        for _ in processes:
+            done.get()
+        elapsed = time.perf_counter() - began
+        for process in processes:
+            process.join()
+        return workers * writes / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=500, help="messages per worker")
+    parser.add_argument("--sessions", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'shards':>6} | {'writes/s':>9} | scaling")
+    baseline = None
+    for count in args.shards:
+        rate = writes_per_second(count, args.workers, args.writes, args.sessions)
+        baseline = baseline or rate
+        print(f"{count:>6} | {rate:>9.0f} | {rate / baseline:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: mixed read/write throughput on one SQLite file with the performance profile on and off.
+
+Writer threads insert single messages (one commit each, like POST /api/messages) while reader
+threads page through sessions (like GET /api/messages/{session_id}).
+
+Usage:
+    python -m benchmarks.bench_sqlite_profile [--writers 4] [--readers 8] [--seconds 5] [--seed-messages 20000]
+"""
+import argparse
+import itertools
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.errors import DuplicateMessageIdError
+from app.domain.entities.message import Message
+from app.infrastructure.database import apply_sqlite_profile
+from app.infrastructure.message_repository_impl import SQLiteMessageRepository
+from app.infrastructure.schema import init_db
+
+SESSIONS = 200
+CONTENT = "benchmark message with a handful of words in it"
+
+
+def make_message(message_id, session_index):
+    return Message(message_id, f"s{session_index}", CONTENT, datetime.now(timezone.utc), "user", {"word_count": 8})
+
+
+def build_engine(path, tuned):
+    settings.SQLITE_TUNING_ENABLED = tuned
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    apply_sqlite_profile(engine)
+    init_db(engine)
+    return engine
+
+
+def seed(session_factory, count):
+    db = session_factory()
+    repo = SQLiteMessageRepository(db)
+    for start in range(0, count, 1000):
+        repo.save_many([make_message(f"seed{i}", i % SESSIONS) for i in range(start, min(start + 1000, count))])
+    db.close()
+
+
+def run(tuned, args):
+    directory = tempfile.mkdtemp(prefix="bench_profile_")
+    engine = build_engine(os.path.join(directory, "chat.db"), tuned)
+    session_factory = sessionmaker(bind=engine)
+    seed(session_factory, args.seed_messages)
+
+    counter = itertools.count()
+    stop = threading.Event()
+    writes, reads = [], []
+
+    def writer():
+        db = session_factory()
+        repo = SQLiteMessageRepository(db)
+        done = 0
+        while not stop.is_set():
+            i = next(counter)
+            try:
+                repo.save(make_message(f"w{i}", i % SESSIONS))
+            except DuplicateMessageIdError:  # pragma: no cover
+                pass
+            done += 1
+        writes.append(done)
+        db.close()
+
+    def reader(offset):
+        db = session_factory()
+        repo = SQLiteMessageRepository(db)
+        done = 0
+        while not stop.is_set():
+            repo.get_page_by_session(f"s{(offset + done) % SESSIONS}", 50)
+            done += 1
+            db.rollback()
+        reads.append(done)
+        db.close()
+
+    threads = [threading.Thread(target=writer) for _ in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return sum(writes) / args.seconds, sum(reads) / args.seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--seed-messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'profile':>8} | {'writes/s':>9} | {'reads/s':>9}")
+    for tuned in (False, True):
+        writes, reads = run(tuned, args)
+        print(f"{'on' if tuned else 'off':>8} | {writes:>9.0f} | {reads:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Seed a SQLite database with a reproducible shape of chat data for benchmarks.
+
+Usage:
+    python -m benchmarks.seed PATH [--sessions 100] [--messages 100] [--words 20]
+"""
+import argparse
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.constants import SQLITE_CONNECT_ARGS, VALID_SENDERS
+from app.domain.entities.message import Message
+from app.infrastructure.database import apply_sqlite_profile
+from app.infrastructure.message_repository_impl import SQLiteMessageRepository
+from app.infrastructure.schema import init_db
+
+SEED = 1234
+VOCABULARY_SIZE = 2000
+INSERT_BATCH = 1000
+START_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class Shape:
+    """Dataset shape: `sessions` x `messages` per session, each message `words` words long."""
+    sessions: int = 100
+    messages: int = 100
+    words: int = 20
+
+    def session_id(self, index: int) -> str:
+        return f"bench-s{index}"
+
+
+def make_engine(path: str) -> Engine:
+    """File-backed engine configured like the application's (same connect args and SQLite profile)."""
+    engine = create_engine(f"sqlite:///{path}", connect_args=SQLITE_CONNECT_ARGS)
+    apply_sqlite_profile(engine)
+    init_db(engine)
+    return engine
+
+
+def vocabulary(rng: random.Random) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(VOCABULARY_SIZE)]
+
+
+def content(rng: random.Random, words: List[str], count: int) -> str:
+    return " ".join(rng.choice(words) for _ in range(count))
+
+
+def seed_database(engine: Engine, shape: Shape) -> None:
+    """Insert the whole shape with bulk save_many calls; the same shape always yields the same rows."""
+    rng = random.Random(SEED)
+    words = vocabulary(rng)
+    db = sessionmaker(bind=engine)()
+    repo = SQLiteMessageRepository(db)
+    batch: List[Message] = []
+    try:
+        for s in range(shape.sessions):
+            for m in range(shape.messages):
+                batch.append(Message(
+                    message_id=f"bench-s{s}-m{m}",
+                    session_id=shape.session_id(s),
+                    content=content(rng, words, shape.words),
+                    timestamp=START_TIME + timedelta(seconds=m),
+                    sender=VALID_SENDERS[m % len(VALID_SENDERS)],
+                ))
+                if len(batch) == INSERT_BATCH:
+                    repo.save_many(batch)
+                    batch = []
+        if batch:
+            repo.save_many(batch)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--sessions", type=int, default=Shape.sessions)
+    parser.add_argument("--messages", type=int, default=Shape.messages)
+    parser.add_argument("--words", type=int, default=Shape.words)
+    args = parser.parse_args()
+
+    shape = Shape(args.sessions, args.messages, args.words)
+    seed_database(make_engine(args.path), shape)
+    print(f"seeded {shape.sessions * shape.messages} messages into {args.path}")
+
+
+if __name__ == "__main__":
+    main()
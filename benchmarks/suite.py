@@ -0,0 +1,286 @@
+"""
+Benchmark suite for the POST and GET paths.
+
+Seeds a temporary SQLite database with a configurable shape, then measures:
+- service microbenchmarks: MessageService calls in-process, one DB session per call like a request;
+- end-to-end: requests through the ASGI app (routing, auth, validation, serialization, metrics
+  middleware) with httpx's ASGI transport and a fixed number of concurrent clients.
+Every case reports throughput and p50/p99 latency. Results can be written to a JSON baseline and
+compared against a previous one; the comparison exits with status 1 when a case regressed past
+the threshold (throughput down or p99 up by more than that fraction).
+
+Usage:
+    python -m benchmarks.suite run [--sessions 100] [--messages 100] [--words 20] [--out baseline.json]
+                                   [--baseline previous.json] [--threshold 0.10]
+    python -m benchmarks.suite compare previous.json current.json [--threshold 0.10]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy.orm import sessionmaker
+
+from app.application.services.message_service import MessageService
+from app.core.config import settings
+from app.core.constants import API_KEY_HEADER, VALID_SENDERS
+from app.core.limiter import limiter
+from app.domain.entities.message import Message
+from app.infrastructure.database import get_db, get_read_db
+from app.infrastructure.message_repository_impl import SQLiteMessageRepository
+from app.main import app
+from benchmarks.seed import SEED, Shape, content, make_engine, seed_database, vocabulary
+
+BATCH_SIZE = 100
+PAGE_LIMIT = 10
+DEFAULT_THRESHOLD = 0.10
+
+
+def summarize(samples: List[float], elapsed: float) -> Dict[str, float]:
+    """Throughput and latency percentiles (ms) of a list of per-call durations in seconds."""
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "ops_per_sec": round(len(ordered) / elapsed, 1),
+        "p50_ms": round(statistics.median(ordered) * 1e3, 4),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e3, 4),
+    }
+
+
+def measure(func: Callable[[int], None], iterations: int, warmup: int) -> Dict[str, float]:
+    """Call func(i) sequentially; the first `warmup` calls are not recorded."""
+    for i in range(warmup):
+        func(i)
+    samples = []
+    start = time.perf_counter()
+    for i in range(warmup, warmup + iterations):
+        t = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - t)
+    return summarize(samples, time.perf_counter() - start)
+
+
+async def measure_http(request: Callable[[int], Awaitable[httpx.Response]], requests: int, concurrency: int) -> Dict[str, float]:
+    """Issue `requests` calls from `concurrency` concurrent clients; every response must be 2xx."""
+    counter = itertools.count()
+    samples: List[float] = []
+
+    async def worker():
+        while True:
+            i = next(counter)
+            if i >= requests:
+                return
+            t = time.perf_counter()
+            response = await request(i)
+            samples.append(time.perf_counter() - t)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, time.perf_counter() - start)
+
+
+class Suite:
+    """Runs every benchmark case against one seeded database."""
+
+    def __init__(self, shape: Shape, iterations: int, requests: int, concurrency: int, directory: str):
+        self.shape = shape
+        self.iterations = iterations
+        self.warmup = max(1, iterations // 10)
+        self.requests = requests
+        self.concurrency = concurrency
+        self.engine = make_engine(os.path.join(directory, "bench.db"))
+        self.session_factory = sessionmaker(bind=self.engine)
+        self.rng = random.Random(SEED)
+        self.words = vocabulary(self.rng)
+        seed_database(self.engine, shape)
+
+    def new_message(self, prefix: str, i: int) -> Message:
+        return Message(
+            message_id=f"{prefix}-{i}",
+            session_id=self.shape.session_id(i % self.shape.sessions),
+            content=content(self.rng, self.words, self.shape.words),
+            timestamp=None,
+            sender=VALID_SENDERS[i % len(VALID_SENDERS)],
+        )
+
+    def random_session(self) -> str:
+        return self.shape.session_id(self.rng.randrange(self.shape.sessions))
+
+    def with_service(self, call: Callable[[MessageService], object]) -> None:
+        db = self.session_factory()
+        try:
+            call(MessageService(SQLiteMessageRepository(db)))
+        finally:
+            db.close()
+
+    # --- Service microbenchmarks ---
+    def service_cases(self) -> Dict[str, Callable[[int], None]]:
+        deep_offset = max(0, self.shape.messages - PAGE_LIMIT)
+        search_word = self.words[0]
+        pipeline = MessageService(repository=None)
+        return {
+            "service.pipeline_only": lambda i: pipeline._prepare(self.new_message("pipe", i)),
+            "service.process_and_save": lambda i: self.with_service(
+                lambda s: s.process_and_save(self.new_message("svc-save", i))),
+            f"service.process_and_save_many[{BATCH_SIZE}]": lambda i: self.with_service(
+                lambda s: s.process_and_save_many([self.new_message(f"svc-batch{i}", j) for j in range(BATCH_SIZE)])),
+            "service.get_messages.first_page": lambda i: self.with_service(
+                lambda s: s.get_messages(self.random_session(), PAGE_LIMIT, 0)),
+            "service.get_messages.deep_offset": lambda i: self.with_service(
+                lambda s: s.get_messages(self.random_session(), PAGE_LIMIT, deep_offset)),
+            "service.get_message_page.search": lambda i: self.with_service(
+                lambda s: s.repository.get_page_by_session(self.random_session(), PAGE_LIMIT, query=search_word)),
+        }
+
+    # --- End-to-end through the ASGI app ---
+    def http_cases(self, client: httpx.AsyncClient) -> Dict[str, Callable[[int], Awaitable[httpx.Response]]]:
+        def payload(prefix, i):
+            m = self.new_message(prefix, i)
+            return {"message_id": m.message_id, "session_id": m.session_id, "content": m.content, "sender": m.sender}
+
+        return {
+            "http.post_message": lambda i: client.post("/api/messages", json=payload("http-post", i)),
+            f"http.post_batch[{BATCH_SIZE}]": lambda i: client.post(
+                "/api/messages/batch", json={"messages": [payload(f"http-batch{i}", j) for j in range(BATCH_SIZE)]}),
+            "http.get_messages": lambda i: client.get(f"/api/messages/{self.random_session()}", params={"limit": PAGE_LIMIT}),
+        }
+
+    def run(self) -> Dict[str, Dict[str, float]]:
+        results = {}
+        for name, case in self.service_cases().items():
+            iterations = self.iterations // 10 if "many" in name else self.iterations
+            results[name] = measure(case, iterations, self.warmup)
+            print(f"{name:<40} {format_result(results[name])}", file=sys.stderr)
+
+        results.update(asyncio.run(self.run_http()))
+        return results
+
+    async def run_http(self) -> Dict[str, Dict[str, float]]:
+        def override_get_db():
+            db = self.session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = override_get_db
+        limiter.enabled = False
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        headers = {API_KEY_HEADER: settings.API_KEY}
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+                for name, case in self.http_cases(client).items():
+                    requests = self.requests // 10 if "batch" in name else self.requests
+                    results[name] = await measure_http(case, requests, self.concurrency)
+                    print(f"{name:<40} {format_result(results[name])}", file=sys.stderr)
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+            app.dependency_overrides.pop(get_read_db, None)
+        return results
+
+
+def format_result(result: Dict[str, float]) -> str:
+    return f"{result['ops_per_sec']:>10.1f} ops/s  p50 {result['p50_ms']:>8.3f} ms  p99 {result['p99_ms']:>8.3f} ms"
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Print a side-by-side table and return the names of the cases that regressed past the threshold."""
+    regressions = []
+    print(f"{'case':<40} {'ops/s base':>11} {'ops/s now':>11} {'p99 base':>9} {'p99 now':>9}  verdict")
+    for name, now in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<40} {'-':>11} {now['ops_per_sec']:>11.1f} {'-':>9} {now['p99_ms']:>9.3f}  new")
+            continue
+        slower = now["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold)
+        tail = now["p99_ms"] > base["p99_ms"] * (1 + threshold)
+        verdict = "REGRESSION" if slower or tail else "ok"
+        if slower or tail:
+            regressions.append(name)
+        print(f"{name:<40} {base['ops_per_sec']:>11.1f} {now['ops_per_sec']:>11.1f} "
+              f"{base['p99_ms']:>9.3f} {now['p99_ms']:>9.3f}  {verdict}")
+    return regressions
+
+
+def load(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_command(args) -> int:
+    shape = Shape(args.sessions, args.messages, args.words)
+    with tempfile.TemporaryDirectory(prefix="bench_suite_") as directory:
+        suite = Suite(shape, args.iterations, args.requests, args.concurrency, directory)
+        results = suite.run()
+        suite.engine.dispose()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "shape": vars(shape),
+            "iterations": args.iterations,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        regressions = compare(load(args.baseline), report, args.threshold)
+        return 1 if regressions else 0
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def compare_command(args) -> int:
+    regressions = compare(load(args.baseline), load(args.current), args.threshold)
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="seed a database, run every case and print/write the results")
+    run_parser.add_argument("--sessions", type=int, default=Shape.sessions)
+    run_parser.add_argument("--messages", type=int, default=Shape.messages, help="messages per session")
+    run_parser.add_argument("--words", type=int, default=Shape.words, help="words per message")
+    run_parser.add_argument("--iterations", type=int, default=1000, help="calls per service case")
+    run_parser.add_argument("--requests", type=int, default=1000, help="requests per HTTP case")
+    run_parser.add_argument("--concurrency", type=int, default=8)
+    run_parser.add_argument("--out", help="write the results to this JSON file")
+    run_parser.add_argument("--baseline", help="compare the results with this JSON baseline")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    run_parser.set_defaults(handler=run_command)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    compare_parser.set_defaults(handler=compare_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
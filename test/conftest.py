@@ -7,7 +7,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from app.main import app
-from app.infrastructure.database import Base, get_db
+from app.infrastructure.database import get_db, get_read_db
+from app.infrastructure.schema import init_db
 
 engine = create_engine(
     "sqlite:///:memory:",
@@ -16,7 +17,7 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(bind=engine)
 
-Base.metadata.create_all(bind=engine)
+init_db(engine)
 
 def override_get_db():
     db = TestingSessionLocal()
@@ -26,6 +27,7 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 @pytest.fixture
 def client():
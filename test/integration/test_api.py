@@ -1,8 +1,31 @@
+import json
+import msgpack
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.interfaces.api import messages_router
+from app.infrastructure.message_cache_impl import InMemoryMessageCache
+from app.infrastructure.message_id_filter import MessageIdFilter
+from app.infrastructure.message_hub_impl import message_hub
 from test.test_constants import (
     BASE_URL_MESSAGES,
+    BASE_URL_MESSAGES_BATCH,
+    BATCH_STATUS_CREATED,
+    BATCH_STATUS_REJECTED,
+    ERROR_CODE_DUPLICATE_MESSAGE_ID,
+    ERROR_CODE_INVALID_CURSOR,
+    NEXT_CURSOR_HEADER,
+    ETAG_HEADER,
+    IF_NONE_MATCH_HEADER,
+    STATUS_NOT_MODIFIED,
+    EXPORT_PATH_SUFFIX,
+    STATS_PATH_SUFFIX,
+    WS_PATH_SUFFIX,
+    STREAM_PATH_SUFFIX,
+    STATUS_SERVICE_UNAVAILABLE,
+    METRICS_URL,
+    MEDIA_TYPE_NDJSON,
+    MEDIA_TYPE_MSGPACK,
     FIELD_ERROR,
     FIELD_CODE,
     FIELD_MESSAGE_ID,
@@ -17,6 +40,7 @@ from test.test_constants import (
     SESSION_ID_PAGINATION,
     SESSION_ID_INVALID,
     STATUS_CREATED,
+    STATUS_CONFLICT,
     STATUS_BAD_REQUEST,
     STATUS_NOT_FOUND,
     STATUS_OK,
@@ -39,6 +63,16 @@ class TestMessageAPI:
     LOCAL_SESSION_ID = "s300"
     PAGINATION_LIMIT = 2
     PAGINATION_OFFSET = 0
+    BATCH_SESSION_ID = "s400"
+    BATCH_MESSAGE_IDS = ["b1", "b2"]
+    CURSOR_SESSION_ID = "s500"
+    SEARCH_SESSION_ID = "s600"
+    CACHE_SESSION_ID = "s700"
+    EXPORT_SESSION_ID = "s800"
+    STATS_SESSION_ID = "s900"
+    TAIL_SESSION_ID = "s950"
+    ETAG_SESSION_ID = "s960"
+    MSGPACK_SESSION_ID = "s970"
 
     def test_unauthorized_access(self):
         """Should return 401 when no API key is provided."""
@@ -107,3 +141,260 @@ class TestMessageAPI:
         assert response.status_code == STATUS_NOT_FOUND
         data = response.json()
         assert data[FIELD_ERROR][FIELD_CODE] == ERROR_CODE_NOT_FOUND
+
+    def test_post_batch_reports_status_per_item(self):
+        """Should create new messages and flag duplicates without failing the batch."""
+        messages = [
+            {
+                FIELD_MESSAGE_ID: message_id,
+                FIELD_SESSION_ID: self.BATCH_SESSION_ID,
+                FIELD_CONTENT: CONTENT_VALID,
+                FIELD_SENDER: VALID_SENDER,
+            }
+            for message_id in self.BATCH_MESSAGE_IDS + self.BATCH_MESSAGE_IDS[:1]
+        ]
+
+        response = client.post(BASE_URL_MESSAGES_BATCH, json={"messages": messages}, headers=API_KEY_HEADER)
+
+        assert response.status_code == STATUS_OK
+        data = response.json()
+        assert data["created"] == 2
+        assert data["rejected"] == 1
+        assert [r["status"] for r in data["results"]] == [BATCH_STATUS_CREATED, BATCH_STATUS_CREATED, BATCH_STATUS_REJECTED]
+        assert data["results"][0]["message"][FIELD_SESSION_ID] == self.BATCH_SESSION_ID
+        assert data["results"][2][FIELD_ERROR][FIELD_CODE] == ERROR_CODE_DUPLICATE_MESSAGE_ID
+
+    def test_post_batch_empty_is_rejected(self):
+        """Should reject an empty batch body."""
+        response = client.post(BASE_URL_MESSAGES_BATCH, json={"messages": []}, headers=API_KEY_HEADER)
+        assert response.status_code == STATUS_BAD_REQUEST
+
+    def test_get_messages_with_cursor(self):
+        """Should walk a session through the X-Next-Cursor header."""
+        messages = [
+            {
+                FIELD_MESSAGE_ID: f"c{i}",
+                FIELD_SESSION_ID: self.CURSOR_SESSION_ID,
+                FIELD_CONTENT: CONTENT_VALID,
+                FIELD_SENDER: VALID_SENDER,
+            }
+            for i in range(3)
+        ]
+        client.post(BASE_URL_MESSAGES_BATCH, json={"messages": messages}, headers=API_KEY_HEADER)
+        url = f"{BASE_URL_MESSAGES}/{self.CURSOR_SESSION_ID}?limit={self.PAGINATION_LIMIT}"
+
+        first = client.get(url, headers=API_KEY_HEADER)
+        cursor = first.headers[NEXT_CURSOR_HEADER]
+        second = client.get(f"{url}&cursor={cursor}", headers=API_KEY_HEADER)
+
+        assert [m[FIELD_MESSAGE_ID] for m in first.json()] == ["c0", "c1"]
+        assert [m[FIELD_MESSAGE_ID] for m in second.json()] == ["c2"]
+        assert NEXT_CURSOR_HEADER not in second.headers
+
+    def test_get_messages_invalid_cursor(self):
+        """Should return 400 when the cursor was not issued by the API."""
+        response = client.get(f"{BASE_URL_MESSAGES}/{self.CURSOR_SESSION_ID}?cursor=bogus", headers=API_KEY_HEADER)
+        assert response.status_code == STATUS_BAD_REQUEST
+        assert response.json()[FIELD_ERROR][FIELD_CODE] == ERROR_CODE_INVALID_CURSOR
+
+    def test_get_messages_full_text_search(self):
+        """Should search the whole session and support relevance ordering."""
+        contents = ["deploy finished after a long wait", "deploy failed, deploy again", "unrelated"]
+        messages = [
+            {
+                FIELD_MESSAGE_ID: f"q{i}",
+                FIELD_SESSION_ID: self.SEARCH_SESSION_ID,
+                FIELD_CONTENT: content,
+                FIELD_SENDER: VALID_SENDER,
+            }
+            for i, content in enumerate(contents)
+        ]
+        client.post(BASE_URL_MESSAGES_BATCH, json={"messages": messages}, headers=API_KEY_HEADER)
+        url = f"{BASE_URL_MESSAGES}/{self.SEARCH_SESSION_ID}"
+
+        by_time = client.get(f"{url}?query=deploy", headers=API_KEY_HEADER)
+        by_relevance = client.get(f"{url}?query=deploy&sort=relevance", headers=API_KEY_HEADER)
+        missing = client.get(f"{url}?query=nomatch", headers=API_KEY_HEADER)
+
+        assert [m[FIELD_MESSAGE_ID] for m in by_time.json()] == ["q0", "q1"]
+        assert [m[FIELD_MESSAGE_ID] for m in by_relevance.json()] == ["q1", "q0"]
+        assert missing.status_code == STATUS_NOT_FOUND
+
+    def test_get_uses_read_cache_when_enabled(self, monkeypatch):
+        """Repeated polls are served from the cache; a new message in the session invalidates it."""
+        cache = InMemoryMessageCache(max_entries=10, ttl_seconds=60)
+        monkeypatch.setattr(messages_router.settings, "MESSAGE_CACHE_ENABLED", True)
+        monkeypatch.setattr(messages_router, "message_cache", cache)
+        url = f"{BASE_URL_MESSAGES}/{self.CACHE_SESSION_ID}"
+
+        def post(message_id):
+            payload = {
+                FIELD_MESSAGE_ID: message_id,
+                FIELD_SESSION_ID: self.CACHE_SESSION_ID,
+                FIELD_CONTENT: CONTENT_VALID,
+                FIELD_SENDER: VALID_SENDER,
+            }
+            client.post(BASE_URL_MESSAGES, json=payload, headers=API_KEY_HEADER)
+
+        post("c700")
+        first = client.get(url, headers=API_KEY_HEADER)
+        second = client.get(url, headers=API_KEY_HEADER)
+        post("c701")
+        third = client.get(url, headers=API_KEY_HEADER)
+
+        assert first.json() == second.json()
+        assert [m[FIELD_MESSAGE_ID] for m in third.json()] == ["c700", "c701"]
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.invalidations) == (1, 2, 1)
+
+    def test_conditional_get_with_etag(self):
+        """Should answer 304 while the session is unchanged and a new ETag once it receives a message."""
+        url = f"{BASE_URL_MESSAGES}/{self.ETAG_SESSION_ID}"
+
+        def post(message_id):
+            payload = {FIELD_MESSAGE_ID: message_id, FIELD_SESSION_ID: self.ETAG_SESSION_ID, FIELD_CONTENT: CONTENT_VALID, FIELD_SENDER: VALID_SENDER}
+            client.post(BASE_URL_MESSAGES, json=payload, headers=API_KEY_HEADER)
+
+        post("e960")
+        first = client.get(url, headers=API_KEY_HEADER)
+        etag = first.headers[ETAG_HEADER]
+        unchanged = client.get(url, headers={**API_KEY_HEADER, IF_NONE_MATCH_HEADER: f'"other", W/{etag}'})
+        other_page = client.get(f"{url}?limit=1", headers=API_KEY_HEADER)
+        post("e961")
+        changed = client.get(url, headers={**API_KEY_HEADER, IF_NONE_MATCH_HEADER: etag})
+
+        assert first.status_code == STATUS_OK
+        assert unchanged.status_code == STATUS_NOT_MODIFIED
+        assert unchanged.content == b""
+        assert unchanged.headers[ETAG_HEADER] == etag
+        assert other_page.headers[ETAG_HEADER] != etag
+        assert changed.status_code == STATUS_OK
+        assert changed.headers[ETAG_HEADER] != etag
+        assert [m[FIELD_MESSAGE_ID] for m in changed.json()] == ["e960", "e961"]
+
+    def test_msgpack_batch_and_listing(self):
+        """Should accept a MessagePack batch and answer in MessagePack with the JSON fields when asked to."""
+        messages = [
+            {FIELD_MESSAGE_ID: f"mp97{i}", FIELD_SESSION_ID: self.MSGPACK_SESSION_ID, FIELD_CONTENT: CONTENT_VALID, FIELD_SENDER: VALID_SENDER}
+            for i in range(2)
+        ]
+        msgpack_headers = {**API_KEY_HEADER, "accept": MEDIA_TYPE_MSGPACK, "content-type": MEDIA_TYPE_MSGPACK}
+        url = f"{BASE_URL_MESSAGES}/{self.MSGPACK_SESSION_ID}"
+
+        batch = client.post(BASE_URL_MESSAGES_BATCH, content=msgpack.packb({"messages": messages}), headers=msgpack_headers)
+        packed = client.get(url, headers=msgpack_headers)
+        plain = client.get(url, headers=API_KEY_HEADER)
+
+        assert batch.status_code == STATUS_OK
+        assert batch.headers["content-type"] == MEDIA_TYPE_MSGPACK
+        assert msgpack.unpackb(batch.content)["created"] == 2
+        assert packed.headers["content-type"] == MEDIA_TYPE_MSGPACK
+        decoded = msgpack.unpackb(packed.content, timestamp=3)
+        assert [m.keys() for m in decoded] == [m.keys() for m in plain.json()]
+        assert [m[FIELD_MESSAGE_ID] for m in decoded] == ["mp970", "mp971"]
+        assert packed.headers[ETAG_HEADER] != plain.headers[ETAG_HEADER]
+
+    def test_malformed_msgpack_batch_is_rejected(self):
+        response = client.post(
+            BASE_URL_MESSAGES_BATCH, content=b"\xc1", headers={**API_KEY_HEADER, "content-type": MEDIA_TYPE_MSGPACK}
+        )
+        assert response.status_code == STATUS_BAD_REQUEST
+
+    def test_duplicates_go_through_id_filter_when_enabled(self, monkeypatch):
+        """Retried ids are confirmed against the filter's probable duplicates and still rejected."""
+        id_filter = MessageIdFilter(100, 0.01)
+        monkeypatch.setattr(messages_router, "message_id_filter", id_filter)
+        payload = {FIELD_MESSAGE_ID: "f700", FIELD_SESSION_ID: self.CACHE_SESSION_ID, FIELD_CONTENT: CONTENT_VALID, FIELD_SENDER: VALID_SENDER}
+
+        created = client.post(BASE_URL_MESSAGES, json=payload, headers=API_KEY_HEADER)
+        duplicate = client.post(BASE_URL_MESSAGES, json=payload, headers=API_KEY_HEADER)
+        batch = client.post(BASE_URL_MESSAGES_BATCH, json={"messages": [payload]}, headers=API_KEY_HEADER)
+
+        assert created.status_code == STATUS_CREATED
+        assert duplicate.status_code == STATUS_CONFLICT
+        assert duplicate.json()[FIELD_ERROR][FIELD_CODE] == ERROR_CODE_DUPLICATE_MESSAGE_ID
+        assert batch.json()["results"][0]["status"] == BATCH_STATUS_REJECTED
+        stats = id_filter.stats()
+        assert (stats.items, stats.probable_duplicates, stats.false_positives) == (1, 2, 0)
+
+    def test_export_session_as_ndjson(self):
+        """Should stream every message of the session as one JSON object per line."""
+        ids = [f"x80{i}" for i in range(3)]
+        messages = [
+            {FIELD_MESSAGE_ID: message_id, FIELD_SESSION_ID: self.EXPORT_SESSION_ID, FIELD_CONTENT: CONTENT_VALID, FIELD_SENDER: VALID_SENDER}
+            for message_id in ids
+        ]
+        client.post(BASE_URL_MESSAGES_BATCH, json={"messages": messages}, headers=API_KEY_HEADER)
+
+        response = client.get(f"{BASE_URL_MESSAGES}/{self.EXPORT_SESSION_ID}/{EXPORT_PATH_SUFFIX}", headers=API_KEY_HEADER)
+
+        assert response.status_code == STATUS_OK
+        assert response.headers["content-type"] == MEDIA_TYPE_NDJSON
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line[FIELD_MESSAGE_ID] for line in lines] == ids
+        assert all(line[FIELD_SESSION_ID] == self.EXPORT_SESSION_ID for line in lines)
+
+    def test_export_unknown_session_returns_404(self):
+        response = client.get(f"{BASE_URL_MESSAGES}/{SESSION_ID_INVALID}/{EXPORT_PATH_SUFFIX}", headers=API_KEY_HEADER)
+        assert response.status_code == STATUS_NOT_FOUND
+        assert response.json()[FIELD_ERROR][FIELD_CODE] == ERROR_CODE_NOT_FOUND
+
+    def test_metrics_endpoint_reports_routes_and_repository(self):
+        """Should expose Prometheus text with per-route latency, status counters and repository timings."""
+        client.get(f"{BASE_URL_MESSAGES}/{SESSION_ID_INVALID}", headers=API_KEY_HEADER)
+
+        response = client.get(METRICS_URL)
+
+        assert response.status_code == STATUS_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert 'chat_http_request_duration_seconds_count{method="GET",route="/api/messages/{session_id}"}' in body
+        assert 'chat_http_requests_total{method="GET",route="/api/messages/{session_id}",status="404"}' in body
+        assert 'chat_repository_duration_seconds_count{operation="get_page_by_session"}' in body
+        assert "chat_message_cache_hits_total" in body
+
+    def test_websocket_tail_receives_new_messages(self):
+        """Should push each message stored in the session after the socket opened, and nothing else."""
+        with client.websocket_connect(f"{BASE_URL_MESSAGES}/{self.TAIL_SESSION_ID}/{WS_PATH_SUFFIX}", headers=API_KEY_HEADER) as websocket:
+            client.post(
+                BASE_URL_MESSAGES,
+                json={FIELD_MESSAGE_ID: "t951", FIELD_SESSION_ID: SESSION_ID_VALID, FIELD_CONTENT: CONTENT_VALID, FIELD_SENDER: VALID_SENDER},
+                headers=API_KEY_HEADER,
+            )
+            client.post(
+                BASE_URL_MESSAGES,
+                json={FIELD_MESSAGE_ID: "t952", FIELD_SESSION_ID: self.TAIL_SESSION_ID, FIELD_CONTENT: CONTENT_VALID, FIELD_SENDER: VALID_SENDER},
+                headers=API_KEY_HEADER,
+            )
+            pushed = websocket.receive_json()
+
+        assert pushed[FIELD_MESSAGE_ID] == "t952"
+        assert pushed[FIELD_SESSION_ID] == self.TAIL_SESSION_ID
+
+    def test_stream_at_the_subscriber_limit_is_refused_without_subscribing(self, monkeypatch):
+        """Should answer 503 when the worker's hub is full, before any subscription is opened."""
+        monkeypatch.setattr(message_hub, "max_subscribers", 0)
+
+        response = client.get(f"{BASE_URL_MESSAGES}/{self.TAIL_SESSION_ID}/{STREAM_PATH_SUFFIX}", headers=API_KEY_HEADER)
+
+        assert response.status_code == STATUS_SERVICE_UNAVAILABLE
+        assert message_hub.stats().subscribers == 0
+
+    def test_session_stats(self):
+        """Should return the aggregates of the session without reading its messages."""
+        messages = [
+            {FIELD_MESSAGE_ID: f"st90{i}", FIELD_SESSION_ID: self.STATS_SESSION_ID, FIELD_CONTENT: CONTENT_VALID, FIELD_SENDER: sender}
+            for i, sender in enumerate([VALID_SENDER, VALID_SENDER, "system"])
+        ]
+        client.post(BASE_URL_MESSAGES_BATCH, json={"messages": messages}, headers=API_KEY_HEADER)
+
+        response = client.get(f"{BASE_URL_MESSAGES}/{self.STATS_SESSION_ID}/{STATS_PATH_SUFFIX}", headers=API_KEY_HEADER)
+        missing = client.get(f"{BASE_URL_MESSAGES}/{SESSION_ID_INVALID}/{STATS_PATH_SUFFIX}", headers=API_KEY_HEADER)
+
+        assert response.status_code == STATUS_OK
+        body = response.json()
+        assert body["message_count"] == 3
+        assert body["senders"] == {"system": 1, VALID_SENDER: 2}
+        assert body["word_count"] == 3 * len(CONTENT_VALID.split())
+        assert body["character_count"] == 3 * len(CONTENT_VALID)
+        assert missing.status_code == STATUS_NOT_FOUND
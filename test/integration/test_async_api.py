@@ -0,0 +1,246 @@
+import asyncio
+import json
+import msgpack
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from app.core.errors import init_error_handlers
+from app.interfaces.schemas.message_schema import MessageIn
+from app.infrastructure.database import Base, is_async_database_url, to_sync_database_url, to_async_database_url
+from app.infrastructure.async_database import get_async_db, get_async_read_db
+from app.infrastructure.schema import init_db
+from app.interfaces.api import async_messages_router as async_router_module
+from app.interfaces.api.async_messages_router import router as async_messages_router
+from app.infrastructure.message_cache_impl import InMemoryMessageCache
+from app.infrastructure.message_id_filter import MessageIdFilter
+from app.application.services.async_message_service import AsyncMessageService
+from app.infrastructure.async_message_repository_impl import AsyncSQLiteMessageRepository
+from test.test_constants import (
+    BASE_URL_MESSAGES,
+    BASE_URL_MESSAGES_BATCH,
+    BATCH_STATUS_CREATED,
+    BATCH_STATUS_REJECTED,
+    FIELD_ERROR,
+    FIELD_CODE,
+    FIELD_MESSAGE_ID,
+    FIELD_SESSION_ID,
+    FIELD_CONTENT,
+    FIELD_SENDER,
+    VALID_SENDER,
+    CONTENT_VALID,
+    STATUS_CREATED,
+    STATUS_CONFLICT,
+    STATUS_NOT_FOUND,
+    STATUS_OK,
+    ERROR_CODE_DUPLICATE_MESSAGE_ID,
+    ERROR_CODE_NOT_FOUND,
+    NEXT_CURSOR_HEADER,
+    MEDIA_TYPE_MSGPACK,
+    ETAG_HEADER,
+    IF_NONE_MATCH_HEADER,
+    STATUS_NOT_MODIFIED,
+    EXPORT_PATH_SUFFIX,
+    STATS_PATH_SUFFIX,
+    MEDIA_TYPE_NDJSON,
+    API_KEY_HEADER,
+)
+
+
+def run(coro):
+    """Run a coroutine on a private event loop (leaves the default loop untouched)."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    """Mount the async router on a fresh app backed by a temporary aiosqlite database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+    session_local = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    sync_engine = create_engine(f"sqlite:///{tmp_path / 'async.db'}")
+    init_db(sync_engine)
+    sync_engine.dispose()
+
+    async def override_get_async_db():
+        async with session_local() as db:
+            yield db
+
+    app = FastAPI()
+    init_error_handlers(app)
+    app.include_router(async_messages_router, prefix=BASE_URL_MESSAGES)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
+    with TestClient(app) as client:
+        yield client
+    run(engine.dispose())
+
+
+class TestAsyncMessageAPI:
+    """Integration tests for the asyncio data path."""
+
+    SESSION_ID = "as100"
+    SESSION_ID_MISSING = "as404"
+    MESSAGE_IDS = ["am1", "am2", "am3"]
+    SYNC_URL = "sqlite:///./data/chat.db"
+    ASYNC_URL = "sqlite+aiosqlite:///./data/chat.db"
+
+    def _payload(self, message_id):
+        return {
+            FIELD_MESSAGE_ID: message_id,
+            FIELD_SESSION_ID: self.SESSION_ID,
+            FIELD_CONTENT: CONTENT_VALID,
+            FIELD_SENDER: VALID_SENDER,
+        }
+
+    def test_post_get_and_duplicate(self, async_client):
+        response = async_client.post(BASE_URL_MESSAGES, json=self._payload(self.MESSAGE_IDS[0]), headers=API_KEY_HEADER)
+        assert response.status_code == STATUS_CREATED
+        assert response.json()[FIELD_SESSION_ID] == self.SESSION_ID
+
+        duplicate = async_client.post(BASE_URL_MESSAGES, json=self._payload(self.MESSAGE_IDS[0]), headers=API_KEY_HEADER)
+        assert duplicate.status_code == STATUS_CONFLICT
+        assert duplicate.json()[FIELD_ERROR][FIELD_CODE] == ERROR_CODE_DUPLICATE_MESSAGE_ID
+
+        listing = async_client.get(f"{BASE_URL_MESSAGES}/{self.SESSION_ID}", headers=API_KEY_HEADER)
+        assert listing.status_code == STATUS_OK
+        assert [m[FIELD_MESSAGE_ID] for m in listing.json()] == self.MESSAGE_IDS[:1]
+
+    def test_post_batch(self, async_client):
+        messages = [self._payload(message_id) for message_id in self.MESSAGE_IDS + self.MESSAGE_IDS[:1]]
+
+        response = async_client.post(BASE_URL_MESSAGES_BATCH, json={"messages": messages}, headers=API_KEY_HEADER)
+
+        assert response.status_code == STATUS_OK
+        statuses = [r["status"] for r in response.json()["results"]]
+        assert statuses == [BATCH_STATUS_CREATED] * 3 + [BATCH_STATUS_REJECTED]
+
+    def test_get_with_cursor(self, async_client):
+        messages = [self._payload(message_id) for message_id in self.MESSAGE_IDS]
+        async_client.post(BASE_URL_MESSAGES_BATCH, json={"messages": messages}, headers=API_KEY_HEADER)
+        url = f"{BASE_URL_MESSAGES}/{self.SESSION_ID}?limit=2"
+
+        first = async_client.get(url, headers=API_KEY_HEADER)
+        second = async_client.get(f"{url}&cursor={first.headers[NEXT_CURSOR_HEADER]}", headers=API_KEY_HEADER)
+
+        assert [m[FIELD_MESSAGE_ID] for m in first.json() + second.json()] == self.MESSAGE_IDS
+
+    def test_conditional_get_with_etag(self, async_client):
+        async_client.post(BASE_URL_MESSAGES, json=self._payload(self.MESSAGE_IDS[0]), headers=API_KEY_HEADER)
+        url = f"{BASE_URL_MESSAGES}/{self.SESSION_ID}"
+
+        etag = async_client.get(url, headers=API_KEY_HEADER).headers[ETAG_HEADER]
+        unchanged = async_client.get(url, headers={**API_KEY_HEADER, IF_NONE_MATCH_HEADER: etag})
+        async_client.post(BASE_URL_MESSAGES, json=self._payload(self.MESSAGE_IDS[1]), headers=API_KEY_HEADER)
+        changed = async_client.get(url, headers={**API_KEY_HEADER, IF_NONE_MATCH_HEADER: etag})
+
+        assert unchanged.status_code == STATUS_NOT_MODIFIED
+        assert changed.status_code == STATUS_OK
+        assert changed.headers[ETAG_HEADER] != etag
+
+    def test_post_and_get_as_msgpack(self, async_client):
+        headers = {**API_KEY_HEADER, "accept": MEDIA_TYPE_MSGPACK}
+
+        created = async_client.post(BASE_URL_MESSAGES, json=self._payload(self.MESSAGE_IDS[0]), headers=headers)
+        listing = async_client.get(f"{BASE_URL_MESSAGES}/{self.SESSION_ID}", headers=headers)
+
+        assert created.status_code == STATUS_CREATED
+        assert msgpack.unpackb(created.content, timestamp=3)[FIELD_SESSION_ID] == self.SESSION_ID
+        assert listing.headers["content-type"] == MEDIA_TYPE_MSGPACK
+        assert [m[FIELD_MESSAGE_ID] for m in msgpack.unpackb(listing.content, timestamp=3)] == self.MESSAGE_IDS[:1]
+
+    def test_get_uses_read_cache_when_enabled(self, async_client, monkeypatch):
+        cache = InMemoryMessageCache(max_entries=10, ttl_seconds=60)
+        monkeypatch.setattr(async_router_module.settings, "MESSAGE_CACHE_ENABLED", True)
+        monkeypatch.setattr(async_router_module, "message_cache", cache)
+        url = f"{BASE_URL_MESSAGES}/{self.SESSION_ID}"
+        async_client.post(BASE_URL_MESSAGES, json=self._payload(self.MESSAGE_IDS[0]), headers=API_KEY_HEADER)
+
+        async_client.get(url, headers=API_KEY_HEADER)
+        async_client.get(url, headers=API_KEY_HEADER)
+        async_client.post(BASE_URL_MESSAGES_BATCH, json={"messages": [self._payload(self.MESSAGE_IDS[1])]}, headers=API_KEY_HEADER)
+        listing = async_client.get(url, headers=API_KEY_HEADER)
+
+        assert [m[FIELD_MESSAGE_ID] for m in listing.json()] == self.MESSAGE_IDS[:2]
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.invalidations) == (1, 2, 1)
+
+    def test_duplicates_go_through_id_filter_when_enabled(self, async_client, monkeypatch):
+        id_filter = MessageIdFilter(100, 0.01)
+        monkeypatch.setattr(async_router_module, "message_id_filter", id_filter)
+
+        async_client.post(BASE_URL_MESSAGES_BATCH, json={"messages": [self._payload(self.MESSAGE_IDS[0])]}, headers=API_KEY_HEADER)
+        duplicate = async_client.post(BASE_URL_MESSAGES, json=self._payload(self.MESSAGE_IDS[0]), headers=API_KEY_HEADER)
+
+        assert duplicate.status_code == STATUS_CONFLICT
+        assert id_filter.stats().probable_duplicates == 1
+
+    def test_service_get_messages(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'service.db'}")
+
+        async def scenario():
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            async with async_sessionmaker(bind=engine, expire_on_commit=False)() as db:
+                repo = AsyncSQLiteMessageRepository(db)
+                service = AsyncMessageService(repo)
+                await service.process_and_save_many([
+                    MessageIn(**self._payload(message_id)).to_domain() for message_id in self.MESSAGE_IDS
+                ])
+                found = await service.get_messages(self.SESSION_ID, limit=10, offset=1)
+                direct = await repo.get_by_session(self.SESSION_ID, 10, 0)
+            await engine.dispose()
+            return found, direct
+
+        found, direct = run(scenario())
+        assert [m.message_id for m in found] == self.MESSAGE_IDS[1:]
+        assert [m.message_id for m in direct] == self.MESSAGE_IDS
+
+    def test_export_session_as_ndjson(self, async_client):
+        messages = [self._payload(message_id) for message_id in self.MESSAGE_IDS]
+        async_client.post(BASE_URL_MESSAGES_BATCH, json={"messages": messages}, headers=API_KEY_HEADER)
+
+        response = async_client.get(f"{BASE_URL_MESSAGES}/{self.SESSION_ID}/{EXPORT_PATH_SUFFIX}", headers=API_KEY_HEADER)
+        missing = async_client.get(f"{BASE_URL_MESSAGES}/{self.SESSION_ID_MISSING}/{EXPORT_PATH_SUFFIX}", headers=API_KEY_HEADER)
+
+        assert response.headers["content-type"] == MEDIA_TYPE_NDJSON
+        assert [json.loads(line)[FIELD_MESSAGE_ID] for line in response.text.splitlines()] == self.MESSAGE_IDS
+        assert missing.status_code == STATUS_NOT_FOUND
+
+    def test_session_stats(self, async_client):
+        messages = [self._payload(message_id) for message_id in self.MESSAGE_IDS]
+        async_client.post(BASE_URL_MESSAGES_BATCH, json={"messages": messages}, headers=API_KEY_HEADER)
+
+        response = async_client.get(f"{BASE_URL_MESSAGES}/{self.SESSION_ID}/{STATS_PATH_SUFFIX}", headers=API_KEY_HEADER)
+        missing = async_client.get(f"{BASE_URL_MESSAGES}/{self.SESSION_ID_MISSING}/{STATS_PATH_SUFFIX}", headers=API_KEY_HEADER)
+
+        assert response.json()["message_count"] == len(self.MESSAGE_IDS)
+        assert missing.status_code == STATUS_NOT_FOUND
+
+    def test_get_not_found(self, async_client):
+        response = async_client.get(f"{BASE_URL_MESSAGES}/{self.SESSION_ID_MISSING}", headers=API_KEY_HEADER)
+        assert response.status_code == STATUS_NOT_FOUND
+        assert response.json()[FIELD_ERROR][FIELD_CODE] == ERROR_CODE_NOT_FOUND
+
+    def test_database_url_helpers(self):
+        assert is_async_database_url(self.ASYNC_URL)
+        assert not is_async_database_url(self.SYNC_URL)
+        assert to_sync_database_url(self.ASYNC_URL) == self.SYNC_URL
+        assert to_sync_database_url(self.SYNC_URL) == self.SYNC_URL
+        assert to_async_database_url(self.SYNC_URL) == self.ASYNC_URL
+        assert to_async_database_url(self.ASYNC_URL) == self.ASYNC_URL
+
+    def test_get_async_db_yields_and_closes(self):
+        async def open_and_close():
+            for dependency in (get_async_db, get_async_read_db):
+                gen = dependency()
+                db = await gen.__anext__()
+                assert isinstance(db, AsyncSession)
+                await gen.aclose()
+
+        run(open_and_close())
@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import settings
+from app.infrastructure.database import apply_sqlite_profile, pool_args, engine, read_engine, get_db, get_read_db
+from app.main import app
+from test.test_constants import (
+    API_KEY_HEADER,
+    BASE_URL_MESSAGES,
+    CONTENT_VALID,
+    FIELD_CONTENT,
+    FIELD_MESSAGE_ID,
+    FIELD_SENDER,
+    FIELD_SESSION_ID,
+    STATUS_CREATED,
+    STATUS_OK,
+    VALID_SENDER,
+)
+
+
+class TestSQLiteProfile:
+    """Integration tests for the SQLite performance profile."""
+
+    EXPECTED = {
+        "journal_mode": "wal",
+        "synchronous": 1,  # NORMAL
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": 2,  # MEMORY
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+    }
+
+    @staticmethod
+    def _read_pragmas(conn):
+        return {name: conn.execute(text(f"PRAGMA {name}")).scalar() for name in TestSQLiteProfile.EXPECTED}
+
+    def test_profile_applied_on_every_connection(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+        apply_sqlite_profile(engine)
+
+        with engine.connect() as first, engine.connect() as second:
+            assert self._read_pragmas(first) == self.EXPECTED
+            assert self._read_pragmas(second) == self.EXPECTED
+
+    def test_profile_applied_to_async_engine(self, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tuned_async.db'}")
+        apply_sqlite_profile(engine.sync_engine)
+
+        async def read():
+            async with engine.connect() as conn:
+                values = await conn.run_sync(self._read_pragmas)
+            await engine.dispose()
+            return values
+
+        loop = asyncio.new_event_loop()
+        assert loop.run_until_complete(read()) == self.EXPECTED
+        loop.close()
+
+    def test_profile_can_be_disabled(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "SQLITE_TUNING_ENABLED", False)
+        engine = create_engine(f"sqlite:///{tmp_path / 'default.db'}")
+        apply_sqlite_profile(engine)
+
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+
+
+class TestReadWriteSplit:
+    """Reads use query_only connections from their own pool; writes use a small separate pool."""
+
+    SESSION_ID = "rw1"
+
+    def _engines(self, path):
+        writer = create_engine(f"sqlite:///{path}")
+        apply_sqlite_profile(writer)
+        reader = create_engine(f"sqlite:///{path}")
+        apply_sqlite_profile(reader, read_only=True)
+        with writer.begin() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        return writer, reader
+
+    def test_read_connections_see_commits_and_refuse_writes(self, tmp_path):
+        writer, reader = self._engines(tmp_path / "split.db")
+
+        with writer.begin() as conn:
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+        with reader.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 1
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            with pytest.raises(OperationalError):
+                conn.execute(text("INSERT INTO t VALUES (2)"))
+
+    def test_read_connections_stay_read_only_without_tuning(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "SQLITE_TUNING_ENABLED", False)
+        _, reader = self._engines(tmp_path / "untuned.db")
+
+        with reader.connect() as conn:
+            assert conn.execute(text("PRAGMA query_only")).scalar() == 1
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+
+    def test_pools_are_sized_separately(self):
+        assert pool_args("sqlite:///:memory:", 2, 0) == {}
+        assert pool_args("sqlite:///./data/chat.db", 2, 0) == {"pool_size": 2, "max_overflow": 0}
+        assert engine.pool.size() == settings.DB_WRITE_POOL_SIZE
+        assert read_engine.pool.size() == settings.DB_READ_POOL_SIZE
+        assert read_engine.pool is not engine.pool
+
+    def test_routes_pick_the_read_or_write_session(self, monkeypatch):
+        def unavailable():
+            raise AssertionError("wrong session kind for this route")
+            yield  # pragma: no cover
+
+        client = TestClient(app)
+        payload = {FIELD_MESSAGE_ID: "rw-m1", FIELD_SESSION_ID: self.SESSION_ID, FIELD_CONTENT: CONTENT_VALID, FIELD_SENDER: VALID_SENDER}
+        read_override = app.dependency_overrides[get_read_db]
+
+        monkeypatch.setitem(app.dependency_overrides, get_read_db, unavailable)
+        assert client.post(BASE_URL_MESSAGES, json=payload, headers=API_KEY_HEADER).status_code == STATUS_CREATED
+
+        monkeypatch.setitem(app.dependency_overrides, get_read_db, read_override)
+        monkeypatch.setitem(app.dependency_overrides, get_db, unavailable)
+        assert client.get(f"{BASE_URL_MESSAGES}/{self.SESSION_ID}", headers=API_KEY_HEADER).status_code == STATUS_OK
@@ -1,11 +1,17 @@
 import pytest
+import sqlite3
 from datetime import datetime, timezone
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.infrastructure.database import Base, get_db, SessionLocal
-from app.infrastructure.message_repository_impl import SQLiteMessageRepository
-from app.domain.entities.message import Message
-from app.core.errors import DuplicateMessageIdError
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.metrics import REGISTRY
+from app.core.constants import DB_TABLE_MESSAGES_FTS
+from app.infrastructure.database import Base, get_db, get_read_db
+from app.infrastructure.message_repository_impl import SQLiteMessageRepository, MessageModel
+from app.infrastructure.schema import init_db
+from app.infrastructure.message_id_filter import MessageIdFilter
+from app.domain.entities.message import Message, MessageMetadata
+from app.core.errors import DuplicateMessageIdError, InvalidCursorError
 from test.test_constants import VALID_SENDER  # Constante global reutilizable
 
 
@@ -15,7 +21,7 @@ def db_session(tmp_path):
     db_file = tmp_path / "test.db"
     engine = create_engine(f"sqlite:///{db_file}")
     testing_session_local = sessionmaker(bind=engine)
-    Base.metadata.create_all(bind=engine)
+    init_db(engine)
     session = testing_session_local()
     yield session
     session.close()
@@ -66,6 +72,18 @@ class TestSQLiteMessageRepository:
         with pytest.raises(DuplicateMessageIdError):
             repo.save(msg)
 
+    def test_get_by_session_is_timed_once(self, db_session):
+        """The delegating get_by_session is observed only through get_page_by_session."""
+        def count(operation):
+            return REGISTRY.get_sample_value("chat_repository_duration_seconds_count", {"operation": operation}) or 0
+
+        repo = SQLiteMessageRepository(db_session)
+        before = (count("get_by_session"), count("get_page_by_session"))
+
+        repo.get_by_session(self.SESSION_ID, self.LIMIT, self.OFFSET)
+
+        assert (count("get_by_session"), count("get_page_by_session")) == (before[0], before[1] + 1)
+
     def test_filter_by_sender(self, db_session):
         repo = SQLiteMessageRepository(db_session)
         msg1 = Message(
@@ -99,9 +117,283 @@ class TestSQLiteMessageRepository:
         assert len(results_system) == 1
         assert results_system[0].sender == self.SENDER_SYSTEM
 
+    def test_save_many_skips_duplicates(self, db_session):
+        repo = SQLiteMessageRepository(db_session)
+        now = datetime.now(timezone.utc)
+        repo.save(Message(self.MESSAGE_ID_1, self.SESSION_ID, self.CONTENT_USER, now, VALID_SENDER, None))
+
+        results = repo.save_many([
+            Message(self.MESSAGE_ID_1, self.SESSION_ID, self.CONTENT_USER, now, VALID_SENDER, None),
+            Message(self.MESSAGE_ID_2, self.SESSION_ID, self.CONTENT_SHORT, now, VALID_SENDER, None),
+            Message(self.MESSAGE_ID_2, self.SESSION_ID, self.CONTENT_SHORT, now, VALID_SENDER, None),
+            Message(self.MESSAGE_ID_3, self.SESSION_ID, self.CONTENT_SYSTEM, now, self.SENDER_SYSTEM, None),
+        ])
+
+        assert [r.message_id if r else None for r in results] == [None, self.MESSAGE_ID_2, None, self.MESSAGE_ID_3]
+        stored = repo.get_by_session(self.SESSION_ID, self.LIMIT, self.OFFSET)
+        assert sorted(m.message_id for m in stored) == [self.MESSAGE_ID_1, self.MESSAGE_ID_2, self.MESSAGE_ID_3]
+        assert repo.save_many([]) == []
+
+    def test_save_many_attributes_concurrent_conflicts(self, db_session):
+        """Rows stored by another writer after the existence check are reported as duplicates."""
+        repo = SQLiteMessageRepository(db_session)
+        now = datetime.now(timezone.utc)
+        other = Message(self.MESSAGE_ID_2, self.SESSION_ID, self.CONTENT_SHORT, now, VALID_SENDER, None)
+        original_execute = db_session.execute
+
+        def execute_after_concurrent_insert(stmt, *args, **kwargs):
+            result = original_execute(stmt, *args, **kwargs)
+            if stmt.is_select:
+                concurrent = sessionmaker(bind=db_session.get_bind())()
+                concurrent.add(MessageModel.from_domain(other))
+                concurrent.commit()
+                concurrent.close()
+            return result
+
+        db_session.execute = execute_after_concurrent_insert
+        results = repo.save_many([
+            Message(self.MESSAGE_ID_1, self.SESSION_ID, self.CONTENT_USER, now, VALID_SENDER, None),
+            Message(self.MESSAGE_ID_2, self.SESSION_ID, self.CONTENT_SHORT, now, VALID_SENDER, None),
+        ])
+
+        assert [r.message_id if r else None for r in results] == [self.MESSAGE_ID_1, None]
+
+    def _statements(self, db_session):
+        """Record the SQL verb of every statement executed on the session's engine."""
+        verbs = []
+        event.listen(db_session.get_bind(), "before_cursor_execute", lambda conn, cursor, statement, *args: verbs.append(statement.split()[0]))
+        return verbs
+
+    def test_id_filter_rejects_duplicates_without_an_insert(self, db_session):
+        id_filter = MessageIdFilter(100, 0.01)
+        repo = SQLiteMessageRepository(db_session, id_filter)
+        now = datetime.now(timezone.utc)
+        repo.save(Message(self.MESSAGE_ID_1, self.SESSION_ID, self.CONTENT_USER, now, VALID_SENDER, None))
+        verbs = self._statements(db_session)
+
+        with pytest.raises(DuplicateMessageIdError):
+            repo.save(Message(self.MESSAGE_ID_1, self.SESSION_ID, self.CONTENT_USER, now, VALID_SENDER, None))
+        assert verbs == ["SELECT"]
+
+        # A false positive is confirmed absent and stored normally
+        id_filter.add(self.MESSAGE_ID_2)
+        repo.save(Message(self.MESSAGE_ID_2, self.SESSION_ID, self.CONTENT_USER, now, VALID_SENDER, None))
+        stats = id_filter.stats()
+        assert (stats.checks, stats.probable_duplicates, stats.false_positives) == (3, 2, 1)
+
+    def test_id_filter_limits_batch_precheck_to_probable_duplicates(self, db_session):
+        id_filter = MessageIdFilter(100, 0.01)
+        repo = SQLiteMessageRepository(db_session, id_filter)
+        now = datetime.now(timezone.utc)
+        verbs = self._statements(db_session)
+
+        repo.save_many([
+            Message(self.MESSAGE_ID_1, self.SESSION_ID, self.CONTENT_USER, now, VALID_SENDER, None),
+            Message(self.MESSAGE_ID_2, self.SESSION_ID, self.CONTENT_USER, now, VALID_SENDER, None),
+        ])
+        assert "SELECT" not in verbs
+
+        results = repo.save_many([
+            Message(self.MESSAGE_ID_1, self.SESSION_ID, self.CONTENT_USER, now, VALID_SENDER, None),
+            Message(self.MESSAGE_ID_3, self.SESSION_ID, self.CONTENT_USER, now, VALID_SENDER, None),
+        ])
+        assert [r.message_id if r else None for r in results] == [None, self.MESSAGE_ID_3]
+        assert id_filter.might_contain(self.MESSAGE_ID_3)
+        assert id_filter.stats().false_positives == 0
+
+    def test_keyset_pages_cover_session_in_order(self, db_session):
+        """Cursor pages should follow (timestamp, id) order, including rows sharing a timestamp."""
+        repo = SQLiteMessageRepository(db_session)
+        now = datetime.now(timezone.utc)
+        ids = [f"k{i}" for i in range(5)]
+        repo.save_many([Message(message_id, self.SESSION_ID, self.CONTENT_USER, now, VALID_SENDER, None) for message_id in ids])
+
+        seen, cursor = [], None
+        while True:
+            page = repo.get_page_by_session(self.SESSION_ID, 2, cursor=cursor)
+            seen.extend(m.message_id for m in page.messages)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert seen == ids
+        assert repo.get_page_by_session(self.SESSION_ID, 2, offset=4).messages[0].message_id == ids[4]
+        assert repo.get_page_by_session(self.SESSION_ID, 0).next_cursor is None
+
+    def test_keyset_invalid_cursor_raises(self, db_session):
+        repo = SQLiteMessageRepository(db_session)
+        with pytest.raises(InvalidCursorError):
+            repo.get_page_by_session(self.SESSION_ID, self.LIMIT, cursor=self.CONTENT_USER)
+
+    def test_full_text_query_runs_before_pagination(self, db_session):
+        """Matches beyond the first unfiltered page must still be found."""
+        repo = SQLiteMessageRepository(db_session)
+        now = datetime.now(timezone.utc)
+        filler = [Message(f"f{i}", self.SESSION_ID, "nothing to see", now, VALID_SENDER, None) for i in range(20)]
+        hits = [
+            Message("h1", self.SESSION_ID, "Hello wonderful World", now, VALID_SENDER, None),
+            Message("h2", self.SESSION_ID, "hello hello world, hello again", now, self.SENDER_SYSTEM, None),
+            Message("h3", self.SESSION_ID, "world peace", now, VALID_SENDER, None),
+        ]
+        repo.save_many(filler + hits)
+
+        def ids(**kwargs):
+            return [m.message_id for m in repo.get_page_by_session(self.SESSION_ID, self.LIMIT, **kwargs).messages]
+
+        assert ids(query="hello world") == ["h1", "h2"]
+        assert ids(query="hel*") == ["h1", "h2"]
+        assert ids(query='"hello world"') == ["h2"]
+        assert ids(query="world", sender=self.SENDER_SYSTEM) == ["h2"]
+        assert ids(query="hello", sort="relevance") == ["h2", "h1"]
+        assert ids(query="!!!") == []
+        first = repo.get_page_by_session(self.SESSION_ID, 1, query="world")
+        assert repo.get_page_by_session(self.SESSION_ID, 1, query="world", cursor=first.next_cursor).messages[0].message_id == "h2"
+        with pytest.raises(InvalidCursorError):
+            repo.get_page_by_session(self.SESSION_ID, 1, query="world", sort="relevance", cursor=first.next_cursor)
+
+    def test_iter_by_session_streams_in_batches(self, db_session):
+        """Should yield every message of the session in order, across several fetch batches."""
+        repo = SQLiteMessageRepository(db_session)
+        ids = [f"e{i}" for i in range(5)]
+        repo.save_many([
+            Message(message_id, self.SESSION_ID, self.CONTENT_USER, datetime(2024, 1, 1, tzinfo=timezone.utc), VALID_SENDER)
+            for message_id in ids
+        ] + [Message("other", "s2", self.CONTENT_USER, datetime.now(timezone.utc), VALID_SENDER)])
+
+        exported = list(repo.iter_by_session(self.SESSION_ID, batch_size=2))
+
+        assert [m.message_id for m in exported] == ids
+        assert exported[0].metadata is None
+        assert list(repo.iter_by_session("missing")) == []
+
+    def test_init_db_indexes_existing_rows(self, tmp_path):
+        """Rows stored before the FTS index existed are indexed by init_db."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        SQLiteMessageRepository(session).save(
+            Message(self.MESSAGE_ID_1, self.SESSION_ID, self.CONTENT_SYSTEM, datetime.now(timezone.utc), VALID_SENDER, None)
+        )
+
+        init_db(engine)
+        init_db(engine)
+
+        page = SQLiteMessageRepository(session).get_page_by_session(self.SESSION_ID, self.LIMIT, query="system")
+        assert [m.message_id for m in page.messages] == [self.MESSAGE_ID_1]
+        session.close()
+
+    def test_session_stats_follow_every_insert(self, db_session):
+        """save and save_many update the aggregates in the same transaction; rejected duplicates do not count."""
+        repo = SQLiteMessageRepository(db_session)
+        first = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        last = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        repo.save(Message(self.MESSAGE_ID_1, self.SESSION_ID, self.CONTENT_USER, last, VALID_SENDER, MessageMetadata(1, 5, "x")))
+        repo.save_many([
+            Message(self.MESSAGE_ID_2, self.SESSION_ID, self.CONTENT_SYSTEM, first, self.SENDER_SYSTEM, MessageMetadata(2, 14, "x")),
+            Message(self.MESSAGE_ID_1, self.SESSION_ID, self.CONTENT_USER, first, VALID_SENDER, MessageMetadata(1, 5, "x")),
+        ])
+        with pytest.raises(DuplicateMessageIdError):
+            repo.save(Message(self.MESSAGE_ID_2, self.SESSION_ID, self.CONTENT_USER, first, VALID_SENDER, MessageMetadata(1, 5, "x")))
+
+        stats = repo.get_session_stats(self.SESSION_ID)
+
+        assert (stats.message_count, stats.word_count, stats.character_count) == (2, 3, 19)
+        assert stats.senders == {self.SENDER_SYSTEM: 1, VALID_SENDER: 1}
+        assert stats.first_timestamp.replace(tzinfo=timezone.utc) == first
+        assert stats.last_timestamp.replace(tzinfo=timezone.utc) == last
+        assert repo.get_session_stats("missing") is None
+        assert repo.get_session_version(self.SESSION_ID) == 2
+        assert repo.get_session_version("missing") == 0
+
+    def test_init_db_backfills_session_stats(self, tmp_path):
+        """Rows stored before the session_stats table existed are aggregated by init_db."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy_stats.db'}")
+        MessageModel.__table__.create(bind=engine)
+        session = sessionmaker(bind=engine)()
+        repo = SQLiteMessageRepository(session)
+        repo.save(Message(self.MESSAGE_ID_1, self.SESSION_ID, self.CONTENT_USER, datetime.now(timezone.utc), VALID_SENDER, MessageMetadata(1, 5, "x")))
+        repo.save(Message(self.MESSAGE_ID_2, self.SESSION_ID, self.CONTENT_SYSTEM, datetime.now(timezone.utc), VALID_SENDER, None))
+
+        init_db(engine)
+        init_db(engine)
+
+        stats = repo.get_session_stats(self.SESSION_ID)
+        assert (stats.message_count, stats.word_count, stats.character_count) == (2, 1, 5 + len(self.CONTENT_SYSTEM))
+        session.close()
+
     def test_get_db_yields_and_closes(self):
-        gen = get_db()
-        db = next(gen)
-        assert db is not None
-        assert isinstance(db, SessionLocal().__class__)
-        gen.close()
+        for dependency in (get_db, get_read_db):
+            gen = dependency()
+            db = next(gen)
+            assert db is not None
+            assert isinstance(db, Session)
+            gen.close()
+
+
+class TestCompressedContent:
+    """Large bodies are stored compressed and read, searched and counted as the original text."""
+
+    SESSION_ID = "c1"
+    LARGE = "traceback: connection reset by peer\n" * 100
+    SMALL = "short reply"
+
+    @pytest.fixture(autouse=True)
+    def compression(self, monkeypatch):
+        monkeypatch.setattr(settings, "CONTENT_COMPRESSION_ENABLED", True)
+        monkeypatch.setattr(settings, "CONTENT_COMPRESSION_MIN_BYTES", 1024)
+
+    def _save(self, db_session):
+        repo = SQLiteMessageRepository(db_session)
+        now = datetime.now(timezone.utc)
+        repo.save(Message("big", self.SESSION_ID, self.LARGE, now, VALID_SENDER))
+        repo.save_many([Message("small", self.SESSION_ID, self.SMALL, now, VALID_SENDER)])
+        return repo
+
+    def _stored_types(self, db_session):
+        return dict(db_session.execute(text("SELECT message_id, typeof(content) FROM messages")).all())
+
+    def test_only_large_bodies_are_stored_compressed(self, db_session):
+        repo = self._save(db_session)
+
+        assert self._stored_types(db_session) == {"big": "blob", "small": "text"}
+        assert [m.content for m in repo.get_by_session(self.SESSION_ID, 10, 0)] == [self.LARGE, self.SMALL]
+        assert [m.content for m in repo.iter_by_session(self.SESSION_ID)] == [self.LARGE, self.SMALL]
+
+    def test_search_and_stats_see_the_original_text(self, db_session):
+        repo = self._save(db_session)
+
+        found = repo.get_page_by_session(self.SESSION_ID, 10, query="traceback")
+        stats = repo.get_session_stats(self.SESSION_ID)
+
+        assert [m.message_id for m in found.messages] == ["big"]
+        assert stats.character_count == len(self.LARGE) + len(self.SMALL)
+
+    def test_compressed_rows_survive_disabling_and_reindexing(self, db_session, monkeypatch):
+        repo = self._save(db_session)
+        db_session.commit()
+        monkeypatch.setattr(settings, "CONTENT_COMPRESSION_ENABLED", False)
+        with db_session.get_bind().begin() as conn:
+            conn.exec_driver_sql(f"DROP TABLE {DB_TABLE_MESSAGES_FTS}")
+        init_db(db_session.get_bind())
+
+        found = repo.get_page_by_session(self.SESSION_ID, 10, query="traceback").messages
+        assert [(m.message_id, m.content) for m in found] == [("big", self.LARGE)]
+
+    def test_plain_sqlite_clients_can_write_while_compression_is_off(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(settings, "CONTENT_COMPRESSION_ENABLED", False)
+        db_file = tmp_path / "plain.db"
+        engine = create_engine(f"sqlite:///{db_file}")
+        init_db(engine)
+        engine.dispose()
+
+        with sqlite3.connect(db_file) as conn:  # no decompress_content() registered
+            conn.execute(
+                "INSERT INTO messages (message_id, session_id, content, timestamp, sender) VALUES (?, ?, ?, ?, ?)",
+                ("raw", self.SESSION_ID, self.SMALL, datetime.now(timezone.utc).isoformat(), VALID_SENDER),
+            )
+            hits = conn.execute(f"SELECT count(*) FROM {DB_TABLE_MESSAGES_FTS} WHERE {DB_TABLE_MESSAGES_FTS} MATCH 'reply'").fetchone()
+            characters = conn.execute("SELECT character_count FROM session_stats").fetchone()
+        conn.close()
+
+        assert hits == (1,)
+        assert characters == (len(self.SMALL),)
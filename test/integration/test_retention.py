@@ -0,0 +1,319 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.errors import DuplicateMessageIdError
+from app.domain.entities.message import Message, MessageMetadata
+from app.infrastructure import retention
+from app.infrastructure.archive import SessionArchive
+from app.infrastructure.archive_index import ArchivedSessionModel
+from app.infrastructure.async_message_repository_impl import AsyncSQLiteMessageRepository
+from app.infrastructure.message_id_filter import MessageIdFilter
+from app.infrastructure.message_repository_impl import MessageModel, SQLiteMessageRepository
+from app.infrastructure.pagination import encode_cursor
+from app.infrastructure.retention import RetentionJob, archive_session, run_retention
+from app.infrastructure.schema import init_db
+from app.interfaces.api import messages_router, async_messages_router
+from app.main import app
+from test.conftest import TestingSessionLocal
+from test.test_constants import (
+    API_KEY_HEADER,
+    BASE_URL_MESSAGES,
+    BASE_URL_MESSAGES_BATCH,
+    BATCH_STATUS_REJECTED,
+    CONTENT_VALID,
+    EXPORT_PATH_SUFFIX,
+    FIELD_CONTENT,
+    FIELD_MESSAGE_ID,
+    FIELD_SENDER,
+    FIELD_SESSION_ID,
+    NEXT_CURSOR_HEADER,
+    STATS_PATH_SUFFIX,
+    STATUS_CONFLICT,
+    VALID_SENDER,
+)
+
+OLD = datetime(2024, 1, 1, tzinfo=timezone.utc)
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+IDLE = timedelta(days=30)
+CONTENTS = ["deploy the service", "lunch plans", "deploy rollback done", "unrelated chatter"]
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'retention.db'}", connect_args={"check_same_thread": False})
+    init_db(engine)
+    yield sessionmaker(bind=engine), SessionArchive(str(tmp_path / "archive"), segment_max_bytes=1)
+    engine.dispose()
+
+
+def _seed(session_factory, session_id, count, start, prefix=None):
+    db = session_factory()
+    SQLiteMessageRepository(db).save_many([
+        Message(
+            f"{prefix or session_id}-m{i}", session_id, CONTENTS[i % len(CONTENTS)], start + timedelta(minutes=i),
+            VALID_SENDER if i % 2 else "system", MessageMetadata(3, 17, "x"),
+        )
+        for i in range(count)
+    ])
+    db.close()
+
+
+def _hot_count(session_factory, session_id):
+    db = session_factory()
+    try:
+        return db.execute(select(func.count()).where(MessageModel.session_id == session_id)).scalar_one()
+    finally:
+        db.close()
+
+
+def _reads(repo, session_id):
+    """Every read the API offers on a session, as comparable plain values."""
+    pages, cursor = [], None
+    while True:
+        page = repo.get_page_by_session(session_id, 2, cursor=cursor)
+        pages.append([m.message_id for m in page.messages])
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    return {
+        "pages": pages,
+        "offset": [m.message_id for m in repo.get_by_session(session_id, 2, 3)],
+        "sender": [m.message_id for m in repo.get_page_by_session(session_id, 10, sender="system").messages],
+        "search": [m.message_id for m in repo.get_page_by_session(session_id, 10, query="deploy").messages],
+        "ranked": [m.message_id for m in repo.get_page_by_session(session_id, 1, 1, query="deploy", sort="relevance").messages],
+        "export": [(m.message_id, m.content, m.timestamp, m.metadata) for m in repo.iter_by_session(session_id)],
+        "stats": repo.get_session_stats(session_id),
+    }
+
+
+class TestRetention:
+    """Idle sessions move to segment files and read back exactly as before."""
+
+    def test_archived_sessions_read_back_unchanged(self, store):
+        session_factory, archive = store
+        _seed(session_factory, "cold", 7, OLD)
+        _seed(session_factory, "warm", 2, NOW - timedelta(days=1))
+        db = session_factory()
+        repo = SQLiteMessageRepository(db, archive=archive)
+        before = _reads(repo, "cold")
+
+        report = run_retention(session_factory, archive, IDLE, limit=10, now=NOW)
+
+        assert (report.sessions_archived, report.messages_archived) == (1, 7)
+        assert _hot_count(session_factory, "cold") == 0
+        assert _hot_count(session_factory, "warm") == 2
+        assert _reads(repo, "cold") == before
+        assert repo.get_page_by_session("cold", 10, query="nomatch").messages == []
+        assert [m.message_id for m in repo.get_by_session("warm", 10, 0)] == ["warm-m0", "warm-m1"]
+        db.close()
+
+    def test_cursors_with_a_utc_offset_page_like_hot_rows(self, store):
+        session_factory, archive = store
+        _seed(session_factory, "cold", 4, OLD)
+        db = session_factory()
+        repo = SQLiteMessageRepository(db, archive=archive)
+        cursors = [
+            encode_cursor(OLD + timedelta(minutes=1), 10 ** 6),
+            encode_cursor((OLD + timedelta(minutes=1)).astimezone(timezone(timedelta(hours=2))), 10 ** 6),
+        ]
+        before = [[m.message_id for m in repo.get_page_by_session("cold", 10, cursor=c).messages] for c in cursors]
+
+        run_retention(session_factory, archive, IDLE, limit=10, now=NOW)
+
+        assert before == [["cold-m2", "cold-m3"]] * 2
+        assert [[m.message_id for m in repo.get_page_by_session("cold", 10, cursor=c).messages] for c in cursors] == before
+        db.close()
+
+    def test_new_messages_in_an_archived_session_merge_and_rearchive(self, store):
+        session_factory, archive = store
+        _seed(session_factory, "cold", 3, OLD)
+        _seed(session_factory, "other", 1, NOW)
+        run_retention(session_factory, archive, IDLE, limit=10, now=NOW)
+        _seed(session_factory, "cold", 2, OLD + timedelta(days=1), prefix="cold-late")
+        _seed(session_factory, "other", 1, NOW, prefix="other-late")
+        db = session_factory()
+        repo = SQLiteMessageRepository(db, archive=archive)
+        expected = ["cold-m0", "cold-m1", "cold-m2", "cold-late-m0", "cold-late-m1"]
+
+        assert [m.message_id for m in repo.iter_by_session("cold")] == expected
+        report = run_retention(session_factory, archive, IDLE, limit=10, now=NOW)
+
+        assert report.sessions_archived == 1
+        assert db.execute(select(func.count()).select_from(ArchivedSessionModel)).scalar_one() == 2
+        assert [m.message_id for m in repo.get_by_session("cold", 10, 0)] == expected
+        # segment_max_bytes=1 rolls over on every append
+        assert sorted(os.listdir(archive.directory)) == ["segment-000000.jsonl.gz", "segment-000001.jsonl.gz", "segments.lock"]
+        db.close()
+
+    def test_archived_ids_stay_taken(self, store):
+        session_factory, archive = store
+        db = session_factory()
+        stale_filter = MessageIdFilter(100, 0.01)
+        stale_filter.build([db.get_bind()])
+        db.close()
+        _seed(session_factory, "cold", 2, OLD)
+        _seed(session_factory, "other", 1, NOW)
+        run_retention(session_factory, archive, IDLE, limit=10, now=NOW)
+        db = session_factory()
+        id_filter = MessageIdFilter(100, 0.01)
+        id_filter.build([db.get_bind()])
+        retried = Message("cold-m0", "cold", CONTENT_VALID, NOW, VALID_SENDER)
+
+        with pytest.raises(DuplicateMessageIdError):
+            SQLiteMessageRepository(db).save(retried)
+        with pytest.raises(DuplicateMessageIdError):
+            SQLiteMessageRepository(db, id_filter).save(retried)
+        assert SQLiteMessageRepository(db).save_many([retried]) == [None]
+        assert id_filter.stats().false_positives == 0
+        # A filter built before the id existed skips the lookup, so the trigger rejects the bulk insert
+        fresh = Message("cold-new", "cold", CONTENT_VALID, NOW, VALID_SENDER)
+        assert SQLiteMessageRepository(db, stale_filter).save_many([retried, fresh, retried]) == [None, fresh, None]
+        assert _hot_count(session_factory, "cold") == 1
+        assert stale_filter.might_contain("cold-new")
+        db.close()
+
+    def test_session_holding_the_newest_row_stays_hot(self, store):
+        session_factory, archive = store
+        _seed(session_factory, "cold", 2, OLD)
+
+        assert run_retention(session_factory, archive, IDLE, limit=10, now=NOW).sessions_archived == 0
+        assert _hot_count(session_factory, "cold") == 2
+        db = session_factory()
+        assert archive_session(db, archive, "missing", NOW) == 0
+        db.close()
+
+    def test_losing_a_race_keeps_the_session_hot(self, store):
+        session_factory, archive = store
+        _seed(session_factory, "cold", 2, OLD)
+        _seed(session_factory, "other", 1, NOW)
+
+        class RacingArchive(SessionArchive):
+            """Another worker archives (deletes) one row while this one writes its segment."""
+            def append(self, rows):
+                other = session_factory()
+                other.execute(delete(MessageModel).where(MessageModel.message_id == "cold-m0"))
+                other.commit()
+                other.close()
+                return super().append(rows)
+
+        db = session_factory()
+        assert archive_session(db, RacingArchive(archive.directory, 1 << 20), "cold", NOW) == 0
+        assert db.execute(select(func.count()).select_from(ArchivedSessionModel)).scalar_one() == 0
+        assert _hot_count(session_factory, "cold") == 1
+        db.close()
+
+    def test_async_repository_reads_the_archive(self, store, tmp_path):
+        session_factory, archive = store
+        _seed(session_factory, "cold", 3, OLD)
+        _seed(session_factory, "other", 1, NOW)
+        run_retention(session_factory, archive, IDLE, limit=10, now=NOW)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'retention.db'}")
+
+        async def read():
+            async with async_sessionmaker(bind=engine)() as db:
+                repo = AsyncSQLiteMessageRepository(db, archive=archive)
+                page = await repo.get_by_session("cold", 2, 1)
+                exported = [m.message_id async for m in repo.iter_by_session("cold")]
+                hot = [m.message_id async for m in repo.iter_by_session("other")]
+            await engine.dispose()
+            return [m.message_id for m in page], exported, hot
+
+        page, exported, hot = run(read())
+
+        assert page == ["cold-m1", "cold-m2"]
+        assert exported == ["cold-m0", "cold-m1", "cold-m2"]
+        assert hot == ["other-m0"]
+
+
+class TestRetentionJob:
+    """Background and command-line runs of the retention pass."""
+
+    def test_background_job_archives_and_survives_failures(self, store, tmp_path, caplog):
+        session_factory, archive = store
+        _seed(session_factory, "cold", 2, OLD)
+        _seed(session_factory, "other", 1, datetime.now(timezone.utc))
+        broken = tmp_path / "not-a-directory"
+        broken.write_text("")
+        failing = RetentionJob([session_factory], SessionArchive(str(broken), 1), IDLE, 0.01, 10)
+        job = RetentionJob([session_factory], archive, IDLE, 0.01, 10)
+
+        failing.start()
+        time.sleep(0.05)
+        failing.stop()
+        assert "retention pass failed" in caplog.text
+        assert _hot_count(session_factory, "cold") == 2
+
+        job.start()
+        job.start()
+        deadline = time.monotonic() + 5
+        while _hot_count(session_factory, "cold") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        job.stop()
+        job.stop()
+        assert _hot_count(session_factory, "cold") == 0
+
+    def test_command_line_run(self, store, monkeypatch, capsys, tmp_path):
+        session_factory, _ = store
+        _seed(session_factory, "cold", 2, OLD)
+        _seed(session_factory, "other", 1, datetime.now(timezone.utc))
+        assert retention._session_factories() == [retention.SessionLocal]
+        monkeypatch.setattr(retention, "_session_factories", lambda: [session_factory])
+
+        assert retention.main(["--idle-days", "30", "--archive-dir", str(tmp_path / "cli")]) == 0
+        assert "archived 1 sessions (2 messages)" in capsys.readouterr().out
+
+
+class TestArchivedSessionAPI:
+    """The routes serve archived sessions when the archive is enabled."""
+
+    SESSION_ID = "arch1"
+
+    def test_routes_read_archived_session(self, tmp_path, monkeypatch):
+        archive = SessionArchive(str(tmp_path / "archive"), 1 << 20)
+        monkeypatch.setattr(messages_router, "session_archive", archive)
+        client = TestClient(app)
+        payloads = [
+            {FIELD_MESSAGE_ID: f"arch-m{i}", FIELD_SESSION_ID: self.SESSION_ID, FIELD_CONTENT: CONTENT_VALID, FIELD_SENDER: VALID_SENDER}
+            for i in range(3)
+        ]
+        client.post(BASE_URL_MESSAGES_BATCH, json={"messages": payloads}, headers=API_KEY_HEADER)
+        client.post(BASE_URL_MESSAGES, json={**payloads[0], FIELD_MESSAGE_ID: "arch-newest", FIELD_SESSION_ID: "arch2"}, headers=API_KEY_HEADER)
+        db = TestingSessionLocal()
+        assert archive_session(db, archive, self.SESSION_ID, NOW) == 3
+        db.close()
+        url = f"{BASE_URL_MESSAGES}/{self.SESSION_ID}"
+
+        first = client.get(f"{url}?limit=2", headers=API_KEY_HEADER)
+        second = client.get(f"{url}?limit=2&cursor={first.headers[NEXT_CURSOR_HEADER]}", headers=API_KEY_HEADER)
+        export = client.get(f"{url}/{EXPORT_PATH_SUFFIX}", headers=API_KEY_HEADER)
+        stats = client.get(f"{url}/{STATS_PATH_SUFFIX}", headers=API_KEY_HEADER)
+        duplicate = client.post(BASE_URL_MESSAGES, json=payloads[0], headers=API_KEY_HEADER)
+        batch = client.post(BASE_URL_MESSAGES_BATCH, json={"messages": payloads[:1]}, headers=API_KEY_HEADER)
+
+        assert [m[FIELD_MESSAGE_ID] for m in first.json() + second.json()] == ["arch-m0", "arch-m1", "arch-m2"]
+        assert [json.loads(line)[FIELD_MESSAGE_ID] for line in export.text.splitlines()] == ["arch-m0", "arch-m1", "arch-m2"]
+        assert stats.json()["message_count"] == 3
+        assert duplicate.status_code == STATUS_CONFLICT
+        assert batch.json()["results"][0]["status"] == BATCH_STATUS_REJECTED
+
+    def test_async_router_passes_the_archive(self, tmp_path, monkeypatch):
+        archive = SessionArchive(str(tmp_path), 1)
+        monkeypatch.setattr(async_messages_router, "session_archive", archive)
+        assert async_messages_router.get_service(db=None).repository.archive is archive
@@ -0,0 +1,243 @@
+import json
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.core.errors import DuplicateMessageIdError
+from app.domain.entities.message import Message, MessageMetadata
+from app.infrastructure import shard_rebalance
+from app.infrastructure.archive import SessionArchive
+from app.infrastructure.archive_index import ArchivedMessageIdModel, ArchivedSessionModel
+from app.infrastructure.message_repository_impl import MessageModel, SQLiteMessageRepository
+from app.infrastructure.retention import archive_session
+from app.infrastructure.session_stats import SessionStatsModel
+from app.infrastructure.sharding import (
+    MessageShards,
+    ShardedMessageRepository,
+    jump_hash,
+    shard_urls,
+    stable_hash,
+)
+from app.interfaces.api import messages_router
+from app.main import app
+from test.test_constants import (
+    API_KEY_HEADER,
+    BASE_URL_MESSAGES,
+    BASE_URL_MESSAGES_BATCH,
+    CONTENT_VALID,
+    EXPORT_PATH_SUFFIX,
+    FIELD_CONTENT,
+    FIELD_MESSAGE_ID,
+    FIELD_SENDER,
+    FIELD_SESSION_ID,
+    STATS_PATH_SUFFIX,
+    STATUS_CREATED,
+    STATUS_OK,
+    VALID_SENDER,
+)
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _template(tmp_path):
+    return f"sqlite:///{tmp_path}/chat-shard{{shard}}.db"
+
+
+def _shards(tmp_path, count):
+    shards = MessageShards(shard_urls(_template(tmp_path), count))
+    shards.init_schema()
+    return shards
+
+
+def _message(message_id, session_id, second=0):
+    return Message(message_id, session_id, CONTENT_VALID, START + timedelta(seconds=second), VALID_SENDER, MessageMetadata(2, 11, "x"))
+
+
+def _rows_per_shard(shards):
+    counts = []
+    for index in range(len(shards)):
+        db = shards.session(index)
+        counts.append(db.execute(select(func.count()).select_from(MessageModel)).scalar_one())
+        db.close()
+    return counts
+
+
+class TestJumpHash:
+    """Stability and minimal movement of the shard routing hash."""
+
+    KEYS = [stable_hash(f"session-{i}") for i in range(5000)]
+
+    def test_maps_every_key_into_range_deterministically(self):
+        buckets = [jump_hash(key, 8) for key in self.KEYS]
+
+        assert buckets == [jump_hash(key, 8) for key in self.KEYS]
+        assert set(buckets) == set(range(8))
+        assert max(Counter(buckets).values()) < 1.2 * len(self.KEYS) / 8
+        assert jump_hash(self.KEYS[0], 1) == 0
+
+    def test_growing_moves_only_keys_to_the_new_bucket(self):
+        before = [jump_hash(key, 4) for key in self.KEYS]
+        after = [jump_hash(key, 5) for key in self.KEYS]
+        moved = [(old, new) for old, new in zip(before, after) if old != new]
+
+        assert all(new == 4 for _, new in moved)
+        assert 0.15 < len(moved) / len(self.KEYS) < 0.25
+
+
+class TestShardedMessageRepository:
+    """Every operation touches only the shard of its session."""
+
+    SESSIONS = [f"shard-s{i}" for i in range(12)]
+
+    def test_writes_and_reads_route_to_the_session_shard(self, tmp_path):
+        shards = _shards(tmp_path, 3)
+        repo = ShardedMessageRepository(shards)
+        messages = [_message(f"m{i}", session_id, i) for i, session_id in enumerate(self.SESSIONS)]
+
+        repo.save(messages[0])
+        results = repo.save_many(messages + [messages[1]])
+
+        assert results[0] is None and results[-1] is None
+        assert [m.message_id for m in results[1:-1]] == [m.message_id for m in messages[1:]]
+        expected = Counter(shards.index_for(session_id) for session_id in self.SESSIONS)
+        assert _rows_per_shard(shards) == [expected[index] for index in range(3)]
+        with pytest.raises(DuplicateMessageIdError):
+            repo.save(messages[0])
+
+        session_id = self.SESSIONS[4]
+        assert [m.message_id for m in repo.get_by_session(session_id, 10, 0)] == ["m4"]
+        assert repo.get_page_by_session(session_id, 10, query="hello").messages[0].message_id == "m4"
+        assert [m.message_id for m in repo.iter_by_session(session_id)] == ["m4"]
+        assert repo.get_session_stats(session_id).message_count == 1
+        assert repo.get_session_stats("missing") is None
+        shards.dispose()
+
+    def test_batch_writes_get_the_archive_like_single_writes(self, tmp_path, monkeypatch):
+        archive = SessionArchive(str(tmp_path / "archive"), 1 << 20)
+        repo = ShardedMessageRepository(_shards(tmp_path, 2), archive=archive)
+        seen = []
+        save_many = SQLiteMessageRepository.save_many
+        monkeypatch.setattr(SQLiteMessageRepository, "save_many", lambda self, batch: seen.append(self.archive) or save_many(self, batch))
+
+        repo.save_many([_message(f"a{i}", session_id) for i, session_id in enumerate(self.SESSIONS)])
+
+        assert seen and all(used is archive for used in seen)
+        repo.shards.dispose()
+
+    def test_router_uses_shards_when_configured(self, tmp_path, monkeypatch):
+        shards = _shards(tmp_path, 2)
+        monkeypatch.setattr(messages_router, "message_shards", shards)
+        client = TestClient(app)
+        payloads = [
+            {FIELD_MESSAGE_ID: f"api-shard-{i}", FIELD_SESSION_ID: session_id, FIELD_CONTENT: CONTENT_VALID, FIELD_SENDER: VALID_SENDER}
+            for i, session_id in enumerate(self.SESSIONS[:4])
+        ]
+
+        created = client.post(BASE_URL_MESSAGES, json=payloads[0], headers=API_KEY_HEADER)
+        batch = client.post(BASE_URL_MESSAGES_BATCH, json={"messages": payloads[1:]}, headers=API_KEY_HEADER)
+        page = client.get(f"{BASE_URL_MESSAGES}/{self.SESSIONS[0]}", headers=API_KEY_HEADER)
+        export = client.get(f"{BASE_URL_MESSAGES}/{self.SESSIONS[1]}/{EXPORT_PATH_SUFFIX}", headers=API_KEY_HEADER)
+        stats = client.get(f"{BASE_URL_MESSAGES}/{self.SESSIONS[2]}/{STATS_PATH_SUFFIX}", headers=API_KEY_HEADER)
+
+        assert created.status_code == STATUS_CREATED
+        assert batch.status_code == STATUS_OK
+        assert [m[FIELD_MESSAGE_ID] for m in page.json()] == ["api-shard-0"]
+        assert json.loads(export.text)[FIELD_MESSAGE_ID] == "api-shard-1"
+        assert stats.json()["message_count"] == 1
+        assert sum(_rows_per_shard(shards)) == 4
+        shards.dispose()
+
+
+class TestShardRebalance:
+    """The rebalance tool moves sessions to the shard of the new count, idempotently."""
+
+    SESSIONS = [f"rebalance-s{i}" for i in range(30)]
+
+    def _seed(self, tmp_path, count):
+        shards = _shards(tmp_path, count)
+        repo = ShardedMessageRepository(shards)
+        repo.save_many([
+            _message(f"{session_id}-m{j}", session_id, j) for session_id in self.SESSIONS for j in range(3)
+        ])
+        shards.dispose()
+
+    def _assert_all_readable(self, tmp_path, count):
+        shards = MessageShards(shard_urls(_template(tmp_path), count))
+        repo = ShardedMessageRepository(shards)
+        for session_id in self.SESSIONS:
+            assert [m.message_id for m in repo.iter_by_session(session_id)] == [f"{session_id}-m{j}" for j in range(3)]
+            assert repo.get_session_stats(session_id).message_count == 3
+            assert repo.get_page_by_session(session_id, 10, query="hello").messages
+        shards.dispose()
+
+    def test_grow_then_shrink(self, tmp_path, capsys):
+        self._seed(tmp_path, 2)
+
+        grown = shard_rebalance.rebalance(shard_urls(_template(tmp_path), 2), shard_urls(_template(tmp_path), 3), batch_size=2)
+        expected = sum(1 for s in self.SESSIONS if jump_hash(stable_hash(s), 3) != jump_hash(stable_hash(s), 2))
+        assert (grown.sessions_moved, grown.messages_moved) == (expected, 3 * expected)
+        self._assert_all_readable(tmp_path, 3)
+        assert shard_rebalance.rebalance(shard_urls(_template(tmp_path), 3), shard_urls(_template(tmp_path), 3)).sessions_moved == 0
+
+        assert shard_rebalance.main(["--from-count", "3", "--to-count", "1", "--template", _template(tmp_path)]) == 0
+        assert "moved" in capsys.readouterr().out
+        self._assert_all_readable(tmp_path, 1)
+        leftover = MessageShards(shard_urls(_template(tmp_path), 3))
+        assert _rows_per_shard(leftover)[1:] == [0, 0]
+        db = leftover.session(2)
+        assert db.execute(select(func.count()).select_from(SessionStatsModel)).scalar_one() == 0
+        db.close()
+        leftover.dispose()
+
+    def test_session_with_a_conflicting_message_id_stays_in_place(self, tmp_path, capsys):
+        self._seed(tmp_path, 2)
+        moving = next(s for s in self.SESSIONS if jump_hash(stable_hash(s), 3) == 2)
+        holder = next(s for s in (f"holder-{i}" for i in range(100)) if jump_hash(stable_hash(s), 3) == 2)
+        target = _shards(tmp_path, 3)
+        ShardedMessageRepository(target).save(_message(f"{moving}-m0", holder))
+        target.dispose()
+
+        code = shard_rebalance.main(["--from-count", "2", "--to-count", "3", "--template", _template(tmp_path)])
+
+        assert code == 1
+        assert moving in capsys.readouterr().err
+        shards = MessageShards(shard_urls(_template(tmp_path), 2))
+        assert [m.message_id for m in ShardedMessageRepository(shards).iter_by_session(moving)] == [f"{moving}-m{j}" for j in range(3)]
+        shards.dispose()
+        target = _shards(tmp_path, 3)
+        repo = ShardedMessageRepository(target)
+        assert list(repo.iter_by_session(moving)) == []
+        assert repo.get_session_stats(moving) is None
+        assert [m.message_id for m in repo.iter_by_session(holder)] == [f"{moving}-m0"]
+        target.dispose()
+
+    def test_archived_session_moves_with_its_archive_index(self, tmp_path):
+        moving = next(s for s in self.SESSIONS if jump_hash(stable_hash(s), 2) == 1)
+        archive = SessionArchive(str(tmp_path / "archive"), 1 << 20)
+        shards = _shards(tmp_path, 1)
+        repo = ShardedMessageRepository(shards, archive=archive)
+        repo.save_many([_message(f"{moving}-m{j}", moving, j) for j in range(3)])
+        db = shards.session(0)
+        assert archive_session(db, archive, moving, START) == 3
+        db.close()
+        repo.save(_message(f"{moving}-hot", moving, 10))
+        shards.dispose()
+
+        report = shard_rebalance.rebalance(shard_urls(_template(tmp_path), 1), shard_urls(_template(tmp_path), 2), archive=archive)
+
+        assert (report.sessions_moved, report.messages_moved) == (1, 4)
+        shards = MessageShards(shard_urls(_template(tmp_path), 2))
+        repo = ShardedMessageRepository(shards, archive=archive)
+        expected = [f"{moving}-m{j}" for j in range(3)] + [f"{moving}-hot"]
+        assert [m.message_id for m in repo.get_page_by_session(moving, 10).messages] == expected
+        assert repo.get_session_stats(moving).message_count == 4
+        with pytest.raises(DuplicateMessageIdError):
+            repo.save(_message(f"{moving}-m0", moving))
+        db = shards.session(0)
+        assert db.execute(select(func.count()).select_from(ArchivedSessionModel)).scalar_one() == 0
+        assert db.execute(select(func.count()).select_from(ArchivedMessageIdModel)).scalar_one() == 0
+        db.close()
+        shards.dispose()
@@ -0,0 +1,230 @@
+import asyncio
+import threading
+import time
+import pytest
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.errors import DuplicateMessageIdError, WriteQueueFullError
+from app.domain.entities.message import Message
+from app.infrastructure.schema import init_db
+from app.infrastructure.message_repository_impl import SQLiteMessageRepository
+from app.infrastructure.write_behind import (
+    WriteBehindWriter,
+    WriteBehindMessageRepository,
+    AsyncWriteBehindMessageRepository,
+)
+from app.interfaces.api import messages_router, async_messages_router
+from test.test_constants import (
+    BASE_URL_MESSAGES,
+    FIELD_ERROR,
+    FIELD_CODE,
+    VALID_SENDER,
+    CONTENT_VALID,
+    STATUS_CREATED,
+    STATUS_CONFLICT,
+    STATUS_SERVICE_UNAVAILABLE,
+    ERROR_CODE_WRITE_QUEUE_FULL,
+    API_KEY_HEADER,
+)
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'write_behind.db'}", connect_args={"check_same_thread": False})
+    init_db(engine)
+    return sessionmaker(bind=engine)
+
+
+class CountingWriter(WriteBehindWriter):
+    """Writer that records the size of every group it commits."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.groups = []
+
+    def _flush(self, group):
+        self.groups.append(sum(len(messages) for messages, _ in group))
+        super()._flush(group)
+
+
+class TestWriteBehind:
+    """Integration tests for the group-commit write-behind mode."""
+
+    SESSION_ID = "wb1"
+    CONCURRENT_REQUESTS = 20
+    BATCH_SIZE = 50
+    MAX_DELAY_MS = 50
+
+    def _message(self, message_id):
+        return Message(message_id, self.SESSION_ID, CONTENT_VALID, datetime.now(timezone.utc), VALID_SENDER, None)
+
+    def test_concurrent_saves_share_transactions(self, session_factory):
+        writer = CountingWriter(session_factory, self.BATCH_SIZE, self.MAX_DELAY_MS, queue_depth=100)
+        results = {}
+
+        def post(index):
+            repo = WriteBehindMessageRepository(SQLiteMessageRepository(session_factory()), writer)
+            message_id = f"w{index % (self.CONCURRENT_REQUESTS // 2)}"
+            try:
+                results[index] = repo.save(self._message(message_id)).message_id
+            except DuplicateMessageIdError:
+                results[index] = None
+
+        threads = [threading.Thread(target=post, args=(i,)) for i in range(self.CONCURRENT_REQUESTS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.stop()
+
+        created = [message_id for message_id in results.values() if message_id]
+        assert sorted(created) == sorted(f"w{i}" for i in range(self.CONCURRENT_REQUESTS // 2))
+        assert sum(writer.groups) == self.CONCURRENT_REQUESTS
+        assert len(writer.groups) < self.CONCURRENT_REQUESTS
+        stored = SQLiteMessageRepository(session_factory()).get_by_session(self.SESSION_ID, 100, 0)
+        assert len(stored) == self.CONCURRENT_REQUESTS // 2
+
+    def test_save_many_and_reads_delegate(self, session_factory):
+        writer = WriteBehindWriter(session_factory, self.BATCH_SIZE, 0, queue_depth=10)
+        repo = WriteBehindMessageRepository(SQLiteMessageRepository(session_factory()), writer)
+
+        results = repo.save_many([self._message("a"), self._message("a"), self._message("b")])
+        writer.stop()
+
+        assert [r.message_id if r else None for r in results] == ["a", None, "b"]
+        assert repo.save_many([]) == []
+        assert [m.message_id for m in repo.get_by_session(self.SESSION_ID, 10, 0)] == ["a", "b"]
+        assert [m.message_id for m in repo.get_page_by_session(self.SESSION_ID, 1, 1).messages] == ["b"]
+        assert [m.message_id for m in repo.iter_by_session(self.SESSION_ID)] == ["a", "b"]
+        assert repo.get_session_stats(self.SESSION_ID).message_count == 2
+
+    def test_async_repository(self, session_factory):
+        writer = WriteBehindWriter(session_factory, self.BATCH_SIZE, 0, queue_depth=10)
+
+        class InnerAsync:
+            async def get_by_session(self, *args):
+                return SQLiteMessageRepository(session_factory()).get_by_session(*args)
+
+            async def get_page_by_session(self, *args):
+                return SQLiteMessageRepository(session_factory()).get_page_by_session(*args)
+
+            async def get_session_stats(self, *args):
+                return SQLiteMessageRepository(session_factory()).get_session_stats(*args)
+
+            async def iter_by_session(self, *args):
+                for message in SQLiteMessageRepository(session_factory()).iter_by_session(*args):
+                    yield message
+
+        repo = AsyncWriteBehindMessageRepository(InnerAsync(), writer)
+
+        async def scenario():
+            saved = await repo.save(self._message("x"))
+            with pytest.raises(DuplicateMessageIdError):
+                await repo.save(self._message("x"))
+            many = await repo.save_many([self._message("y")])
+            empty = await repo.save_many([])
+            listed = await repo.get_by_session(self.SESSION_ID, 10, 0)
+            page = await repo.get_page_by_session(self.SESSION_ID, 1)
+            exported = [m async for m in repo.iter_by_session(self.SESSION_ID)]
+            assert (await repo.get_session_stats(self.SESSION_ID)).message_count == 2
+            return saved, many, empty, listed, page, exported
+
+        loop = asyncio.new_event_loop()
+        saved, many, empty, listed, page, exported = loop.run_until_complete(scenario())
+        loop.close()
+        writer.stop()
+
+        assert saved.message_id == "x"
+        assert [m.message_id for m in many] == ["y"]
+        assert empty == []
+        assert [m.message_id for m in listed] == ["x", "y"]
+        assert page.next_cursor is not None
+        assert exported == listed
+
+    def test_queue_full_and_flush_errors(self, session_factory):
+        release = threading.Event()
+
+        def blocked_factory():
+            release.wait()
+            raise RuntimeError("database unavailable")
+
+        writer = WriteBehindWriter(blocked_factory, 1, 0, queue_depth=1)
+        in_flight = writer.submit([self._message("q1")])
+        while writer._queue.qsize():
+            time.sleep(0.001)
+        writer.submit([self._message("q2")])
+        with pytest.raises(WriteQueueFullError):
+            writer.submit([self._message("q3")])
+
+        release.set()
+        writer.stop()
+        with pytest.raises(RuntimeError):
+            in_flight.result()
+
+    def test_stop_flushes_pending_group(self, session_factory):
+        writer = WriteBehindWriter(session_factory, self.BATCH_SIZE, max_delay_ms=60000, queue_depth=10)
+        pending = writer.submit([self._message("s1")])
+
+        writer.stop()
+
+        assert [m.message_id for m in pending.result(timeout=0)] == ["s1"]
+
+    def test_stop_gives_up_on_a_stalled_writer(self, session_factory):
+        release = threading.Event()
+
+        def stalled_factory():
+            release.wait()
+            return session_factory()
+
+        writer = WriteBehindWriter(stalled_factory, 1, 0, queue_depth=1)
+        in_flight = writer.submit([self._message("h1")])
+        while writer._queue.qsize():
+            time.sleep(0.001)
+        queued = writer.submit([self._message("h2")])
+
+        started = time.monotonic()
+        writer.stop(timeout=0.1)
+
+        assert time.monotonic() - started < 1
+        with pytest.raises(WriteQueueFullError):
+            queued.result(timeout=0)
+        release.set()
+        assert [m.message_id for m in in_flight.result(timeout=5)] == ["h1"]
+
+    def test_async_router_wraps_repository_when_enabled(self, monkeypatch):
+        monkeypatch.setattr(async_messages_router.settings, "WRITE_BEHIND_ENABLED", True)
+        service = async_messages_router.get_service(db=None)
+        assert isinstance(service.repository, AsyncWriteBehindMessageRepository)
+
+    def test_api_uses_write_behind_when_enabled(self, session_factory, monkeypatch):
+        writer = WriteBehindWriter(session_factory, self.BATCH_SIZE, 0, queue_depth=10)
+        monkeypatch.setattr(messages_router.settings, "WRITE_BEHIND_ENABLED", True)
+        monkeypatch.setattr(messages_router, "write_behind_writer", writer)
+        client = TestClient(app)
+        payload = {"message_id": "api-wb", "session_id": self.SESSION_ID, "content": CONTENT_VALID, "sender": VALID_SENDER}
+
+        first = client.post(BASE_URL_MESSAGES, json=payload, headers=API_KEY_HEADER)
+        second = client.post(BASE_URL_MESSAGES, json=payload, headers=API_KEY_HEADER)
+        writer.stop()
+
+        assert first.status_code == STATUS_CREATED
+        assert second.status_code == STATUS_CONFLICT
+        stored = SQLiteMessageRepository(session_factory()).get_by_session(self.SESSION_ID, 10, 0)
+        assert [m.message_id for m in stored] == ["api-wb"]
+
+    def test_queue_full_maps_to_503(self, monkeypatch):
+        class FullWriter:
+            def submit(self, messages):
+                raise WriteQueueFullError()
+
+        monkeypatch.setattr(messages_router.settings, "WRITE_BEHIND_ENABLED", True)
+        monkeypatch.setattr(messages_router, "write_behind_writer", FullWriter())
+        payload = {"message_id": "api-full", "session_id": self.SESSION_ID, "content": CONTENT_VALID, "sender": VALID_SENDER}
+
+        response = TestClient(app).post(BASE_URL_MESSAGES, json=payload, headers=API_KEY_HEADER)
+
+        assert response.status_code == STATUS_SERVICE_UNAVAILABLE
+        assert response.json()[FIELD_ERROR][FIELD_CODE] == ERROR_CODE_WRITE_QUEUE_FULL
@@ -4,6 +4,7 @@ load_dotenv()
 
 # --- ENDPOINTS ---
 BASE_URL_MESSAGES = "/api/messages"
+BASE_URL_MESSAGES_BATCH = "/api/messages/batch"
 
 # --- JSON FIELDS---
 FIELD_STATUS = "status" 
@@ -39,6 +40,7 @@ STATUS_OK = 200
 STATUS_UNAUTHORIZED = 401
 STATUS_FORBIDDEN = 403
 STATUS_TOO_MANY_REQUESTS = 429
+STATUS_SERVICE_UNAVAILABLE = 503
 
 # --- BUSSINES ERRORS ---
 ERROR_CODE_INVALID_SENDER = "INVALID_SENDER"
@@ -48,9 +50,16 @@ ERROR_CODE_DUPLICATE_MESSAGE_ID = "DUPLICATE_MESSAGE_ID"
 ERROR_CODE_SERVER = "SERVER_ERROR"
 ERROR_CODE_UNAUTHORIZED = "UNAUTHORIZED"
 ERROR_CODE_RATE_LIMIT = "RATE_LIMIT_EXCEEDED"
+ERROR_CODE_INVALID_CURSOR = "INVALID_CURSOR"
+ERROR_CODE_WRITE_QUEUE_FULL = "WRITE_QUEUE_FULL"
+
+# --- BATCH STATUS ---
+BATCH_STATUS_CREATED = "created"
+BATCH_STATUS_REJECTED = "rejected"
 
 # --- GENERIC ERROR MESSAGES ---
 GENERIC_SERVER_ERROR_MESSAGE = "Unexpected error while processing request"
+RETRY_AFTER_HEADER = "retry-after"
 ERROR_DETAIL_RATE_LIMIT = "Too many requests in a short period. Please try again later."
 
 # --- STATUS RESPONSES ---
@@ -63,6 +72,25 @@ METADATA_WORD_COUNT_FIELD = "word_count"  # usado para validar metadata
 CONTENT_WITH_BADWORD = "hello badword"
 FILTERED_WORD_REPLACEMENT = "***"
 
+# --- PAGINATION ---
+NEXT_CURSOR_HEADER = "x-next-cursor"
+ETAG_HEADER = "etag"
+IF_NONE_MATCH_HEADER = "if-none-match"
+STATUS_NOT_MODIFIED = 304
+
+# --- EXPORT ---
+EXPORT_PATH_SUFFIX = "export"
+STATS_PATH_SUFFIX = "stats"
+WS_PATH_SUFFIX = "ws"
+STREAM_PATH_SUFFIX = "stream"
+MEDIA_TYPE_NDJSON = "application/x-ndjson"
+MEDIA_TYPE_JSON = "application/json"
+MEDIA_TYPE_MSGPACK = "application/msgpack"
+
+# --- METRICS ---
+METRICS_URL = "/metrics"
+
 # --- AUTH ---
 API_KEY = os.getenv("API_KEY")
-API_KEY_HEADER = {"x-api-key": API_KEY}
\ No newline at end of file
+API_KEY_HEADER_NAME = "x-api-key"
+API_KEY_HEADER = {API_KEY_HEADER_NAME: API_KEY}
\ No newline at end of file
@@ -0,0 +1,151 @@
+import os
+import signal
+import time
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.core import auth
+from app.core.api_keys import ApiKeyRegistry, hash_api_key, load_api_keys
+from app.core.config import Settings
+from app.core.errors import init_error_handlers
+from app.domain.entities.tenant import Tenant
+from test.test_constants import API_KEY_HEADER_NAME, STATUS_OK, STATUS_UNAUTHORIZED
+
+
+def _line(api_key, tenant_id, tier=""):
+    return f"{hash_api_key(api_key).hex()} {tenant_id} {tier}\n"
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+class TestLoadApiKeys:
+    """Unit tests for the key file format."""
+
+    def test_parses_digests_tenants_tiers_and_comments(self, tmp_path):
+        path = tmp_path / "keys.txt"
+        path.write_text("# tenants\n\n" + _line("k1", "acme", "gold") + _line("k2", "globex") + "  # trailing\n")
+
+        tenants = load_api_keys(str(path))
+
+        assert tenants == {hash_api_key("k1"): Tenant("acme", "gold"), hash_api_key("k2"): Tenant("globex")}
+
+    @pytest.mark.parametrize("line", ["abc acme\n", "z" * 64 + " acme\n", _line("k1", "acme", "gold extra")])
+    def test_rejects_malformed_lines(self, tmp_path, line):
+        path = tmp_path / "keys.txt"
+        path.write_text(line)
+
+        with pytest.raises(ValueError, match=":1:"):
+            load_api_keys(str(path))
+
+
+class TestApiKeyRegistry:
+    """Lookup, rotation and background refresh of the key registry."""
+
+    STATIC_KEY = "built-in"
+
+    def _registry(self, path, refresh_seconds=30.0):
+        return ApiKeyRegistry(str(path), {self.STATIC_KEY: Tenant("default")}, refresh_seconds)
+
+    def test_resolves_static_and_file_keys(self, tmp_path):
+        path = tmp_path / "keys.txt"
+        path.write_text(_line("k1", "acme", "gold"))
+        registry = self._registry(path)
+
+        assert registry.resolve(self.STATIC_KEY) == Tenant("default")
+        assert registry.resolve("k1") == Tenant("acme", "gold")
+        assert registry.resolve("unknown") is None
+        assert registry.resolve(None) is None
+        assert len(registry) == 2
+
+    def test_reload_only_when_the_file_changed(self, tmp_path):
+        path = tmp_path / "keys.txt"
+        path.write_text(_line("k1", "acme"))
+        registry = self._registry(path)
+
+        assert registry.reload() is False
+        path.write_text(_line("k2", "acme") + _line("k3", "globex"))
+
+        assert registry.reload() is True
+        assert registry.resolve("k1") is None
+        assert registry.resolve("k2") == Tenant("acme")
+        assert registry.resolve(self.STATIC_KEY) == Tenant("default")
+        assert ApiKeyRegistry().reload() is False
+
+    def test_background_refresh_picks_up_rotation_and_survives_broken_files(self, tmp_path):
+        path = tmp_path / "keys.txt"
+        path.write_text(_line("k1", "acme"))
+        registry = self._registry(path, refresh_seconds=0.01)
+        registry.start()
+        registry.start()
+        try:
+            path.write_text("broken\n")
+            time.sleep(0.05)
+            assert registry.resolve("k1") == Tenant("acme")
+
+            path.write_text(_line("k2", "acme"))
+            _wait_for(lambda: registry.resolve("k2") is not None)
+            assert registry.resolve("k1") is None
+        finally:
+            registry.stop()
+        registry.stop()
+
+    def test_sighup_forces_a_reload(self, tmp_path):
+        path = tmp_path / "keys.txt"
+        path.write_text(_line("k1", "acme"))
+        registry = self._registry(path, refresh_seconds=3600)
+        previous = signal.getsignal(signal.SIGHUP)
+        registry.start()
+        try:
+            path.write_text(_line("k2", "globex"))
+            os.kill(os.getpid(), signal.SIGHUP)
+            _wait_for(lambda: registry.resolve("k2") is not None)
+        finally:
+            registry.stop()
+            signal.signal(signal.SIGHUP, previous)
+
+    def test_start_without_a_key_file_is_a_no_op(self):
+        registry = ApiKeyRegistry(static_keys={self.STATIC_KEY: Tenant("default")})
+        registry.start()
+
+        assert registry._thread is None
+        assert registry.resolve(self.STATIC_KEY) == Tenant("default")
+
+
+class TestVerifyApiKey:
+    """verify_api_key resolves the tenant and attaches it to the request."""
+
+    def test_tenant_is_attached_to_request_state(self, monkeypatch):
+        monkeypatch.setattr(auth, "api_key_registry", ApiKeyRegistry(static_keys={"k1": Tenant("acme", "gold")}))
+        app = FastAPI()
+        init_error_handlers(app)
+
+        @app.get("/whoami", dependencies=[Depends(auth.verify_api_key)])
+        async def whoami(request: Request):
+            return {"tenant": request.state.tenant.tenant_id}
+
+        client = TestClient(app)
+        response = client.get("/whoami", headers={API_KEY_HEADER_NAME: "k1"})
+        unknown = client.get("/whoami", headers={API_KEY_HEADER_NAME: "k2"})
+
+        assert response.status_code == STATUS_OK
+        assert response.json() == {"tenant": "acme"}
+        assert unknown.status_code == STATUS_UNAUTHORIZED
+
+
+class TestKeySourceRequired:
+    """Settings refuse to load without any API key source, as the baseline required API_KEY."""
+
+    def test_missing_key_sources_fail_at_startup(self, monkeypatch):
+        monkeypatch.delenv("API_KEY", raising=False)
+        monkeypatch.delenv("API_KEYS_FILE", raising=False)
+        with pytest.raises(ValidationError, match="API_KEY or API_KEYS_FILE"):
+            Settings(_env_file=None)
+        assert Settings(_env_file=None, API_KEYS_FILE="keys.txt").API_KEY is None
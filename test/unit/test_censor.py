@@ -0,0 +1,59 @@
+import pytest
+from app.application.services.censor import CensorEngine, load_banned_words
+from app.application.services.message_service import MessageService
+from app.application.services.async_message_service import AsyncMessageService
+from app.core.constants import CENSOR_SIMPLE_MAX_WORDS
+from test.test_constants import FILTERED_WORD_REPLACEMENT
+
+
+class TestCensorEngine:
+    """Unit tests for the single-pass censoring engine."""
+
+    WORDS = ["badword", "bad", "offensive", "dummy", "very bad idea"]
+
+    @pytest.mark.parametrize("text,expected", [
+        ("hello badword", "hello ***"),
+        ("Hello BadWord!", "Hello ***!"),
+        ("bad, badword and badwords", "***, *** and badwords"),
+        ("that is a VERY BAD IDEA.", "that is a ***."),
+        ("Nothing To Hide", "Nothing To Hide"),
+    ])
+    def test_whole_words_preserve_case_of_the_rest(self, text, expected):
+        engine = CensorEngine(self.WORDS, FILTERED_WORD_REPLACEMENT, whole_words=True)
+        assert engine.censor(text) == expected
+
+    def test_substring_mode_is_the_default(self):
+        engine = CensorEngine(self.WORDS, FILTERED_WORD_REPLACEMENT)
+        assert engine.censor("badwords and dummyish") == "***s and ***ish"
+
+    @pytest.mark.parametrize("whole_words", [False, True])
+    def test_simple_path_masks_what_the_regex_masks(self, whole_words):
+        engine = CensorEngine(self.WORDS + ["a.b", "word_"], FILTERED_WORD_REPLACEMENT, whole_words=whole_words)
+        assert engine.simple
+        for text in ["Bad badword BADWORDS very bad idea, a.b axb", "xbad_ bad-word word_ badbad", "very bad ideas dummy!"]:
+            assert engine.censor(text) == engine.pattern.sub(FILTERED_WORD_REPLACEMENT, text)
+
+    def test_long_blocklists_use_the_regex(self):
+        words = [f"word{i}" for i in range(CENSOR_SIMPLE_MAX_WORDS + 1)]
+        assert not CensorEngine(words).simple
+        assert CensorEngine(words, FILTERED_WORD_REPLACEMENT).censor("a Word0 b") == "a *** b"
+
+    def test_special_characters_are_literal(self):
+        engine = CensorEngine(["a.b", "c++"], FILTERED_WORD_REPLACEMENT, whole_words=False)
+        assert engine.censor("axb a.b c++") == "axb *** ***"
+
+    def test_empty_blocklist_returns_text_unchanged(self):
+        engine = CensorEngine(["", "  "])
+        assert engine.pattern is None
+        assert engine.censor("Anything Goes") == "Anything Goes"
+
+    def test_load_banned_words_from_file(self, tmp_path):
+        path = tmp_path / "blocklist.txt"
+        path.write_text("# comment\nfoo\n\n  bar baz  \n", encoding="utf-8")
+        assert load_banned_words(str(path)) == ["foo", "bar baz"]
+        assert "badword" in load_banned_words()
+
+    @pytest.mark.parametrize("service_class", [MessageService, AsyncMessageService])
+    def test_service_uses_injected_engine(self, service_class):
+        service = service_class(repository=None, censor=CensorEngine(["secret"], FILTERED_WORD_REPLACEMENT))
+        assert service._filter_content("my Secret plan") == "my *** plan"
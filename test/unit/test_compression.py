@@ -0,0 +1,39 @@
+import string
+import zlib
+
+import pytest
+
+from app.core.config import settings
+from app.core.constants import CONTENT_COMPRESSION_MARKER
+from app.infrastructure.compression import compress_content, decompress_content
+
+
+@pytest.fixture
+def compression(monkeypatch):
+    monkeypatch.setattr(settings, "CONTENT_COMPRESSION_ENABLED", True)
+    monkeypatch.setattr(settings, "CONTENT_COMPRESSION_MIN_BYTES", 64)
+
+
+class TestContentCompression:
+    """Unit tests for the stored form of message bodies."""
+
+    LARGE = "tool output line\n" * 20
+    SMALL = "hello"
+
+    def test_disabled_stores_text(self):
+        assert compress_content(self.LARGE) == self.LARGE
+
+    def test_large_bodies_are_compressed_with_marker(self, compression):
+        stored = compress_content(self.LARGE)
+        assert stored.startswith(CONTENT_COMPRESSION_MARKER)
+        assert zlib.decompress(stored[len(CONTENT_COMPRESSION_MARKER):]).decode() == self.LARGE
+        assert decompress_content(stored) == self.LARGE
+
+    def test_small_or_incompressible_bodies_stay_text(self, compression):
+        incompressible = string.ascii_letters + string.digits + "+/"
+        assert compress_content(self.SMALL) == self.SMALL
+        assert compress_content(incompressible) == incompressible
+
+    @pytest.mark.parametrize("value,expected", [("plain", "plain"), (b"plain", "plain"), (None, None)])
+    def test_plain_values_are_returned_as_text(self, value, expected):
+        assert decompress_content(value) == expected
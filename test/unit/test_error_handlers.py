@@ -2,7 +2,6 @@ import uuid
 import pytest
 from fastapi import HTTPException,Request
 from fastapi.testclient import TestClient
-from slowapi.errors import RateLimitExceeded
 from app.main import app
 from app.core.errors import MissingFieldError
 from test.test_constants import (
@@ -30,6 +29,7 @@ from test.test_constants import (
     INVALID_SENDER,
     GENERIC_SERVER_ERROR_MESSAGE,
     ERROR_DETAIL_RATE_LIMIT,
+    RETRY_AFTER_HEADER,
     API_KEY_HEADER,
 )
 
@@ -43,6 +43,7 @@ class TestErrorHandlers:
     TEST_FORCE_ERROR_ENDPOINT = "/force-error"
     TEST_FORCE_HTTP_EXCEPTION_ENDPOINT = "/force-http-exception"
     TEST_FORCE_RATE_LIMIT_ENDPOINT = "/force-rate-limit"
+    RETRY_AFTER_SECONDS = 20
     SESSION_ID_INVALID = "no-exist"
     SESSION_ID_VALID = "s1"
     FIELD_NAME_MISSING = "session_id"
@@ -142,17 +143,14 @@ class TestErrorHandlers:
         assert response.status_code == STATUS_FORBIDDEN
 
     def test_rate_limit_exceeded_handler(self):
-        """Should handle RateLimitExceeded with structured 429 error."""
-        from app.core.errors import init_error_handlers
+        """Should handle RateLimitExceededError with structured 429 error and a Retry-After header."""
+        from app.core.errors import init_error_handlers, RateLimitExceededError
         import asyncio, json
         init_error_handlers(app)
 
-        class MockLimit:
-            error_message = ERROR_DETAIL_RATE_LIMIT
-
-        exc = RateLimitExceeded(MockLimit())
+        exc = RateLimitExceededError(retry_after=self.RETRY_AFTER_SECONDS)
         mock_request = Request({"type": "http"})
-        handler = app.exception_handlers[RateLimitExceeded]
+        handler = app.exception_handlers[RateLimitExceededError]
 
         async def run_handler(handler, mock_request, exc):
             return await handler(mock_request, exc)
@@ -165,4 +163,5 @@ class TestErrorHandlers:
         data = json.loads(response.body.decode())
         assert data[FIELD_STATUS] == "error"  # o STATUS_ERROR_RESPONSE si la tienes
         assert data[FIELD_ERROR][FIELD_CODE] == ERROR_CODE_RATE_LIMIT
-        assert ERROR_DETAIL_RATE_LIMIT in data[FIELD_ERROR][FIELD_DETAILS]
\ No newline at end of file
+        assert ERROR_DETAIL_RATE_LIMIT in data[FIELD_ERROR][FIELD_DETAILS]
+        assert response.headers[RETRY_AFTER_HEADER] == str(self.RETRY_AFTER_SECONDS)
\ No newline at end of file
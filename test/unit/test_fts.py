@@ -0,0 +1,25 @@
+import pytest
+from app.infrastructure.fts import to_fts_query
+
+
+class TestFtsQuery:
+    """Unit tests for the translation of search strings into FTS5 MATCH expressions."""
+
+    CASES = [
+        ("hello", '"hello"'),
+        ("hello world", '"hello" "world"'),
+        ("hel*", '"hel"*'),
+        ('"hello world"', '"hello world"'),
+        ('"exact phrase" other*', '"exact phrase" "other"*'),
+        ("content:hello OR NEAR(x)", '"content:hello" "OR" "NEAR(x)"'),
+        ('say"hi', '"say""hi"'),
+    ]
+    EMPTY_QUERIES = ["", "   ", "!!! ???", '""', "*"]
+
+    @pytest.mark.parametrize("text,expected", CASES)
+    def test_translates_terms(self, text, expected):
+        assert to_fts_query(text) == expected
+
+    @pytest.mark.parametrize("text", EMPTY_QUERIES)
+    def test_nothing_searchable_returns_none(self, text):
+        assert to_fts_query(text) is None
@@ -1,32 +1,210 @@
-from app.core.limiter import DummyLimiter
+import multiprocessing
 
-class TestDummyLimiter:
-    """Unit tests for DummyLimiter behavior in test environment."""
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
 
-    TEST_RATE = "3/minute"
-    EXPECTED_RETURN = "ok"
-    SAMPLE_KEYWORD_VALUE = "sample"
-    ASSERT_MESSAGE_ORIGINAL_RESULT = "The decorated function should return its original result."
+from app.core.errors import RateLimitExceededError, init_error_handlers
+from app.domain.entities.tenant import Tenant
+from app.core.limiter import (
+    InMemoryBucketStore,
+    Rate,
+    RateLimitPolicy,
+    SharedMemoryBucketStore,
+    TokenBucketLimiter,
+    build_store,
+)
+from test.test_constants import (
+    API_KEY_HEADER_NAME,
+    RETRY_AFTER_HEADER,
+    STATUS_OK,
+    STATUS_TOO_MANY_REQUESTS,
+)
 
-    def test_limit_decorator_returns_function(self):
-        """Should return the original function when decorated."""
-        limiter = DummyLimiter()
 
-        @limiter.limit(self.TEST_RATE)
-        def sample_function():
-            return self.EXPECTED_RETURN
+class FakeClock:
+    """Manually advanced clock for refill tests."""
+    def __init__(self):
+        self.now = 1000.0
 
-        result = sample_function()
-        assert result == self.EXPECTED_RETURN, self.ASSERT_MESSAGE_ORIGINAL_RESULT
+    def __call__(self):
+        return self.now
 
-    def test_any_method_returns_none(self):
-        """Should return None for any undefined method accessed dynamically."""
-        limiter = DummyLimiter()
 
-        random_method_1 = limiter.any_random_name
-        random_method_2 = limiter.another_random_method
+def _drain(path, slots, key, rate, attempts, results):
+    """Worker process: count the tokens obtained from a shared store."""
+    store = SharedMemoryBucketStore(path, slots)
+    results.put(sum(1 for _ in range(attempts) if store.take(key, rate) == 0))
+    store.close()
 
-        assert callable(random_method_1)
-        assert callable(random_method_2)
-        assert random_method_1() is None
-        assert random_method_2(123, key=self.SAMPLE_KEYWORD_VALUE) is None
+
+class TestRate:
+    """Unit tests for rate limit parsing."""
+
+    def test_parse_count_and_period(self):
+        assert Rate.parse("3/minute") == Rate(capacity=3, per_second=3 / 60)
+        assert Rate.parse("600/hour;burst=50") == Rate(capacity=50, per_second=600 / 3600)
+
+    def test_parse_rejects_invalid_text(self):
+        with pytest.raises(ValueError):
+            Rate.parse("3 per minute")
+
+
+class TestBucketStores:
+    """Token accounting of the in-memory and shared bucket stores."""
+
+    RATE = Rate(capacity=2, per_second=0.5)
+    KEY = "post_message:k1"
+    OTHER_KEY = "post_message:k2"
+
+    def _stores(self, tmp_path, clock):
+        return [
+            InMemoryBucketStore(clock=clock),
+            SharedMemoryBucketStore(str(tmp_path / "buckets.bin"), slots=64, clock=clock),
+        ]
+
+    def test_burst_then_wait_then_refill(self, tmp_path):
+        clock = FakeClock()
+        for store in self._stores(tmp_path, clock):
+            assert [store.take(self.KEY, self.RATE) for _ in range(2)] == [0, 0]
+            assert store.take(self.KEY, self.RATE) == pytest.approx(2.0)
+            assert store.take(self.OTHER_KEY, self.RATE) == 0
+
+            clock.now += 2.0
+            assert store.take(self.KEY, self.RATE) == 0
+            assert store.take(self.KEY, self.RATE) > 0
+
+            clock.now += 3600
+            assert [store.take(self.KEY, self.RATE) for _ in range(3)][:2] == [0, 0]
+
+    def test_clock_going_backwards_refills_nothing(self, tmp_path):
+        clock = FakeClock()
+        for store in self._stores(tmp_path / "backwards", clock):
+            store.take(self.KEY, self.RATE)
+            store.take(self.KEY, self.RATE)
+            clock.now -= 100
+            assert store.take(self.KEY, self.RATE) > 0
+            clock.now += 100
+
+    def test_shared_store_is_seen_by_every_handle(self, tmp_path):
+        path = str(tmp_path / "shared.bin")
+        first = SharedMemoryBucketStore(path, slots=64)
+        second = SharedMemoryBucketStore(path, slots=64)
+
+        assert first.take(self.KEY, self.RATE) == 0
+        assert second.take(self.KEY, self.RATE) == 0
+        assert first.take(self.KEY, self.RATE) > 0
+        first.close()
+        second.close()
+
+    def test_shared_store_reuses_the_stalest_slot_when_full(self, tmp_path):
+        clock = FakeClock()
+        store = SharedMemoryBucketStore(str(tmp_path / "full.bin"), slots=2, clock=clock)
+        store.take(self.KEY, self.RATE)
+        store.take(self.KEY, self.RATE)
+        clock.now += 0.1
+        store.take(self.OTHER_KEY, self.RATE)
+        store.take("post_message:k3", self.RATE)
+
+        assert store.take(self.OTHER_KEY, self.RATE) == 0
+        assert store.take("post_message:k3", self.RATE) == 0
+        store.close()
+
+    def test_shared_store_limits_across_processes(self, tmp_path):
+        path = str(tmp_path / "workers.bin")
+        rate = Rate(capacity=50, per_second=1e-9)
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [context.Process(target=_drain, args=(path, 64, self.KEY, rate, 40, results)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        granted = sum(results.get(timeout=30) for _ in workers)
+        for worker in workers:
+            worker.join()
+
+        assert granted == 50
+
+    def test_build_store_selects_backend(self, tmp_path):
+        shared = build_store("shared", str(tmp_path / "nested" / "b.bin"), 16)
+
+        assert isinstance(build_store("memory", "", 16), InMemoryBucketStore)
+        assert isinstance(shared, SharedMemoryBucketStore)
+        shared.close()
+
+
+class TestRateLimitPolicy:
+    """Unit tests for per-key and per-tier limit resolution."""
+
+    DEFAULTS = {"post_message": "3/minute", "post_batch": "30/minute"}
+
+    def test_tiers_override_defaults_per_scope(self):
+        policy = RateLimitPolicy(
+            self.DEFAULTS,
+            tiers={"default": {"post_batch": "10/minute"}, "gold": {"post_message": "600/minute"}},
+            key_tiers={"gold-key": "gold", "lost-key": "missing"},
+        )
+
+        assert policy.rate_for("gold-key", "post_message") == Rate.parse("600/minute")
+        assert policy.rate_for("gold-key", "post_batch") == Rate.parse("10/minute")
+        assert policy.rate_for("other", "post_message") == Rate.parse("3/minute")
+        assert policy.rate_for("lost-key", "post_batch") == Rate.parse("10/minute")
+        assert policy.rate_for(None, "post_message") == Rate.parse("3/minute")
+
+
+class TestTokenBucketLimiter:
+    """The limiter dependency answers 429 with Retry-After once a key's bucket is empty."""
+
+    SCOPE = "post_message"
+
+    def _client(self, limiter):
+        app = FastAPI()
+        init_error_handlers(app)
+
+        @app.post("/limited", dependencies=[Depends(limiter.limit(self.SCOPE))])
+        async def limited():
+            return {"ok": True}
+
+        return TestClient(app)
+
+    def test_buckets_are_per_api_key(self):
+        limiter = TokenBucketLimiter(InMemoryBucketStore(), RateLimitPolicy({self.SCOPE: "2/minute"}, {}, {}))
+        client = self._client(limiter)
+
+        codes = [client.post("/limited", headers={API_KEY_HEADER_NAME: "k1"}).status_code for _ in range(2)]
+        rejected = client.post("/limited", headers={API_KEY_HEADER_NAME: "k1"})
+        other = client.post("/limited", headers={API_KEY_HEADER_NAME: "k2"})
+
+        assert codes == [STATUS_OK, STATUS_OK]
+        assert rejected.status_code == STATUS_TOO_MANY_REQUESTS
+        assert rejected.headers[RETRY_AFTER_HEADER] == "30"
+        assert other.status_code == STATUS_OK
+
+    def test_authenticated_requests_draw_from_the_tenant_bucket_at_its_tier(self):
+        limiter = TokenBucketLimiter(
+            InMemoryBucketStore(),
+            RateLimitPolicy({self.SCOPE: "1/minute"}, {"gold": {self.SCOPE: "2/minute"}}, {}),
+        )
+        app = FastAPI()
+        init_error_handlers(app)
+
+        async def authenticate(request: Request):
+            request.state.tenant = Tenant("acme", "gold")
+
+        @app.post("/limited", dependencies=[Depends(authenticate), Depends(limiter.limit(self.SCOPE))])
+        async def limited():
+            return {"ok": True}
+
+        client = TestClient(app)
+        codes = [client.post("/limited", headers={API_KEY_HEADER_NAME: f"k{i}"}).status_code for i in range(3)]
+
+        assert codes == [STATUS_OK, STATUS_OK, STATUS_TOO_MANY_REQUESTS]
+
+    def test_disabled_limiter_lets_everything_through(self):
+        limiter = TokenBucketLimiter(InMemoryBucketStore(), RateLimitPolicy({self.SCOPE: "1/minute"}, {}, {}), enabled=False)
+
+        limiter.check("k1", self.SCOPE)
+        limiter.check("k1", self.SCOPE)
+        limiter.enabled = True
+        limiter.check("k1", self.SCOPE)
+        with pytest.raises(RateLimitExceededError):
+            limiter.check("k1", self.SCOPE)
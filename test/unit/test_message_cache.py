@@ -0,0 +1,90 @@
+from app.domain.entities.message_page import MessagePage
+from app.infrastructure.message_cache_impl import InMemoryMessageCache
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestInMemoryMessageCache:
+    """Unit tests for the in-process LRU + TTL message cache."""
+
+    SESSION_A = "sa"
+    SESSION_B = "sb"
+    TTL_SECONDS = 5
+
+    def _put(self, cache, session_id, key):
+        page = MessagePage(next_cursor=key)
+        cache.put(session_id, key, page, cache.generation(session_id))
+        return page
+
+    def test_hit_and_miss_are_counted(self):
+        cache = InMemoryMessageCache(max_entries=10, ttl_seconds=self.TTL_SECONDS)
+        page = self._put(cache, self.SESSION_A, "k1")
+
+        assert cache.get(self.SESSION_A, "k1") is page
+        assert cache.get(self.SESSION_A, "k2") is None
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = InMemoryMessageCache(max_entries=2, ttl_seconds=self.TTL_SECONDS)
+        self._put(cache, self.SESSION_A, "k1")
+        self._put(cache, self.SESSION_A, "k2")
+        cache.get(self.SESSION_A, "k1")
+        self._put(cache, self.SESSION_B, "k3")
+
+        assert cache.get(self.SESSION_A, "k2") is None
+        assert cache.get(self.SESSION_A, "k1") is not None
+        assert cache.stats().evictions == 1
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = InMemoryMessageCache(max_entries=10, ttl_seconds=self.TTL_SECONDS, clock=clock)
+        self._put(cache, self.SESSION_A, "k1")
+
+        clock.now = self.TTL_SECONDS
+        assert cache.get(self.SESSION_A, "k1") is None
+        stats = cache.stats()
+        assert (stats.evictions, stats.size) == (1, 0)
+
+    def test_invalidate_session_only_drops_that_session(self):
+        cache = InMemoryMessageCache(max_entries=10, ttl_seconds=self.TTL_SECONDS)
+        self._put(cache, self.SESSION_A, "k1")
+        self._put(cache, self.SESSION_A, "k2")
+        self._put(cache, self.SESSION_B, "k3")
+
+        cache.invalidate_session(self.SESSION_A)
+
+        assert cache.get(self.SESSION_A, "k1") is None
+        assert cache.get(self.SESSION_B, "k3") is not None
+        assert cache.stats().invalidations == 2
+
+    def test_put_after_invalidation_is_discarded(self):
+        """A page read before a write landed must not be cached after that write's invalidation."""
+        cache = InMemoryMessageCache(max_entries=10, ttl_seconds=self.TTL_SECONDS)
+        generation = cache.generation(self.SESSION_A)
+        cache.invalidate_session(self.SESSION_A)
+
+        cache.put(self.SESSION_A, "k1", MessagePage(), generation)
+
+        assert cache.get(self.SESSION_A, "k1") is None
+
+    def test_replacing_a_key_keeps_a_single_entry(self):
+        cache = InMemoryMessageCache(max_entries=10, ttl_seconds=self.TTL_SECONDS)
+        self._put(cache, self.SESSION_A, "k1")
+        page = self._put(cache, self.SESSION_A, "k1")
+
+        assert cache.get(self.SESSION_A, "k1") is page
+        assert cache.stats().size == 1
+
+    def test_zero_capacity_disables_storage(self):
+        cache = InMemoryMessageCache(max_entries=0, ttl_seconds=self.TTL_SECONDS)
+        self._put(cache, self.SESSION_A, "k1")
+
+        assert cache.stats().size == 0
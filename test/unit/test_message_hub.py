@@ -0,0 +1,128 @@
+import asyncio
+import json
+import threading
+from datetime import datetime, timezone
+import pytest
+from app.core.errors import TooManySubscribersError
+from app.domain.entities.message import Message
+from app.infrastructure.message_hub_impl import InProcessMessageHub
+from app.interfaces.api.sse import iter_sse
+from test.test_constants import VALID_SENDER, CONTENT_SHORT, FIELD_MESSAGE_ID, FIELD_ERROR, FIELD_CODE
+
+
+class TestInProcessMessageHub:
+    """Unit tests for the in-process live-tail hub and its SSE encoding."""
+
+    SESSION_A = "ha"
+    SESSION_B = "hb"
+    BUFFER = 3
+    WAIT_SECONDS = 1.0
+
+    def _message(self, message_id, session_id=SESSION_A):
+        return Message(message_id, session_id, CONTENT_SHORT, datetime.now(timezone.utc), VALID_SENDER)
+
+    def _ids(self, batch):
+        return [message.message_id for message in batch]
+
+    def test_messages_reach_only_their_session(self):
+        async def scenario():
+            hub = InProcessMessageHub(self.BUFFER, max_subscribers=10)
+            a = hub.subscribe(self.SESSION_A)
+            b = hub.subscribe(self.SESSION_B)
+            hub.publish([self._message("h1"), self._message("h2", self.SESSION_B)])
+            return await a.get(self.WAIT_SECONDS), await b.get(self.WAIT_SECONDS), hub.stats()
+
+        batch_a, batch_b, stats = asyncio.run(scenario())
+
+        assert self._ids(batch_a) == ["h1"]
+        assert self._ids(batch_b) == ["h2"]
+        assert (stats.subscribers, stats.sessions, stats.published, stats.delivered) == (2, 2, 2, 2)
+
+    def test_publish_from_another_thread(self):
+        """Writes committed by threadpool workers are delivered on the subscriber's loop."""
+        async def scenario():
+            hub = InProcessMessageHub(self.BUFFER, max_subscribers=10)
+            subscription = hub.subscribe(self.SESSION_A)
+            writer = threading.Thread(target=hub.publish, args=([self._message("h3")],))
+            writer.start()
+            batch = await subscription.get(self.WAIT_SECONDS)
+            writer.join()
+            return batch
+
+        assert self._ids(asyncio.run(scenario())) == ["h3"]
+
+    def test_idle_get_times_out_empty(self):
+        async def scenario():
+            hub = InProcessMessageHub(self.BUFFER, max_subscribers=10)
+            return await hub.subscribe(self.SESSION_A).get(0.01)
+
+        assert asyncio.run(scenario()) == []
+
+    def test_slow_consumer_is_evicted(self):
+        async def scenario():
+            hub = InProcessMessageHub(self.BUFFER, max_subscribers=10)
+            subscription = hub.subscribe(self.SESSION_A)
+            for i in range(self.BUFFER + 1):
+                hub.publish([self._message(f"s{i}")])
+            await asyncio.sleep(0)
+            return subscription, await subscription.get(self.WAIT_SECONDS), hub.stats()
+
+        subscription, batch, stats = asyncio.run(scenario())
+
+        assert batch is None
+        assert subscription.evicted
+        assert (stats.subscribers, stats.sessions, stats.evictions) == (0, 0, 1)
+
+    def test_subscriber_limit(self):
+        async def scenario():
+            hub = InProcessMessageHub(self.BUFFER, max_subscribers=1)
+            first = hub.subscribe(self.SESSION_A)
+            with pytest.raises(TooManySubscribersError):
+                hub.subscribe(self.SESSION_B)
+            hub.unsubscribe(first)
+            hub.unsubscribe(first)
+            hub.subscribe(self.SESSION_B)
+            return hub.stats()
+
+        assert asyncio.run(scenario()).subscribers == 1
+
+    def test_sse_stream_events_and_slow_consumer_error(self):
+        async def scenario():
+            hub = InProcessMessageHub(1, max_subscribers=10)
+            stream = iter_sse(hub, self.SESSION_A, heartbeat_seconds=0.01)
+            opened = await stream.__anext__()
+            heartbeat = await stream.__anext__()
+            hub.publish([self._message("e1")])
+            event = await stream.__anext__()
+            hub.publish([self._message("e2"), self._message("e3")])
+            rest = [chunk async for chunk in stream]
+            return opened, heartbeat, event, rest, hub.stats()
+
+        opened, heartbeat, event, rest, stats = asyncio.run(scenario())
+
+        assert opened.startswith(b":") and heartbeat.startswith(b":")
+        name, data = event.decode().strip().split("\n")
+        assert name == "event: message"
+        assert json.loads(data.removeprefix("data: "))[FIELD_MESSAGE_ID] == "e1"
+        assert len(rest) == 1 and rest[0].startswith(b"event: error\n")
+        assert json.loads(rest[0].decode().strip().split("\n")[1].removeprefix("data: "))[FIELD_ERROR][FIELD_CODE] == "SLOW_CONSUMER"
+        assert stats.subscribers == 0
+
+    def test_sse_subscribes_only_while_the_body_runs(self):
+        async def scenario():
+            hub = InProcessMessageHub(self.BUFFER, max_subscribers=1)
+            never_iterated = iter_sse(hub, self.SESSION_A, heartbeat_seconds=0.01)
+            before = hub.stats().subscribers
+            stream = iter_sse(hub, self.SESSION_A, heartbeat_seconds=0.01)
+            await stream.__anext__()
+            full = hub.full()
+            refused = [chunk async for chunk in iter_sse(hub, self.SESSION_B, heartbeat_seconds=0.01)]
+            await stream.aclose()
+            del never_iterated
+            return before, full, refused, hub.stats().subscribers
+
+        before, full, refused, after = asyncio.run(scenario())
+
+        assert (before, full, after) == (0, True, 0)
+        assert len(refused) == 1 and refused[0].startswith(b"event: error\n")
+        assert json.loads(refused[0].decode().strip().split("\n")[1].removeprefix("data: "))[FIELD_ERROR][FIELD_CODE] == "TOO_MANY_SUBSCRIBERS"
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.domain.entities.message import Message
+from app.infrastructure import message_id_filter as message_id_filter_module
+from app.infrastructure.message_id_filter import MessageIdFilter
+from app.infrastructure.message_repository_impl import SQLiteMessageRepository
+from app.infrastructure.schema import init_db
+from test.test_constants import CONTENT_VALID, VALID_SENDER
+
+
+class TestMessageIdFilter:
+    """Unit tests for the message_id Bloom filter."""
+
+    CAPACITY = 10000
+    ERROR_RATE = 0.01
+
+    def test_sizing_follows_capacity_and_error_rate(self):
+        id_filter = MessageIdFilter(self.CAPACITY, self.ERROR_RATE)
+        stats = id_filter.stats()
+
+        # 1% at 10k ids: ~9.6 bits per id and 7 hash functions
+        assert id_filter.bit_count == 95851
+        assert stats.hash_count == 7
+        assert stats.memory_bytes == 11982
+        assert stats.items == 0 and stats.estimated_false_positive_rate == 0.0
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        id_filter = MessageIdFilter(self.CAPACITY, self.ERROR_RATE)
+        id_filter.add_many(f"stored-{i}" for i in range(self.CAPACITY))
+
+        assert all(id_filter.might_contain(f"stored-{i}") for i in range(self.CAPACITY))
+        false_positives = sum(id_filter.might_contain(f"new-{i}") for i in range(self.CAPACITY))
+        stats = id_filter.stats()
+
+        assert false_positives < 2 * self.ERROR_RATE * self.CAPACITY
+        assert stats.items == self.CAPACITY
+        assert stats.checks == 2 * self.CAPACITY
+        assert stats.probable_duplicates == self.CAPACITY + false_positives
+        assert stats.estimated_false_positive_rate == pytest.approx(self.ERROR_RATE, rel=0.2)
+
+    def test_build_loads_stored_ids_and_grows_capacity(self, tmp_path, monkeypatch):
+        """The filter is sized from a count, then ids are streamed batch by batch."""
+        monkeypatch.setattr(message_id_filter_module, "_BUILD_BATCH_SIZE", 7)
+        engine = create_engine(f"sqlite:///{tmp_path / 'filter.db'}")
+        init_db(engine)
+        db = sessionmaker(bind=engine)()
+        SQLiteMessageRepository(db).save_many([
+            Message(f"m{i}", "s1", CONTENT_VALID, datetime.now(timezone.utc), VALID_SENDER) for i in range(30)
+        ])
+        db.close()
+        id_filter = MessageIdFilter(10, self.ERROR_RATE)
+        id_filter.add("stale")
+        id_filter.record_false_positives()
+        batches = []
+        add_many = id_filter.add_many
+        monkeypatch.setattr(id_filter, "add_many", lambda ids: (batches.append(len(ids)), add_many(ids)))
+
+        assert id_filter.build([engine]) == 30
+        assert max(batches) == 7 and sum(batches) == 30
+        assert id_filter.capacity == 60
+        assert all(id_filter.might_contain(f"m{i}") for i in range(30))
+        stats = id_filter.stats()
+        assert (stats.items, stats.false_positives) == (30, 0)
+        engine.dispose()
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+from app.domain.entities.message import Message, MessageMetadata
+from app.interfaces.schemas.message_schema import MessageOut, message_json, message_list_json
+from test.test_constants import VALID_SENDER, CONTENT_SHORT
+
+
+class TestMessageSerializers:
+    """The TypeAdapter fast path must produce exactly the bytes MessageOut would."""
+
+    SESSION_ID = "ser1"
+
+    def _messages(self):
+        return [
+            Message("ser-a", self.SESSION_ID, CONTENT_SHORT, datetime(2025, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc),
+                    VALID_SENDER, MessageMetadata(1, 2, "2025-01-02T03:04:05+00:00")),
+            Message("ser-b", self.SESSION_ID, CONTENT_SHORT, datetime(2025, 1, 2, 3, 4, 6), VALID_SENDER),
+        ]
+
+    def test_single_message_matches_message_out(self):
+        for message in self._messages():
+            assert message_json.dump_json(message) == MessageOut(**message.to_dict()).model_dump_json().encode()
+
+    def test_message_list_matches_message_out(self):
+        messages = self._messages()
+        expected = b"[" + b",".join(MessageOut(**m.to_dict()).model_dump_json().encode() for m in messages) + b"]"
+
+        assert message_list_json.dump_json(messages) == expected
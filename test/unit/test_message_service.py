@@ -2,9 +2,17 @@ import pytest
 from datetime import datetime, timezone
 from app.application.services.message_service import MessageService
 from app.domain.entities.message import Message
+from app.domain.entities.message_page import MessagePage
+from app.domain.entities.session_stats import SessionStats
 from app.domain.repositories.message_repository import MessageRepository
+from app.infrastructure.message_cache_impl import InMemoryMessageCache
 from app.core.errors import MissingFieldError, InvalidSenderError, NotFoundError
 from test.test_constants import (
+    BATCH_STATUS_CREATED,
+    BATCH_STATUS_REJECTED,
+    ERROR_CODE_DUPLICATE_MESSAGE_ID,
+    ERROR_CODE_INVALID_SENDER,
+    ERROR_CODE_MISSING_FIELD,
     VALID_SENDER,
     INVALID_SENDER,
     CONTENT_SHORT,
@@ -24,12 +32,45 @@ class FakeRepo(MessageRepository):
         self.saved = message
         return message
 
+    def save_many(self, messages):
+        stored_ids = {m.message_id for m in self._messages}
+        results = []
+        for m in messages:
+            if m.message_id in stored_ids:
+                results.append(None)
+                continue
+            stored_ids.add(m.message_id)
+            self._messages.append(m)
+            results.append(m)
+        return results
+
     def get_by_session(self, session_id, limit, offset, sender=None):
         filtered = [m for m in self._messages if m.session_id == session_id]
         if sender:
             filtered = [m for m in filtered if m.sender == sender]
         return filtered[offset:offset + limit]
 
+    def get_page_by_session(self, session_id, limit, offset=0, sender=None, cursor=None, query=None, sort=None):
+        start = int(cursor) if cursor else offset
+        matches = self.get_by_session(session_id, len(self._messages), 0, sender)
+        if query:
+            matches = [m for m in matches if query.lower() in m.content.lower()]
+        has_more = len(matches) > start + limit
+        return MessagePage(matches[start:start + limit], str(start + limit) if has_more else None)
+
+    def iter_by_session(self, session_id, batch_size=None):
+        return iter([m for m in self._messages if m.session_id == session_id])
+
+    def get_session_stats(self, session_id):
+        matches = [m for m in self._messages if m.session_id == session_id]
+        if not matches:
+            return None
+        timestamps = [m.timestamp for m in matches]
+        return SessionStats(session_id, len(matches), 0, 0, min(timestamps), max(timestamps), {})
+
+    def get_session_version(self, session_id):
+        return sum(1 for m in self._messages if m.session_id == session_id)
+
 
 @pytest.fixture
 def service():
@@ -93,7 +134,7 @@ class TestMessageService:
         )
         saved = service.process_and_save(msg)
         assert FILTERED_WORD_REPLACEMENT in saved.content
-        assert METADATA_WORD_COUNT_FIELD in saved.metadata
+        assert METADATA_WORD_COUNT_FIELD in saved.metadata.to_dict()
 
     def test_missing_session_id(self, service):
         """Should raise exception if session_id is missing."""
@@ -185,3 +226,138 @@ class TestMessageService:
                 offset=0,
                 query=self.QUERY_TERM_NO_MATCH,
             )
+
+    def test_process_and_save_many_reports_each_item(self, service):
+        """Should store valid messages and reject invalid or duplicate ones individually."""
+        messages = [
+            Message(self.MESSAGE_ID_1, self.SESSION_ID_VALID, self.BADWORD_CONTENT, None, VALID_SENDER),
+            Message(self.MESSAGE_ID_EMPTY, self.SESSION_ID_VALID, self.SHORT_CONTENT, None, VALID_SENDER),
+            Message(self.MESSAGE_ID_2, self.SESSION_ID_VALID, self.SHORT_CONTENT, None, INVALID_SENDER),
+            Message(self.MESSAGE_ID_1, self.SESSION_ID_VALID, self.SHORT_CONTENT, None, VALID_SENDER),
+        ]
+
+        results = service.process_and_save_many(messages)
+
+        assert [r.index for r in results] == [0, 1, 2, 3]
+        assert results[0].status == BATCH_STATUS_CREATED
+        assert FILTERED_WORD_REPLACEMENT in results[0].message.content
+        assert METADATA_WORD_COUNT_FIELD in results[0].message.metadata.to_dict()
+        assert results[0].message.timestamp is not None
+        assert [r.status for r in results[1:]] == [BATCH_STATUS_REJECTED] * 3
+        assert results[1].error_code == ERROR_CODE_MISSING_FIELD
+        assert results[2].error_code == ERROR_CODE_INVALID_SENDER
+        assert results[3].error_code == ERROR_CODE_DUPLICATE_MESSAGE_ID
+
+    def test_get_message_page_returns_next_cursor(self):
+        """Should forward the cursor to the repository and expose the next one."""
+        messages = [
+            Message(f"p{i}", self.SESSION_ID_SEARCH, self.CONTENT_MATCH, datetime.now(timezone.utc), VALID_SENDER)
+            for i in range(3)
+        ]
+        service = MessageService(FakeRepo(messages))
+
+        first = service.get_message_page(self.SESSION_ID_SEARCH, limit=2, offset=0)
+        last = service.get_message_page(self.SESSION_ID_SEARCH, limit=2, offset=0, cursor=first.next_cursor)
+
+        assert [m.message_id for m in first.messages] == ["p0", "p1"]
+        assert first.next_cursor is not None
+        assert [m.message_id for m in last.messages] == ["p2"]
+        assert last.next_cursor is None
+
+
+    def test_export_messages_streams_whole_session(self):
+        """Should return an iterator over the whole session, or raise NotFoundError when it is empty."""
+        messages = [
+            Message(f"x{i}", self.SESSION_ID_SEARCH, self.CONTENT_MATCH, datetime.now(timezone.utc), VALID_SENDER)
+            for i in range(3)
+        ]
+        service = MessageService(FakeRepo(messages))
+
+        assert [m.message_id for m in service.export_messages(self.SESSION_ID_SEARCH)] == ["x0", "x1", "x2"]
+        with pytest.raises(NotFoundError):
+            service.export_messages("missing")
+
+    def test_get_session_stats(self):
+        """Should return the repository aggregates, or raise NotFoundError for an unknown session."""
+        messages = [Message("st1", self.SESSION_ID_SEARCH, self.CONTENT_MATCH, datetime.now(timezone.utc), VALID_SENDER)]
+        service = MessageService(FakeRepo(messages))
+
+        assert service.get_session_stats(self.SESSION_ID_SEARCH).message_count == 1
+        with pytest.raises(NotFoundError):
+            service.get_session_stats("missing")
+
+class CountingRepo(FakeRepo):
+    """FakeRepo that records how many page queries reach it and stores saved messages."""
+    def __init__(self, messages=None):
+        super().__init__(messages)
+        self.page_queries = 0
+
+    def save(self, message: Message) -> Message:
+        self._messages.append(message)
+        return super().save(message)
+
+    def get_page_by_session(self, *args, **kwargs):
+        self.page_queries += 1
+        return super().get_page_by_session(*args, **kwargs)
+
+
+class TestMessageServiceCache:
+    """Unit tests for the read cache wired into MessageService."""
+
+    SESSION_ID = "sc1"
+    OTHER_SESSION_ID = "sc2"
+
+    def _message(self, message_id, session_id=SESSION_ID):
+        return Message(message_id, session_id, CONTENT_SHORT, datetime.now(timezone.utc), VALID_SENDER)
+
+    def _service(self):
+        repo = CountingRepo([self._message("c0"), self._message("o0", self.OTHER_SESSION_ID)])
+        return MessageService(repo, cache=InMemoryMessageCache(max_entries=10, ttl_seconds=60)), repo
+
+    def test_repeated_reads_hit_the_cache(self):
+        service, repo = self._service()
+
+        first = service.get_messages(self.SESSION_ID, limit=10, offset=0)
+        second = service.get_messages(self.SESSION_ID, limit=10, offset=0)
+
+        assert first == second
+        assert repo.page_queries == 1
+        assert service.cache.stats().hits == 1
+
+    def test_different_parameters_use_different_entries(self):
+        service, repo = self._service()
+
+        service.get_messages(self.SESSION_ID, limit=10, offset=0)
+        service.get_messages(self.SESSION_ID, limit=10, offset=0, sender=VALID_SENDER)
+
+        assert repo.page_queries == 2
+
+    def test_save_invalidates_the_session(self):
+        service, repo = self._service()
+        service.get_messages(self.SESSION_ID, limit=10, offset=0)
+        service.get_messages(self.OTHER_SESSION_ID, limit=10, offset=0)
+
+        service.process_and_save(self._message("c1"))
+
+        assert [m.message_id for m in service.get_messages(self.SESSION_ID, limit=10, offset=0)] == ["c0", "c1"]
+        service.get_messages(self.OTHER_SESSION_ID, limit=10, offset=0)
+        assert repo.page_queries == 3
+
+    def test_batch_save_invalidates_every_touched_session(self):
+        service, repo = self._service()
+        service.get_messages(self.SESSION_ID, limit=10, offset=0)
+        service.get_messages(self.OTHER_SESSION_ID, limit=10, offset=0)
+
+        service.process_and_save_many([self._message("c1"), self._message("o1", self.OTHER_SESSION_ID)])
+        service.get_messages(self.SESSION_ID, limit=10, offset=0)
+        service.get_messages(self.OTHER_SESSION_ID, limit=10, offset=0)
+
+        assert repo.page_queries == 4
+
+    def test_cached_empty_page_still_raises_notfound(self):
+        service, _ = self._service()
+
+        for _ in range(2):
+            with pytest.raises(NotFoundError):
+                service.get_messages("missing", limit=10, offset=0)
+        assert service.cache.stats().hits == 1
@@ -0,0 +1,92 @@
+import asyncio
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool, StaticPool
+from prometheus_client import CollectorRegistry, generate_latest
+from app.core.metrics import MetricsMiddleware, PoolCollector, CacheCollector, MessageIdFilterCollector
+from app.core.metrics import register_collector, REGISTRY, route_template
+from app.domain.entities.cache_stats import CacheStats
+from app.infrastructure.message_cache_impl import message_cache
+from app.infrastructure.message_id_filter import MessageIdFilter
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class TestMetrics:
+    """Unit tests for the Prometheus metrics helpers."""
+
+    def _scrape(self, collector):
+        registry = CollectorRegistry()
+        registry.register(collector)
+        return generate_latest(registry).decode()
+
+    def test_non_http_scopes_pass_through(self):
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(scope["type"])
+
+        run(MetricsMiddleware(app)({"type": "lifespan"}, None, None))
+
+        assert seen == ["lifespan"]
+
+    def test_unmatched_route_uses_placeholder_label(self):
+        assert route_template({"type": "http"}) == "<unmatched>"
+
+    def test_pool_collector_reports_queue_pool_and_skips_others(self, tmp_path):
+        queue_engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=3)
+        static_engine = create_engine("sqlite://", poolclass=StaticPool)
+        connection = queue_engine.connect()
+
+        output = self._scrape(PoolCollector({"main": queue_engine, "static": static_engine}))
+        connection.close()
+
+        assert 'chat_db_pool_checked_out{engine="main"} 1.0' in output
+        assert 'chat_db_pool_size{engine="main"} 3.0' in output
+        assert 'engine="static"' not in output
+
+    def test_cache_collector_exports_stats(self):
+        class FakeCache:
+            def stats(self):
+                return CacheStats(hits=4, misses=2, evictions=1, invalidations=3, size=5)
+
+        output = self._scrape(CacheCollector(FakeCache()))
+
+        assert "chat_message_cache_hits_total 4.0" in output
+        assert "chat_message_cache_invalidations_total 3.0" in output
+        assert "chat_message_cache_entries 5.0" in output
+
+    def test_message_id_filter_collector_reports_size_and_false_positives(self):
+        id_filter = MessageIdFilter(1000, 0.01)
+        id_filter.add("m1")
+        id_filter.might_contain("m1")
+        id_filter.record_false_positives()
+
+        output = self._scrape(MessageIdFilterCollector(id_filter))
+
+        assert "chat_message_id_filter_items 1.0" in output
+        assert "chat_message_id_filter_memory_bytes 1199.0" in output
+        assert "chat_message_id_filter_probable_duplicates_total 1.0" in output
+        assert "chat_message_id_filter_false_positives_total 1.0" in output
+        assert "chat_message_id_filter_estimated_false_positive_rate" in output
+
+    def test_register_collector_replaces_previous(self):
+        """Re-registering a name swaps the collector instead of failing on duplicate metric names."""
+        class FakeCache:
+            def __init__(self, hits):
+                self.hits = hits
+
+            def stats(self):
+                return CacheStats(hits=self.hits)
+
+        register_collector("message_cache", CacheCollector(FakeCache(1)))
+        register_collector("message_cache", CacheCollector(FakeCache(2)))
+        try:
+            assert REGISTRY.get_sample_value("chat_message_cache_hits_total") == 2
+        finally:
+            register_collector("message_cache", CacheCollector(message_cache))
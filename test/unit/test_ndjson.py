@@ -0,0 +1,47 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from app.domain.entities.message import Message
+from app.interfaces.api.ndjson import iter_ndjson, aiter_ndjson
+from test.test_constants import VALID_SENDER, CONTENT_SHORT, FIELD_MESSAGE_ID
+
+
+class TestNdjson:
+    """Unit tests for the NDJSON export encoder."""
+
+    SESSION_ID = "nd1"
+    CHUNK_SIZE = 2
+    MESSAGE_COUNT = 5
+
+    def _messages(self):
+        return [
+            Message(f"n{i}", self.SESSION_ID, CONTENT_SHORT, datetime.now(timezone.utc), VALID_SENDER)
+            for i in range(self.MESSAGE_COUNT)
+        ]
+
+    def _ids(self, chunks):
+        return [json.loads(line)[FIELD_MESSAGE_ID] for line in b"".join(chunks).splitlines()]
+
+    def test_lines_are_grouped_into_chunks(self):
+        chunks = list(iter_ndjson(self._messages(), chunk_size=self.CHUNK_SIZE))
+
+        assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
+        assert self._ids(chunks) == [f"n{i}" for i in range(self.MESSAGE_COUNT)]
+
+    def test_async_encoder_matches_sync(self):
+        async def source():
+            for message in self._messages():
+                yield message
+
+        async def collect():
+            return [chunk async for chunk in aiter_ndjson(source(), chunk_size=self.CHUNK_SIZE)]
+
+        loop = asyncio.new_event_loop()
+        chunks = loop.run_until_complete(collect())
+        loop.close()
+
+        assert len(chunks) == 3
+        assert self._ids(chunks) == [f"n{i}" for i in range(self.MESSAGE_COUNT)]
+
+    def test_empty_stream_yields_nothing(self):
+        assert list(iter_ndjson([])) == []
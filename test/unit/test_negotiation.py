@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+import msgpack
+import pytest
+from app.domain.entities.message import Message, MessageMetadata
+from app.interfaces.api.negotiation import negotiate, packb, message_list_response
+from app.interfaces.schemas.message_schema import message_list_json
+from test.test_constants import VALID_SENDER, CONTENT_SHORT, MEDIA_TYPE_JSON, MEDIA_TYPE_MSGPACK
+
+
+class TestNegotiation:
+    """Unit tests for JSON / MessagePack content negotiation."""
+
+    SESSION_ID = "ng1"
+
+    def test_json_unless_msgpack_is_preferred(self):
+        assert negotiate(None) == MEDIA_TYPE_JSON
+        assert negotiate("*/*") == MEDIA_TYPE_JSON
+        assert negotiate(MEDIA_TYPE_MSGPACK) == MEDIA_TYPE_MSGPACK
+        assert negotiate("application/x-msgpack") == MEDIA_TYPE_MSGPACK
+        assert negotiate(f"{MEDIA_TYPE_JSON}, {MEDIA_TYPE_MSGPACK}") == MEDIA_TYPE_MSGPACK
+        assert negotiate(f"{MEDIA_TYPE_JSON}, {MEDIA_TYPE_MSGPACK};q=0.5") == MEDIA_TYPE_JSON
+        assert negotiate(f"{MEDIA_TYPE_MSGPACK};q=0") == MEDIA_TYPE_JSON
+        assert negotiate(f"{MEDIA_TYPE_MSGPACK};q=bogus") == MEDIA_TYPE_JSON
+
+    def test_msgpack_page_has_the_json_shape(self):
+        """Same fields as the JSON body; timestamps decode to UTC datetimes, naive ones included."""
+        aware = datetime(2025, 6, 1, 10, 0, tzinfo=timezone.utc)
+        messages = [
+            Message("n1", self.SESSION_ID, CONTENT_SHORT, aware, VALID_SENDER, MessageMetadata(1, 5, aware.isoformat())),
+            Message("n2", self.SESSION_ID, CONTENT_SHORT, aware.replace(tzinfo=None), VALID_SENDER),
+        ]
+
+        body = message_list_response(MEDIA_TYPE_MSGPACK, messages).body
+        decoded = msgpack.unpackb(body, timestamp=3)
+        expected = message_list_json.dump_python(messages)
+
+        assert [item.keys() for item in decoded] == [item.keys() for item in expected]
+        assert [item["timestamp"] for item in decoded] == [aware, aware]
+        assert decoded[0]["metadata"] == expected[0]["metadata"]
+        assert decoded[1]["metadata"] is None
+
+    def test_packb_rejects_unknown_types(self):
+        with pytest.raises(TypeError):
+            packb(object())
@@ -0,0 +1,26 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from app.core.errors import InvalidCursorError
+from app.infrastructure.pagination import encode_cursor, decode_cursor
+
+
+class TestCursorCodec:
+    """Unit tests for opaque keyset cursors."""
+
+    TIMESTAMP = datetime(2025, 10, 6, 0, 48, 55, 204000)
+    ROW_ID = 42
+    INVALID_CURSORS = ["%%%", "bm90LWpzb24", "WyIyMDI1LTEwLTA2IiwgImlkIl0", "WzFd"]
+
+    def test_round_trip(self):
+        cursor = encode_cursor(self.TIMESTAMP, self.ROW_ID)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (self.TIMESTAMP, self.ROW_ID)
+
+    def test_offset_timestamps_decode_as_naive_utc(self):
+        aware = self.TIMESTAMP.replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=-5)))
+        assert decode_cursor(encode_cursor(aware, self.ROW_ID)) == (self.TIMESTAMP, self.ROW_ID)
+
+    @pytest.mark.parametrize("cursor", INVALID_CURSORS)
+    def test_invalid_cursor_raises(self, cursor):
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor)